@@ -1,10 +1,10 @@
 import os
 # Tests are executed with pytest
 import pytest
-import time
 import subprocess
 import asyncio
 import logging
+import functools
 
 # We use asyncio to handle bluetooth interactions
 # This plugin makes testing with asyncio easier
@@ -12,36 +12,134 @@ import pytest_asyncio
 
 # Import EmbedOps provided sdk features
 from hil_sdk.interfaces.jlink_interface import JLinkInterface
-from hil_sdk.interfaces.ble.ble_client import BLEClient
 from hil_sdk.interfaces.ble.nordic.ble_shell_service import BLEShellService
 from hil_sdk.interfaces.ble.nordic.ble_nus_service import BLENUSService
 from hil_sdk.interfaces.ble.nordic.ble_dfu_service import BLEDFUService
-from hil_sdk.interfaces.ble.ble_scanner import BLEScanner
+from hil_sdk.interfaces.ble.ble_device_cache import BLEDeviceCache
+from hil_sdk.interfaces.ble.ble_connection_pool import BLEConnectionPool
+from hil_sdk.interfaces.ble.ble_gatt_cache import BLEGATTCache
 from hil_sdk.interfaces.nrfjprog_interface import nrfjprog_flash
+from hil_sdk.interfaces.flash.flash_cache import FlashCache
+from hil_sdk.interfaces.flash.differential_flash import DifferentialFlasher
+from hil_sdk.interfaces.flash.flash_orchestrator import FlashOrchestrator, FlashTarget
 from hil_sdk.interfaces.serial.serial_interface import SerialInterface
+from hil_sdk.interfaces.target_ready import TargetReadyWaiter, SerialBannerSignal
+from hil_sdk.interfaces.dut_registry import DUT, DUTRegistry
 
-BLE_ADDR_STR_LEN = 18  # Length of a BLE address string (including newline)
+DUT_SERIAL_PORT  = "/dev/ttyACM1"
+DUT_DEVICE       = "nRF5340_xxAA_APP"
+DUT_FAMILY       = "NRF53"
+READY_BANNER     = "advertising started"  # Logged by the application once it is up
+READY_TIMEOUT    = 10  # Seconds to wait for the target to start after a reset
+APP_FLASH_RANGE  = (0x00000000, 0x00100000)  # Application core flash, readable over the J-Link connection
+DUTS_FILE        = "duts.json"  # Optional station description (one entry per DUT); without it, the DUT above is used
+DUTS_PATH        = os.path.join(os.path.dirname(os.path.abspath(__file__)), DUTS_FILE)
+
+
+@functools.cache
+def station_duts() -> list[DUT]:
+
+    """
+    The DUTs of the station: those described by duts.json (each with its own probe) if the file exists, otherwise
+    the single DUT on DUT_SERIAL_PORT, which uses the J-Link of jlink_fixture.
+    """
+
+    if os.path.isfile(DUTS_PATH):
+        return DUTRegistry.from_file(DUTS_PATH, device=DUT_DEVICE, family=DUT_FAMILY).duts
+
+    return [DUT("dut0", serial_port=DUT_SERIAL_PORT, device=DUT_DEVICE, family=DUT_FAMILY)]
+
+
+# Tests using a single DUT run once per DUT of the station
+def pytest_generate_tests(metafunc):
+
+    if "dut_fixture" in metafunc.fixturenames:
+        metafunc.parametrize("dut_fixture", [dut.name for dut in station_duts()], indirect=True, scope="session")
 
 # Run jlink fixture one time at session start
 @pytest.fixture(autouse=True, scope="session")
 def jlink_fixture():
 
     logging.info("Creating J-Link interface...")
-    return JLinkInterface("nRF5340_xxAA_APP")
+    jlink = JLinkInterface(DUT_DEVICE)
+
+    yield jlink
+
+    jlink.close_session()
 
 # Run flash fixture one time at session start
 @pytest.fixture(autouse=True, scope="session")
 def flash_fixture(jlink_fixture, hil_extras_get_path):
 
-    this_dir = os.path.dirname(os.path.abspath(__file__))
+    hex_path = hil_extras_get_path("build/zephyr/merged_domains.hex")
+    duts = station_duts()
+
+    if os.path.isfile(DUTS_PATH):
+        flash_station(duts, hex_path)
+    else:
+        duts[0].jlink = jlink_fixture
+
+        logging.info("Flashing target...")
+        flash_cache = FlashCache(jlink_fixture, verify_ranges=[APP_FLASH_RANGE])
+        # When the image changed, only reprogram the pages that differ from the last flashed image
+        flasher = DifferentialFlasher(jlink_fixture, flash_ranges=[APP_FLASH_RANGE], full_flash_function=nrfjprog_flash)
+        flash_result = flash_cache.flash(hex_path, DUT_FAMILY, flasher)
+        assert flash_result.status == 0
+        logging.info(f"Flash {'performed' if flash_result.flashed else 'skipped'}: {flash_result.reason} "
+                     f"(saved {flash_result.time_saved:.1f} s)")
+
+    # Keep one probe connection per DUT open for the rest of the session (falls back to JLinkExe if unavailable)
+    for dut in duts:
+        if not dut.jlink.open_session():
+            logging.warning(f"J-Link session of {dut.name} could not be opened, using JLinkExe")
+
+    logging.info("Resetting targets...")
+    asyncio.run(reset_station(duts))
+
+
+def flash_station(duts: list[DUT], hex_path: str) -> None:
+
+    """Flash every DUT of the station through its own probe, all at once."""
+
+    assert all(dut.jlink is not None for dut in duts), "Every DUT in duts.json needs a probe serial_no"
+
+    duts_by_probe = {dut.serial_no: dut for dut in duts}
+
+    # When the image changed, only reprogram the pages that differ from the last image flashed to that DUT
+    def flash_dut(hex_path, family, snr=None, logfile=None):
+        flasher = DifferentialFlasher(duts_by_probe[str(snr)].jlink, flash_ranges=[APP_FLASH_RANGE])
+        return flasher(hex_path, family, logfile=logfile)
+
+    logging.info(f"Flashing {len(duts)} targets...")
+    targets = [FlashTarget(dut.name, dut.serial_no, hex_path, dut.family, reset=False) for dut in duts]
+    results = FlashOrchestrator(flash_function=flash_dut).run(targets)
+
+    failed = [name for name, result in results.items() if not result.success]
+    assert not failed, f"Unable to flash: {failed}"
+
+
+async def reset_station(duts: list[DUT]) -> None:
+
+    """Reset every DUT and wait for each to start up, rather than sleeping for a fixed time."""
+
+    async def reset_dut(dut):
 
-    logging.info("Flashing target...")
-    assert nrfjprog_flash(hil_extras_get_path("build/zephyr/merged_domains.hex"), "NRF53") == 0
+        if dut.serial_port is None:
+            assert await dut.reset()
+            return
 
-    logging.info("Resetting target...")
-    assert jlink_fixture.reset_and_go()
+        serial_port = SerialInterface(dut.serial_port, baudrate=115200, read_timeout=0.5)
+        try:
+            waiter = TargetReadyWaiter([SerialBannerSignal(serial_port, READY_BANNER)])
+            assert await dut.reset()
+            ready = await waiter.wait(timeout=READY_TIMEOUT)
+        finally:
+            serial_port.close()
 
-    time.sleep(2)  # Sleep for a couple of seconds to let the target device start up
+        if not ready.ready:
+            logging.warning(f"Boot banner of {dut.name} not seen within {READY_TIMEOUT} s, continuing")
+
+    await asyncio.gather(*(reset_dut(dut) for dut in duts))
 
 
 @pytest.fixture(scope="function", autouse=True)
@@ -57,52 +155,104 @@ def btmon_fixture(request, hil_results_open):
     btmon_out.close()
 
 
-@pytest.fixture
-def serial_ble_address_fixture():
+# The DUT a test runs on (parametrized over the DUTs of the station, see pytest_generate_tests)
+@pytest.fixture(scope="session")
+def dut_fixture(request):
+
+    return next(dut for dut in station_duts() if dut.name == request.param)
+
+
+@pytest.fixture(scope="session")
+def serial_ble_address_fixture(dut_fixture):
 
     """
     Fixture that uses the target's UART to retrieve the BLE address
     of the physically connected device. This is useful to distinguish
     between two advertising devices with the same name.
+    The address does not change when the target resets, so it is only retrieved once per session.
     """
 
-    port_name = '/dev/ttyACM1'
-    s = SerialInterface(port_name, baudrate=115200, read_timeout=0.5)
+    if dut_fixture.ble_address is None:
+        assert dut_fixture.read_ble_address() is not None
+
+    logging.info(f"Connected BLE address of {dut_fixture.name} is {dut_fixture.ble_address}")
+
+    return dut_fixture.ble_address
+
+# One background scan for the whole session; device lookups are answered from its cache
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def ble_device_cache_fixture():
+
+    cache = BLEDeviceCache()
+    await cache.start()
+
+    yield cache
+
+    await cache.stop()
+
+
+# GATT databases discovered by earlier connections (and sessions), keyed by address and firmware version
+@pytest.fixture(scope="session")
+def ble_gatt_cache_fixture():
+
+    return BLEGATTCache()
 
-    # Data for communicating with target over serial
-    mac_addr_command = "mac_address\n".encode()
-    assert s.write(mac_addr_command) == len(mac_addr_command)
 
-    response_bytes = s.read(BLE_ADDR_STR_LEN)
-    assert len(response_bytes) == BLE_ADDR_STR_LEN
+# Connections are shared by the tests of the session, and reconnected if a test dropped the link
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def ble_connection_pool_fixture(ble_device_cache_fixture, ble_gatt_cache_fixture):
 
-    connected_ble_addr = bytes.decode(response_bytes).strip()
-    logging.info(f"Connected BLE address is {connected_ble_addr}")
+    pool = BLEConnectionPool(device_lookup=ble_device_cache_fixture.wait_for, gatt_cache=ble_gatt_cache_fixture)
 
-    yield connected_ble_addr
+    yield pool
 
-    s.close()
+    await pool.close()
+    logging.info(f"BLE connections: {pool.connect_count} made, {pool.reuse_count} reused, "
+                 f"{pool.reconnect_count} reconnected")
 
-@pytest_asyncio.fixture
-async def ble_client_fixture(serial_ble_address_fixture):
 
-    def filter_function(advertising_device):
-        return advertising_device.address == serial_ble_address_fixture
+# All the DUTs of the station, connected, for tests that run on every DUT at once
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def dut_registry_fixture(ble_connection_pool_fixture):
 
-    devices = await BLEScanner.find_devices(filter=filter_function)
-    assert len(devices) == 1  # Only expect a single device with the given address
+    registry = DUTRegistry(station_duts(), ble_connection_pool_fixture)
+    assert await registry.read_ble_addresses()
 
-    device = devices[0]
+    connected = await registry.connect_all()
+    assert all(connected.values()), f"Unable to connect to: {[name for name, ok in connected.items() if not ok]}"
+
+    yield registry
+
+    await registry.close()
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def ble_client_fixture(serial_ble_address_fixture, ble_connection_pool_fixture):
+
+    client = await ble_connection_pool_fixture.acquire(serial_ble_address_fixture)
+    assert client is not None
+
+    yield client
+
+    await ble_connection_pool_fixture.release(client)
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def ble_exclusive_client_fixture(serial_ble_address_fixture, ble_connection_pool_fixture):
+
+    """
+    Fixture providing a fresh connection that is not shared with other tests,
+    for tests that disconnect or reset the target on purpose.
+    """
 
-    logging.info(f"Connecting to {device.name} ({device.address})...")
+    logging.info(f"Connecting to {serial_ble_address_fixture} (exclusive)...")
 
-    client = BLEClient(device.address)
-    connect_status = await client.connect()
-    assert connect_status == True
+    client = await ble_connection_pool_fixture.acquire(serial_ble_address_fixture, exclusive=True)
+    assert client is not None
 
     yield client
 
-    await client.disconnect()
+    await ble_connection_pool_fixture.release(client)
 
     logging.info("Disconnected!")
 
@@ -0,0 +1,84 @@
+#
+# Copyright (C) 2026, Dojo Five
+# All rights reserved.
+#
+
+import time
+import logging
+import pytest
+import pytest_asyncio
+
+from hil_sdk.version import __version__
+from hil_sdk.interfaces.ble.ble_client import BLEClient
+from hil_sdk.interfaces.ble.ble_loopback import LoopbackBLEClient
+from hil_sdk.interfaces.ble.ble_benchmark import BLEBenchmark
+from hil_sdk.interfaces.ble.ble_scanner import BLEScanner
+from hil_sdk.interfaces.jlink_interface import JLinkInterface
+from hil_sdk.interfaces.nrfjprog_interface import nrfjprog_flash
+
+
+def pytest_addoption(parser):
+
+    parser.addoption("--loopback", action="store_true",
+                     help="Benchmark against an in-process stand-in of the demo firmware instead of hardware")
+    parser.addoption("--loopback-latency", type=float, default=0.0,
+                     help="Emulated link latency of the loopback transport, in seconds")
+    parser.addoption("--benchmark-output", default="ble_benchmark.json",
+                     help="Path of the JSON results file")
+    parser.addoption("--benchmark-dfu-image", default=None,
+                     help="MCUboot image uploaded by the DFU benchmark (hardware only; skipped if not given)")
+
+
+@pytest.fixture(scope="session")
+def loopback(request):
+
+    return request.config.getoption("--loopback")
+
+
+@pytest.fixture(scope="session")
+def jlink_fixture():
+
+    logging.info(f"HIL SDK version {__version__}")
+    logging.info("Creating J-Link interface...")
+    return JLinkInterface("nRF5340_xxAA_APP")
+
+
+@pytest.fixture(scope="session")
+def flash_fixture(jlink_fixture, hil_extras_get_path):
+
+    logging.info("Flashing target...")
+    assert nrfjprog_flash(hil_extras_get_path("build/zephyr/merged_domains.hex"), "NRF53") == 0
+
+    logging.info("Resetting target...")
+    assert jlink_fixture.reset_and_go()
+
+    time.sleep(2)  # Sleep for a couple of seconds to let the target device start up
+
+
+# One connection for the whole session; the results of all benchmarks are saved when it ends
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def ble_benchmark_fixture(request, loopback):
+
+    if loopback:
+        client = LoopbackBLEClient(latency=request.config.getoption("--loopback-latency"))
+    else:
+        request.getfixturevalue("flash_fixture")
+
+        # Stop scanning as soon as an EmbedOps device advertises
+        scan_result = await BLEScanner.scan_until(filter=lambda d: "EmbedOps" in d.name, timeout=10.0)
+        assert scan_result.found, "EmbedOps device not found!"
+
+        logging.info("EmbedOps address: " + scan_result.devices[0].address)
+        client = BLEClient(scan_result.devices[0])
+
+    assert await client.connect()
+
+    benchmark = BLEBenchmark(client, transport="loopback" if loopback else "ble")
+
+    yield benchmark
+
+    benchmark.print_summary()
+    benchmark.save(request.config.getoption("--benchmark-output"),
+                   metadata={"link": repr(await client.get_link_parameters())} if not loopback else None)
+
+    await client.disconnect()
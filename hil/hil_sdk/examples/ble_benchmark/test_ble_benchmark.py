@@ -0,0 +1,71 @@
+#
+# Copyright (C) 2026, Dojo Five
+# All rights reserved.
+#
+
+import os
+import pytest
+
+NUS_THROUGHPUT_SIZE = 16384  # Bytes written per NUS throughput run
+NUS_THROUGHPUT_RUNS = 10
+NUS_ECHO_ITERATIONS = 200
+NUS_ECHO_PAYLOAD    = 20     # Bytes per NUS echo round trip
+SHELL_PING_ITERATIONS = 100
+GATT_READ_ITERATIONS  = 200
+DFU_RUNS              = 1
+LOOPBACK_IMAGE_SIZE   = 128 * 1024  # Size of the image uploaded to the loopback transport
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_nus_throughput(ble_benchmark_fixture):
+
+    result = await ble_benchmark_fixture.nus_throughput(total_size=NUS_THROUGHPUT_SIZE, runs=NUS_THROUGHPUT_RUNS)
+    print(result.summary())
+
+    assert len(result.samples) == NUS_THROUGHPUT_RUNS
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_nus_echo_latency(ble_benchmark_fixture):
+
+    result = await ble_benchmark_fixture.nus_echo_latency(iterations=NUS_ECHO_ITERATIONS, payload_size=NUS_ECHO_PAYLOAD)
+    print(result.summary())
+
+    assert result.failures == 0
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_shell_ping_latency(ble_benchmark_fixture):
+
+    result = await ble_benchmark_fixture.shell_ping_latency(iterations=SHELL_PING_ITERATIONS)
+    print(result.summary())
+
+    assert result.failures == 0
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_gatt_read_latency(ble_benchmark_fixture):
+
+    result = await ble_benchmark_fixture.gatt_read_latency(iterations=GATT_READ_ITERATIONS)
+    print(result.summary())
+
+    assert len(result.samples) == GATT_READ_ITERATIONS
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_dfu_throughput(ble_benchmark_fixture, loopback, request, tmp_path):
+
+    image_path = request.config.getoption("--benchmark-dfu-image")
+
+    if loopback:
+        # Any data will do, the loopback transport does not check the image
+        image_path = os.path.join(tmp_path, "loopback_image.bin")
+        with open(image_path, "wb") as image_file:
+            image_file.write(os.urandom(LOOPBACK_IMAGE_SIZE))
+    elif image_path is None:
+        pytest.skip("No DFU image given (--benchmark-dfu-image)")
+
+    result = await ble_benchmark_fixture.dfu_throughput(image_path, runs=DFU_RUNS)
+    print(result.summary())
+
+    assert result.failures == 0
@@ -3,8 +3,13 @@
 # All rights reserved.
 #
 
+import pytest
 import asyncio
 from hil_sdk.interfaces.ble.ble_scanner import BLEScanner
+from hil_sdk.interfaces.ble.ble_advertising_monitor import BLEAdvertisingMonitor
+
+MONITOR_DURATION         = 10.0  # Seconds to observe advertisements for
+MAX_ADVERTISING_INTERVAL = 0.2   # Longest acceptable advertising interval, in seconds
 
 
 def test_ble_scan():
@@ -17,3 +22,33 @@ def test_ble_scan():
         assert "EmbedOps HIL Demo Device" in device_names
 
     asyncio.run(test_func())
+
+
+def test_ble_advertising_interval():
+
+    async def test_func():
+
+        # Find the demo device, then observe its advertisements for a while
+        scan_result = await BLEScanner.scan_until(filter=lambda d: d.name == "EmbedOps HIL Demo Device", timeout=10.0)
+        assert scan_result.found
+
+        address = scan_result.devices[0].address
+
+        async with BLEAdvertisingMonitor(addresses=[address]) as monitor:
+            await asyncio.sleep(MONITOR_DURATION)
+
+        monitor.print_summary()
+
+        stats = monitor.stats(address)
+        assert stats is not None
+        assert stats.advertisement_count >= 1
+
+        # BlueZ only reports repeated advertisements that carry manufacturer or service data, and the demo's
+        # (flags, service UUID and name) do not, so its interval cannot be measured there
+        if not stats.interval_measurable:
+            pytest.skip("the BLE stack does not report every advertisement of the demo device")
+
+        assert stats.advertisement_count > 1
+        assert stats.nominal_interval <= MAX_ADVERTISING_INTERVAL
+
+    asyncio.run(test_func())
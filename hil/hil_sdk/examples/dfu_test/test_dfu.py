@@ -20,10 +20,16 @@ async def test_ble_dfu(ble_dfu_fixture):
         if percent % 10 == 0:
             print(f"DFU Progress: {percent}%")
 
+    # Upload even if a previous run left the image in slot 1, to test the DFU process every time
     print("Starting DFU")
-    dfu_status = await ble_dfu_fixture.image_upload(test_image, on_update=update_callback)
+    dfu_status = await ble_dfu_fixture.image_upload(test_image, on_update=update_callback, force=True)
     print(f"DFU Complete: {dfu_status}")
 
     await asyncio.sleep(5)
 
     assert dfu_status
+
+    # Slot 1 reports the hash of the uploaded image
+    image_states = await ble_dfu_fixture.get_state_of_images()
+    slot_1_hashes = [image["hash"] for image in image_states["images"] if image["slot"] == 1]
+    assert slot_1_hashes == [ble_dfu_fixture.get_image_hash(test_image)]
@@ -3,7 +3,6 @@
 # All rights reserved.
 #
 
-import asyncio
 import pytest
 import pytest_asyncio
 
@@ -12,11 +11,9 @@ async def test_ble_nus(ble_nus_fixture):
 
     test_data = b"This is a test"
 
-    async def rx_callback(uuid, data):
-        assert data == test_data
+    async with ble_nus_fixture.received_notifications() as stream:
+        await ble_nus_fixture.write_nus(test_data)
+        notification = await stream.get(timeout=5)
 
-    await ble_nus_fixture.set_nus_received_cb(rx_callback)
-
-    await ble_nus_fixture.write_nus(test_data)
-
-    await asyncio.sleep(5)
+    assert notification is not None
+    assert notification.data == test_data
@@ -0,0 +1,58 @@
+#
+# Copyright (C) 2026, Dojo Five
+# All rights reserved.
+#
+
+import time
+import logging
+import pytest
+import pytest_asyncio
+
+from hil_sdk.version import __version__
+from hil_sdk.interfaces.serial.serial_smp_transport import SerialSMPTransport
+from hil_sdk.interfaces.jlink_interface import JLinkInterface
+from hil_sdk.interfaces.nrfjprog_interface import nrfjprog_flash
+
+
+def pytest_addoption(parser):
+
+    parser.addoption("--smp-port", default="/dev/ttyACM0",
+                     help="Serial port of the target's MCUmgr UART transport")
+    parser.addoption("--smp-baudrate", type=int, default=115200,
+                     help="Baudrate of the target's MCUmgr UART")
+    parser.addoption("--smp-dfu-image", default=None,
+                     help="MCUboot image uploaded by the DFU test (skipped if not given)")
+
+
+@pytest.fixture(autouse=True, scope="session")
+def jlink_fixture():
+
+    logging.info(f"HIL SDK version {__version__}")
+    logging.info("Creating J-Link interface...")
+    return JLinkInterface("nRF5340_xxAA_APP")
+
+
+@pytest.fixture(autouse=True, scope="session")
+def flash_fixture(jlink_fixture, hil_extras_get_path):
+
+    logging.info("Flashing target...")
+    assert nrfjprog_flash(hil_extras_get_path("build/zephyr/merged_domains.hex"), "NRF53") == 0
+
+    logging.info("Resetting target...")
+    assert jlink_fixture.reset_and_go()
+
+    time.sleep(2)  # Sleep for a couple of seconds to let the target device start up
+
+
+# One SMP transport over the UART for the whole session; no BLE scan or connection is needed
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def serial_smp_transport_fixture(request):
+
+    port = request.config.getoption("--smp-port")
+    logging.info(f"Opening SMP transport on {port}...")
+
+    transport = SerialSMPTransport(port, baudrate=request.config.getoption("--smp-baudrate"))
+
+    yield transport
+
+    await transport.close()
@@ -0,0 +1,45 @@
+#
+# Copyright (C) 2026, Dojo Five
+# All rights reserved.
+#
+
+import time
+import pytest
+
+from hil_sdk.interfaces.ble.nordic.ble_shell_service import BLEShellService
+from hil_sdk.interfaces.ble.nordic.ble_dfu_service import BLEDFUService
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_serial_shell(serial_smp_transport_fixture):
+
+    # The same service as over BLE, given the serial transport instead of a client
+    shell_service = BLEShellService(serial_smp_transport_fixture)
+
+    cmd_response = await shell_service.execute_command(["hil", "ping"])
+
+    print(f"Shell response: {cmd_response}")
+
+    # "ping" command is expected to return "pong"
+    assert str(cmd_response["o"]).strip() == "pong"
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_serial_dfu(serial_smp_transport_fixture, request):
+
+    test_image = request.config.getoption("--smp-dfu-image")
+    if test_image is None:
+        pytest.skip("No image given with --smp-dfu-image")
+
+    dfu_service = BLEDFUService(serial_smp_transport_fixture)
+
+    start = time.perf_counter()
+    dfu_status = await dfu_service.image_upload(test_image, force=True)
+    print(f"DFU Complete: {dfu_status} ({time.perf_counter() - start:.1f} seconds)")
+
+    assert dfu_status
+
+    # Slot 1 reports the hash of the uploaded image
+    image_states = await dfu_service.get_state_of_images()
+    slot_1_hashes = [image["hash"] for image in image_states["images"] if image["slot"] == 1]
+    assert slot_1_hashes == [dfu_service.get_image_hash(test_image)]
@@ -46,20 +46,15 @@ def reset_fixture(jlink_fixture):
 @pytest_asyncio.fixture
 async def ble_shell_fixture(reset_fixture):
 
-    devices = await BLEScanner.find_devices()
+    # Stop scanning as soon as an EmbedOps device advertises
+    scan_result = await BLEScanner.scan_until(filter=lambda d: "EmbedOps" in d.name, timeout=10.0)
 
-    address = None
-    device = None
-    for d in devices:
-        if "EmbedOps" in d.name:
-            address = d.address
-            device = d
-
-    if address is None:
+    if not scan_result.found:
         logging.error('EmbedOps device not found!')
         assert False
 
-    logging.info("EmbedOps address: " + address)
+    device = scan_result.devices[0]
+    logging.info("EmbedOps address: " + device.address)
 
     client = BLEClient(device)
 
@@ -0,0 +1,345 @@
+#
+# Copyright (C) 2026, Dojo Five
+# All rights reserved.
+#
+
+import math
+import time
+import platform
+from array import array
+from bleak import BleakScanner
+from .ble_scanner import BLEScanner
+
+DEFAULT_HISTORY_SIZE   = 1024    # Most recent advertisements kept per device
+DEFAULT_HISTOGRAM_BIN  = 0.005   # Width of an interval histogram bin, in seconds
+DEFAULT_HISTOGRAM_MAX  = 10.24   # Longest interval counted in the histogram (the maximum advertising interval)
+ADV_EVENT_MERGE_WINDOW = 0.015   # Reports closer than this are one advertising event (eg, ADV_IND + SCAN_RSP)
+ADV_DELAY_MEAN         = 0.005   # Mean of the 0-10 ms random delay added to every advertising interval
+DEFAULT_MAX_DEVICES    = 256     # Devices tracked when monitoring all addresses (the least recently seen are dropped)
+
+
+class RunningStats:
+
+    """Mean, standard deviation, minimum and maximum of a series, updated incrementally (Welford's method)."""
+
+    def __init__(self) -> None:
+
+        self.count = 0
+        self.mean = 0.0
+        self.minimum = None
+        self.maximum = None
+        self._m2 = 0.0
+
+    def add(self, value: float) -> None:
+
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        self.minimum = value if self.minimum is None else min(self.minimum, value)
+        self.maximum = value if self.maximum is None else max(self.maximum, value)
+
+    @property
+    def std(self) -> float:
+
+        """Sample standard deviation (0 for fewer than two values)."""
+
+        return math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+
+class AdvertisingStats:
+
+    """
+    Advertising statistics of one device. All statistics are updated incrementally as advertisements arrive; only the
+    most recent advertisements are kept, in fixed-size ring buffers, so memory use does not grow with observation time.
+    """
+
+    def __init__(self, address: str, history_size: int, histogram_bin: float, histogram_max: float, expected_interval: float = None):
+
+        self.address = address
+        """Device address"""
+        self.name = ""
+        """Latest advertised name"""
+        self.expected_interval = expected_interval
+        """Configured advertising interval, in seconds (estimated from the histogram if None)"""
+        self.interval_measurable = True
+        """False if the host stack may not report every advertisement of the device (see BLEAdvertisingMonitor), in
+        which case the interval, missed and reception rate statistics do not describe its advertising events"""
+        self.advertisement_count = 0
+        """Number of advertising events received"""
+        self.first_seen = None
+        """Time (time.monotonic()) of the first advertising event"""
+        self.last_seen = None
+        """Time (time.monotonic()) of the last advertising event"""
+        self.rssi = RunningStats()
+        """RSSI statistics, in dBm"""
+        self.intervals = RunningStats()
+        """Statistics of all intervals between received events, in seconds (including gaps from missed events)"""
+        self.clean_intervals = RunningStats()
+        """Statistics of the intervals with no missed event in between; their standard deviation is the jitter"""
+        self.missed = 0
+        """Estimated number of advertising events that were sent but not received"""
+        self.histogram_bin = histogram_bin
+        """Width of a histogram bin, in seconds"""
+        self.histogram = array("L", [0]) * (int(histogram_max / histogram_bin) + 1)
+        """Interval histogram; bin i counts intervals in [i * histogram_bin, (i + 1) * histogram_bin), the last bin
+        counts all longer intervals"""
+
+        self._timestamps = array("d", [0.0]) * history_size
+        self._rssi_values = array("b", [0]) * history_size
+        self._history_index = 0
+
+    def add(self, timestamp: float, rssi: int) -> None:
+
+        """Record one advertising event."""
+
+        if self.last_seen is not None:
+            interval = timestamp - self.last_seen
+            self.intervals.add(interval)
+            self.histogram[min(int(interval / self.histogram_bin), len(self.histogram) - 1)] += 1
+
+            missed = self._missed_in(interval)
+            self.missed += missed
+            if missed == 0:
+                self.clean_intervals.add(interval)
+        else:
+            self.first_seen = timestamp
+
+        self.last_seen = timestamp
+        self.advertisement_count += 1
+        self.rssi.add(rssi)
+
+        slot = self._history_index % len(self._timestamps)
+        self._timestamps[slot] = timestamp
+        self._rssi_values[slot] = max(-128, min(127, rssi))
+        self._history_index += 1
+
+    @property
+    def nominal_interval(self) -> float | None:
+
+        """
+        Advertising interval, in seconds: the expected interval if given, otherwise estimated from the intervals with
+        no missed event (the time between events is the interval plus a 0-10 ms random delay). Until enough
+        intervals have been received, the most common histogram bin is used.
+        """
+
+        if self.expected_interval is not None:
+            return self.expected_interval
+
+        if self.intervals.count == 0:
+            return None
+
+        if self.clean_intervals.count >= 10:
+            return max(self.clean_intervals.mean - ADV_DELAY_MEAN, self.histogram_bin)
+
+        mode_bin = max(range(len(self.histogram) - 1), key=self.histogram.__getitem__)
+        return max((mode_bin + 0.5) * self.histogram_bin - ADV_DELAY_MEAN, self.histogram_bin)
+
+    @property
+    def jitter(self) -> float:
+
+        """Standard deviation of the intervals with no missed event, in seconds."""
+
+        return self.clean_intervals.std
+
+    @property
+    def reception_rate(self) -> float:
+
+        """Fraction of the advertising events sent by the device that were received (estimated)."""
+
+        total = self.advertisement_count + self.missed
+        return self.advertisement_count / total if total else 0.0
+
+    def history(self) -> tuple[list[float], list[int]]:
+
+        """
+        Return the most recent advertising events, oldest first.
+
+        :return: Timestamps (time.monotonic()) and RSSI values
+        """
+
+        size = len(self._timestamps)
+        count = min(self._history_index, size)
+        start = self._history_index - count
+        slots = [(start + i) % size for i in range(count)]
+
+        return [self._timestamps[slot] for slot in slots], [self._rssi_values[slot] for slot in slots]
+
+    def histogram_bins(self) -> list[tuple[float, int]]:
+
+        """Return the non-empty histogram bins as (bin start in seconds, count) tuples."""
+
+        return [(i * self.histogram_bin, count) for i, count in enumerate(self.histogram) if count]
+
+    def _missed_in(self, interval: float) -> int:
+
+        """Estimate how many events were missed in an interval, from the nominal interval."""
+
+        nominal = self.expected_interval
+        if nominal is None:
+            # Estimate from the data seen so far; the first intervals are assumed to be complete
+            if self.intervals.count < 10:
+                return 0
+            nominal = self.nominal_interval
+
+        return max(round(interval / (nominal + ADV_DELAY_MEAN)) - 1, 0)
+
+    def summary(self) -> str:
+
+        """Return a one-line summary of the statistics."""
+
+        nominal = self.nominal_interval
+        return (f"{self.name : <30}{self.address : <20}{self.advertisement_count : >6} adv  "
+                f"interval {(nominal or 0) * 1000:7.1f} ms  jitter {self.jitter * 1000:5.1f} ms  "
+                f"missed {self.missed : >5} ({(1 - self.reception_rate) * 100:4.1f}%)  "
+                f"RSSI {self.rssi.mean:6.1f} dBm (sd {self.rssi.std:4.1f}, min {self.rssi.minimum}, max {self.rssi.maximum})"
+                f"{'' if self.interval_measurable else '  (not every advertisement reported)'}")
+
+
+class BLEAdvertisingMonitor:
+
+    """
+    Observes advertisements over time and computes per-device interval and RSSI statistics (see AdvertisingStats).
+
+    Reports received within a few milliseconds of each other are merged into one advertising event, so that scan
+    responses and the copies received on each advertising channel are not counted as separate events. Timestamps are
+    taken on the host when the report reaches Python, so the measured jitter includes some host and D-Bus latency.
+
+    On BlueZ, a report is a change of the device's D-Bus properties rather than a received advertisement. With
+    duplicate data enabled, BlueZ signals a repeated advertisement only if it carries manufacturer or service data;
+    otherwise only RSSI changes of 8 dBm or more are signalled. The statistics of devices whose advertisements carry
+    neither are therefore not advertising intervals, and their interval_measurable is False. The controller's own
+    duplicate filter, if BlueZ leaves it enabled, can drop further reports.
+    """
+
+    def __init__(self,
+                 addresses: list[str] = None,
+                 service_uuids: list[str] = None,
+                 expected_interval: float = None,
+                 history_size: int = DEFAULT_HISTORY_SIZE,
+                 histogram_bin: float = DEFAULT_HISTOGRAM_BIN,
+                 histogram_max: float = DEFAULT_HISTOGRAM_MAX,
+                 max_devices: int = DEFAULT_MAX_DEVICES) -> None:
+
+        """
+        Create a new (stopped) advertising monitor.
+
+        :param addresses: Only monitor devices with one of these addresses (None for all devices)
+
+        :param service_uuids: Only monitor devices advertising one of these service UUIDs
+
+        :param expected_interval: Configured advertising interval of the monitored devices, in seconds. Used to
+            estimate missed advertisements; estimated from the data if None.
+
+        :param history_size: Number of recent advertisements kept per device
+
+        :param histogram_bin: Width of an interval histogram bin, in seconds
+
+        :param histogram_max: Longest interval counted in its own histogram bin, in seconds
+
+        :param max_devices: Most devices tracked when addresses is None; the least recently seen device is dropped
+            to make room for a new one (devices with random addresses keep appearing)
+        """
+
+        self.addresses = addresses
+        self.service_uuids = service_uuids
+        self.expected_interval = expected_interval
+        self.history_size = history_size
+        self.histogram_bin = histogram_bin
+        self.histogram_max = histogram_max
+        self.max_devices = max_devices
+        self.start_time = None
+
+        self._address_set = BLEScanner._address_set(addresses)
+        self._stats = {}  # Address (upper case) -> AdvertisingStats
+        self._scanner = None
+        self._bluez = platform.system() == "Linux"
+
+    async def start(self) -> None:
+
+        """Start monitoring."""
+
+        if self._scanner is not None:
+            return
+
+        filters = BLEScanner._backend_filters(self.service_uuids, self.addresses)
+        filters.setdefault("bluez", {"filters": {}})["filters"]["DuplicateData"] = True
+
+        self._scanner = BleakScanner(detection_callback=self._detection_callback, **filters)
+        self.start_time = time.monotonic()
+        await self._scanner.start()
+
+    async def stop(self) -> None:
+
+        """Stop monitoring. Statistics remain available."""
+
+        if self._scanner is not None:
+            await self._scanner.stop()
+            self._scanner = None
+
+    async def __aenter__(self) -> "BLEAdvertisingMonitor":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.stop()
+
+    def stats(self, address: str) -> AdvertisingStats | None:
+
+        """
+        Return the statistics of a device.
+
+        :param address: Device address
+
+        :return: Statistics, or None if the device has not been seen
+        """
+
+        return self._stats.get(address.upper())
+
+    def all_stats(self) -> list[AdvertisingStats]:
+
+        """Return the statistics of all devices seen, most advertisements first."""
+
+        return sorted(self._stats.values(), reverse=True, key=lambda stats: stats.advertisement_count)
+
+    def reset(self) -> None:
+
+        """Discard all statistics (eg, after changing the device's advertising settings)."""
+
+        self._stats.clear()
+        self.start_time = time.monotonic()
+
+    def print_summary(self) -> None:
+
+        """Print a summary line for every device seen."""
+
+        print("%s: %d device(s)" % (self.__class__.__name__, len(self._stats)))
+        for stats in self.all_stats():
+            print(stats.summary())
+
+    def _detection_callback(self, device, advertisement_data) -> None:
+
+        now = time.monotonic()
+
+        if self._address_set is not None and device.address.upper() not in self._address_set:
+            return
+
+        address = device.address.upper()
+        stats = self._stats.get(address)
+
+        if stats is None:
+            if self._address_set is None and len(self._stats) >= self.max_devices:
+                del self._stats[min(self._stats, key=lambda key: self._stats[key].last_seen)]
+
+            stats = AdvertisingStats(address, self.history_size, self.histogram_bin, self.histogram_max, self.expected_interval)
+            self._stats[address] = stats
+        elif now - stats.last_seen < ADV_EVENT_MERGE_WINDOW:
+            return  # Another report of the same advertising event
+
+        if self._bluez and not (advertisement_data.manufacturer_data or advertisement_data.service_data):
+            stats.interval_measurable = False
+
+        if advertisement_data.local_name:
+            stats.name = BLEScanner._sanitize(advertisement_data.local_name)
+
+        stats.add(now, advertisement_data.rssi)
@@ -0,0 +1,339 @@
+#
+# Copyright (C) 2026, Dojo Five
+# All rights reserved.
+#
+
+import os
+import json
+import math
+import time
+import asyncio
+import platform
+from .ble_client import BLEClient
+from .nordic.ble_nus_service import BLENUSService, UART_TX_UUID, NUS_WINDOW
+from .nordic.ble_shell_service import BLEShellService
+from .nordic.ble_dfu_service import BLEDFUService, DFU_WINDOW
+from ...version import __version__
+
+DIS_MODEL_NUMBER_UUID = "2a24"
+RESPONSE_TIMEOUT      = 5.0   # Seconds to wait for an echo or a response before counting a failure
+THROUGHPUT_TIMEOUT    = 60.0  # Seconds to wait for the whole echo of a throughput run before counting a failure
+
+
+def percentile(sorted_samples: list[float], p: float) -> float | None:
+
+    """
+    Return a percentile of sorted samples, interpolating between the closest ranks.
+
+    :param sorted_samples: Samples in ascending order
+
+    :param p: Percentile (0 to 100)
+
+    :return: Percentile value, or None if there are no samples
+    """
+
+    if not sorted_samples:
+        return None
+
+    rank = (len(sorted_samples) - 1) * p / 100
+    lower = math.floor(rank)
+    upper = min(lower + 1, len(sorted_samples) - 1)
+
+    return sorted_samples[lower] + (sorted_samples[upper] - sorted_samples[lower]) * (rank - lower)
+
+
+class BenchmarkResult:
+
+    """Samples of one benchmark, with their distribution."""
+
+    def __init__(self, name: str, unit: str, samples: list[float], failures: int = 0, parameters: dict = None):
+
+        self.name = name
+        """Name of the benchmark"""
+        self.unit = unit
+        """Unit of the samples (eg, "ms" or "B/s")"""
+        self.samples = samples
+        """Measured values, in the order they were taken"""
+        self.failures = failures
+        """Number of iterations that failed (timeouts, errors) and produced no sample"""
+        self.parameters = parameters or {}
+        """Parameters the benchmark ran with (payload size, iterations, ...)"""
+
+    def percentile(self, p: float) -> float | None:
+
+        """Return a percentile of the samples (None if there are none)."""
+
+        return percentile(sorted(self.samples), p)
+
+    @property
+    def p50(self) -> float | None:
+
+        return self.percentile(50)
+
+    @property
+    def p95(self) -> float | None:
+
+        return self.percentile(95)
+
+    @property
+    def p99(self) -> float | None:
+
+        return self.percentile(99)
+
+    @property
+    def mean(self) -> float | None:
+
+        return sum(self.samples) / len(self.samples) if self.samples else None
+
+    def to_dict(self) -> dict:
+
+        """Return the result as a JSON-serializable dictionary."""
+
+        ordered = sorted(self.samples)
+
+        return {"name": self.name,
+                "unit": self.unit,
+                "count": len(ordered),
+                "failures": self.failures,
+                "min": ordered[0] if ordered else None,
+                "mean": self.mean,
+                "p50": percentile(ordered, 50),
+                "p95": percentile(ordered, 95),
+                "p99": percentile(ordered, 99),
+                "max": ordered[-1] if ordered else None,
+                "parameters": self.parameters,
+                "samples": self.samples}
+
+    def summary(self) -> str:
+
+        """Return a one-line summary of the result."""
+
+        if not self.samples:
+            return f"{self.name}: no samples ({self.failures} failures)"
+
+        return (f"{self.name}: n={len(self.samples)} p50={self.p50:.3f} p95={self.p95:.3f} p99={self.p99:.3f} "
+                f"{self.unit} ({self.failures} failures)")
+
+
+class BLEBenchmark:
+
+    """
+    Measures the throughput and latency of a connection to the demo firmware: NUS write throughput, NUS echo round
+    trips, SMP shell "hil ping" round trips, GATT reads and DFU uploads.
+
+    The client can be a real BLEClient or a LoopbackBLEClient, which benchmarks the host-side overhead of the SDK
+    without hardware. Results are collected in results and written to a JSON file by save().
+    """
+
+    def __init__(self, client: BLEClient, transport: str = "ble"):
+
+        """
+        :param client: Connected client
+
+        :param transport: Name of the transport, recorded in the results file (eg, "ble" or "loopback")
+        """
+
+        self.client = client
+        self.transport = transport
+
+        self.results = []
+        """BenchmarkResult of each benchmark run"""
+
+    async def nus_throughput(self,
+                             total_size: int = 16384,
+                             runs: int = 5,
+                             chunk_size: int = None,
+                             window: int = NUS_WINDOW) -> BenchmarkResult:
+
+        """
+        Measure delivered NUS throughput through a BLENUSStream: the data is streamed to the device, which echoes it,
+        and a run ends once the whole echo has been received and checked. A sample is total_size divided by the time
+        of the run, so it counts the data once although it crossed the link in both directions.
+
+        :param total_size: Number of bytes written per run
+
+        :param runs: Number of runs (one sample each). A run whose echo is lost or corrupted ends the benchmark, and
+                     it and the remaining runs are counted as failures.
+
+        :param chunk_size: Bytes per write (the largest write the link allows by default)
+
+        :param window: Maximum number of writes in flight
+
+        :return: Result, in bytes per second
+        """
+
+        chunk_size = chunk_size or self.client.max_write_size(UART_TX_UUID)
+        data = bytes(i % 256 for i in range(total_size))
+        samples = []
+        failures = 0
+
+        # Write-without-response calls complete once the host stack has queued the packets, so only the echo shows
+        # that the data was delivered
+        async with BLENUSService(self.client).open_stream(window, chunk_size) as stream:
+            for _ in range(runs):
+                start = time.perf_counter()
+                await stream.send(data)
+
+                try:
+                    echo = await stream.readexactly(total_size, THROUGHPUT_TIMEOUT)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError):
+                    echo = None
+
+                if echo != data:
+                    # The rest of a lost echo would be read as part of the next run, so stop here
+                    failures = runs - len(samples)
+                    break
+
+                samples.append(total_size / (time.perf_counter() - start))
+
+        return self._add(BenchmarkResult("nus_throughput", "B/s", samples, failures,
+                                         parameters={"total_size": total_size, "chunk_size": chunk_size,
+                                                     "window": window, "runs": runs}))
+
+    async def nus_echo_latency(self, iterations: int = 100, payload_size: int = 20) -> BenchmarkResult:
+
+        """
+        Measure the round trip of a NUS write to its echo.
+
+        :param iterations: Number of round trips
+
+        :param payload_size: Bytes written per round trip
+
+        :return: Result, in milliseconds
+        """
+
+        nus = BLENUSService(self.client)
+        samples = []
+        failures = 0
+
+        async with nus.received_notifications() as stream:
+            for i in range(iterations):
+                payload = bytes((i + n) % 256 for n in range(payload_size))
+                stream.clear()
+
+                # Notifications are timestamped with time.monotonic()
+                start = time.monotonic()
+                await self.client.write_gatt(UART_TX_UUID, payload, response=False)
+                echo = await stream.wait_for(lambda notification: notification.data == payload, RESPONSE_TIMEOUT)
+
+                if echo is None:
+                    failures += 1
+                else:
+                    samples.append((echo.timestamp - start) * 1000)
+
+        return self._add(BenchmarkResult("nus_echo_latency", "ms", samples, failures,
+                                         parameters={"iterations": iterations, "payload_size": payload_size}))
+
+    async def shell_ping_latency(self, iterations: int = 50) -> BenchmarkResult:
+
+        """
+        Measure the round trip of the SMP shell command "hil ping".
+
+        :param iterations: Number of round trips
+
+        :return: Result, in milliseconds
+        """
+
+        shell = BLEShellService(self.client)
+        samples = []
+        failures = 0
+
+        for _ in range(iterations):
+            start = time.perf_counter()
+            response = await shell.execute_command(["hil", "ping"])
+            elapsed = time.perf_counter() - start
+
+            if response is None or str(response.get("o", "")).strip() != "pong":
+                failures += 1
+            else:
+                samples.append(elapsed * 1000)
+
+        return self._add(BenchmarkResult("shell_ping_latency", "ms", samples, failures,
+                                         parameters={"iterations": iterations}))
+
+    async def gatt_read_latency(self, iterations: int = 100, char_uuid: str = DIS_MODEL_NUMBER_UUID) -> BenchmarkResult:
+
+        """
+        Measure the latency of GATT reads (without the read cache).
+
+        :param iterations: Number of reads
+
+        :param char_uuid: Characteristic to read (the DIS model number by default)
+
+        :return: Result, in milliseconds
+        """
+
+        samples = []
+
+        for _ in range(iterations):
+            start = time.perf_counter()
+            await self.client.read_gatt(char_uuid)
+            samples.append((time.perf_counter() - start) * 1000)
+
+        return self._add(BenchmarkResult("gatt_read_latency", "ms", samples,
+                                         parameters={"iterations": iterations, "char_uuid": char_uuid}))
+
+    async def dfu_throughput(self, image_path: str, runs: int = 1, window: int = DFU_WINDOW) -> BenchmarkResult:
+
+        """
+        Measure the DFU upload rate of an image to slot 1. Note that each run overwrites slot 1 (even if it holds the
+        image already).
+
+        :param image_path: Path of the image to upload
+
+        :param runs: Number of uploads (one sample each)
+
+        :param window: Maximum number of upload requests in flight
+
+        :return: Result, in bytes per second
+        """
+
+        dfu = BLEDFUService(self.client)
+        image_size = os.path.getsize(image_path)
+        samples = []
+        failures = 0
+
+        for _ in range(runs):
+            start = time.perf_counter()
+            if await dfu.image_upload(image_path, window=window, force=True):
+                samples.append(image_size / (time.perf_counter() - start))
+            else:
+                failures += 1
+
+        return self._add(BenchmarkResult("dfu_throughput", "B/s", samples, failures,
+                                         parameters={"image_size": image_size, "runs": runs, "window": window}))
+
+    def save(self, path: str, metadata: dict = None) -> None:
+
+        """
+        Write the results to a JSON file, for comparison across runs.
+
+        :param path: Path of the file
+
+        :param metadata: Optional extra information recorded with the results (eg, firmware version)
+        """
+
+        report = {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                  "transport": self.transport,
+                  "host": platform.node(),
+                  "python": platform.python_version(),
+                  "sdk_version": __version__,
+                  "metadata": metadata or {},
+                  "results": [result.to_dict() for result in self.results]}
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as report_file:
+            json.dump(report, report_file, indent=2)
+
+    def print_summary(self) -> None:
+
+        """Print a summary of the results."""
+
+        print(f"{self.__class__.__name__}: {self.transport} results")
+        for result in self.results:
+            print(f"  {result.summary()}")
+
+    def _add(self, result: BenchmarkResult) -> BenchmarkResult:
+
+        self.results.append(result)
+        return result
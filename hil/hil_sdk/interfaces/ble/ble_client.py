@@ -3,32 +3,76 @@
 # All rights reserved.
 #
 
+import sys
+import time
 import asyncio
+import logging
 import bleak
-from .ble_types import BLEAdvertisingDevice
+from .ble_types import BLEAdvertisingDevice, BLELinkParameters
+from .ble_gatt_cache import BLEGATTCache
+from .bluez_link import BlueZLinkControl, PHY_2M
+from .ble_notification_stream import BLENotificationStream, DEFAULT_QUEUE_SIZE, OVERFLOW_DROP_OLDEST
+
+try:
+    from bleak.backends.bluezdbus.manager import get_global_bluez_manager
+except ImportError:  # The BlueZ backend is only available on Linux
+    get_global_bluez_manager = None
+
+ATT_DEFAULT_MTU = 23  # Minimum ATT MTU, used until a larger one is negotiated
+ATT_HEADER_SIZE = 3   # Opcode and handle of a write or notification
 
 class BLEClient:
 
     """Provides an interface to the gateway's BLE stack."""
 
-    def __init__(self, address_or_device):
+    def __init__(self, address_or_device, gatt_cache: BLEGATTCache = None):
 
         """
         Construct a new BLE Client object.
 
         :param address_or_device: Client address to connect to, or BLEAdvertisingDevice object reference
+
+        :param gatt_cache: Optional GATT cache, used to skip service discovery when reconnecting to a known device
         """
 
         self.address_or_device = address_or_device
+        self.gatt_cache = gatt_cache
         self._client_obj = None
 
+        self.connect_time = None
+        """Seconds spent establishing the link of the last connection (the whole connection if the backend does not
+        report when the link came up)"""
+        self.discovery_time = None
+        """Seconds spent resolving the services of the last connection after the link came up (None if unknown)"""
+        self.used_gatt_cache = False
+        """True if the last connection reused services the backend had discovered before"""
+
+        # Connection parameter and PHY requests are only possible through the HCI on Linux
+        self._link_control = BlueZLinkControl() if sys.platform == "linux" and BlueZLinkControl.supported() else None
+        self._link_parameters = BLELinkParameters()
+
         # This dict holds the user's desired notification callbacks so we can translate out the backend object
         self._notify_callbacks = {}
 
+        # UUID -> set of BLENotificationStream receiving the characteristic's notifications
+        self._notify_streams = {}
+
+        # UUIDs whose notifications are enabled on the current connection
+        self._subscribed_uuids = set()
+
+        # Normalized UUID -> (time.monotonic() of the read, value), for reads made with a cache TTL
+        self._read_cache = {}
+
     async def connect(self, timeout: float = 10, retry_count: int = 5) -> bool:
 
         """
-        Attempt to connect the client
+        Attempt to connect the client. On a reconnect, notifications enabled with start_notify() or notifications()
+        are enabled again.
+
+        If the client has a GATT cache that knows the device and bleak still holds the services it discovered on a
+        previous connection (in this process), they are reused and checked against the device's firmware version; if the device changed, the services are discovered
+        again. The connect_time and discovery_time attributes report the latency of both phases, and used_gatt_cache
+        whether the cached services were reused.
 
         :param timeout: Timeout limit of scan operation
 
@@ -39,22 +83,113 @@ class BLEClient:
 
         for i in range(retry_count):
             try:
-                self._client_obj, self.address = BLEClient._get_backend_object(self.address_or_device)
-                await self._client_obj.connect(timeout=timeout)
+                self._client_obj, self.address = self._get_backend_object(self.address_or_device)
+                self._subscribed_uuids.clear()
+                self._read_cache.clear()
+                self._link_parameters = BLELinkParameters()
+
+                use_cache = self.gatt_cache is not None and self.gatt_cache.has(self.address)
+                await self._timed_connect(timeout, use_cache)
+
+                if self.gatt_cache is not None and not await self.gatt_cache.validate(self, fresh=not self.used_gatt_cache):
+                    # The cached services are stale (eg, new firmware): reconnect with a full discovery
+                    await self._client_obj.disconnect()
+                    self._client_obj, self.address = self._get_backend_object(self.address_or_device)
+                    await self._timed_connect(timeout, False)
+                    await self.gatt_cache.validate(self, fresh=True)
+
+                for uuid in self.get_notified_uuids():
+                    await self._client_obj.start_notify(uuid, self._notification_callback)
+                    self._subscribed_uuids.add(uuid)
+
                 return True
             except:
                 print(f"Connection attempt {i} failed, retrying...")
 
         return False
 
+    async def _timed_connect(self, timeout: float, use_cache: bool) -> None:
+
+        """
+        Connect the backend client, timing the link setup and the service resolution separately when the backend is
+        BlueZ: the link is up when the device's Connected property changes, and bleak's connect() returns once
+        ServicesResolved is set (or at once if it reuses the services it discovered before).
+        """
+
+        manager, device_path = await self._bluez_device()
+        watcher = None
+        link_up = None
+
+        def on_connected_changed(connected: bool) -> None:
+            nonlocal link_up
+            if connected and link_up is None:
+                link_up = time.monotonic()
+
+        if manager is not None:
+            try:
+                watcher = manager.add_device_watcher(device_path, on_connected_changed, lambda *args: None)
+            except bleak.exc.BleakError:
+                pass  # Not known to BlueZ yet; bleak looks it up from within connect()
+
+        # bleak only holds the services it discovered in this process, until BlueZ drops the device
+        cached = use_cache and manager is not None and device_path in getattr(manager, "_services_cache", {})
+
+        start = time.monotonic()
+        try:
+            await self._client_obj.connect(timeout=timeout, dangerous_use_bleak_cache=cached)
+        finally:
+            if watcher is not None:
+                manager.remove_device_watcher(watcher)
+        end = time.monotonic()
+
+        self.used_gatt_cache = cached
+
+        if link_up is None:
+            self.connect_time = end - start
+            self.discovery_time = None
+        else:
+            self.connect_time = link_up - start
+            self.discovery_time = end - link_up
+
+    async def _bluez_device(self) -> tuple[object, str] | tuple[None, None]:
+
+        """Return bleak's BlueZ manager and the D-Bus path of the device (None, None for other backends)."""
+
+        if get_global_bluez_manager is None or not isinstance(self._client_obj, bleak.BleakClient):
+            return None, None
+
+        try:
+            manager = await get_global_bluez_manager()
+        except Exception:
+            return None, None
+
+        if isinstance(self.address_or_device, BLEAdvertisingDevice):
+            details = self.address_or_device._backend_obj.details
+            if isinstance(details, dict) and "path" in details:
+                return manager, details["path"]
+
+        try:
+            adapter_path = manager.get_default_adapter()
+        except bleak.exc.BleakError:
+            return None, None
+
+        return manager, f"{adapter_path}/dev_{self.address.upper().replace(':', '_')}"
+
     def is_connected(self) -> bool:
 
         """
-        Return an is_connected future
+        Return the connection state (see the connected property)
 
         :return: True on connected, false otherwise
         """
-        return self._client_obj.is_connected()
+        return self.connected
+
+    @property
+    def connected(self) -> bool:
+
+        """True while the client is connected."""
+
+        return self._client_obj is not None and self._client_obj.is_connected
 
     async def disconnect(self) -> bool:
 
@@ -65,22 +200,182 @@ class BLEClient:
         """
 
         if self._client_obj:
+            self._subscribed_uuids.clear()
+            self._read_cache.clear()
             return await self._client_obj.disconnect()
 
         return False
 
-    async def read_gatt(self, char_uuid: str) -> bytearray:
+    @property
+    def mtu(self) -> int:
+
+        """
+        Negotiated ATT MTU of the connection.
+
+        The MTU exchange is initiated by the OS stack when connecting (BlueZ asks for 517 bytes, see ExchangeMTU in
+        /etc/bluetooth/main.conf) and can only happen once per connection, so there is nothing to request; this only
+        reads back the outcome. On BlueZ older than 5.62 the MTU cannot be read and the minimum (23) is returned.
+        """
+
+        if not self.connected:
+            return ATT_DEFAULT_MTU
+
+        if sys.platform != "linux":
+            return self._client_obj.mtu_size
+
+        # BlueZ reports the MTU per characteristic (bleak's mtu_size always returns the minimum)
+        sizes = [characteristic.max_write_without_response_size
+                 for service in self._client_obj.services for characteristic in service.characteristics]
+
+        return max(max(sizes, default=0) + ATT_HEADER_SIZE, ATT_DEFAULT_MTU)
+
+    def max_write_size(self, char_uuid: str = None) -> int:
+
+        """
+        Return the largest value that fits in a single write (or notification) on the connection.
+
+        :param char_uuid: Optional UUID of the characteristic to be written
+
+        :return: Maximum payload size, in bytes
+        """
+
+        if char_uuid is not None and self.connected:
+            characteristic = self._client_obj.services.get_characteristic(bleak.uuids.normalize_uuid_str(char_uuid))
+            if characteristic is not None:
+                return max(characteristic.max_write_without_response_size, ATT_DEFAULT_MTU - ATT_HEADER_SIZE)
+
+        return self.mtu - ATT_HEADER_SIZE
+
+    async def set_connection_parameters(self,
+                                        min_interval_ms: float = 7.5,
+                                        max_interval_ms: float = 15,
+                                        latency: int = 0,
+                                        supervision_timeout_ms: int = 4000) -> bool:
+
+        """
+        Request new connection parameters. Short intervals increase throughput at the cost of power.
+        Only supported on Linux (BlueZ), where it requires the CAP_NET_RAW capability.
+
+        :param min_interval_ms: Minimum acceptable connection interval (7.5 ms to 4 s)
+
+        :param max_interval_ms: Maximum acceptable connection interval (7.5 ms to 4 s)
+
+        :param latency: Peripheral latency, in connection events
+
+        :param supervision_timeout_ms: Supervision timeout (100 ms to 32 s)
+
+        :return: True if the peripheral accepted the update (see get_link_parameters() for the negotiated values)
+        """
+
+        result = await self._link_request("update_connection", min_interval_ms, max_interval_ms, latency, supervision_timeout_ms)
+        if result is None:
+            return False
+
+        self._link_parameters.interval_ms, self._link_parameters.latency, self._link_parameters.supervision_timeout_ms = result
+        return True
+
+    async def set_phy(self, tx_phy: int = PHY_2M, rx_phy: int = PHY_2M) -> bool:
+
+        """
+        Request the PHYs of the connection (eg, the 2M PHY to double the raw bit rate).
+        Only supported on Linux (BlueZ), where it requires the CAP_NET_RAW capability.
+
+        :param tx_phy: Preferred transmit PHY (PHY_1M, PHY_2M or PHY_CODED from bluez_link)
+
+        :param rx_phy: Preferred receive PHY
+
+        :return: True if the requested PHYs are in use afterwards
+        """
+
+        result = await self._link_request("set_phy", tx_phy, rx_phy)
+        if result is None:
+            return False
+
+        self._link_parameters.tx_phy, self._link_parameters.rx_phy = result
+        return result == (tx_phy, rx_phy)
+
+    async def get_link_parameters(self) -> BLELinkParameters:
+
+        """
+        Return the negotiated parameters of the connection. The PHYs are read from the controller; the connection
+        interval, latency and supervision timeout are only known after set_connection_parameters().
+
+        :return: Link parameters (unknown values are None)
+        """
+
+        self._link_parameters.mtu = self.mtu
+
+        phys = await self._link_request("read_phy")
+        if phys is not None:
+            self._link_parameters.tx_phy, self._link_parameters.rx_phy = phys
+
+        return self._link_parameters
+
+    async def _link_request(self, name: str, *args):
+
+        """Run a blocking BlueZLinkControl request for the connected device, returning None on failure."""
+
+        if self._link_control is None:
+            logging.error(f"{self.__class__.__name__}: {name} is not supported on this platform")
+            return None
+
+        if not self.connected:
+            logging.error(f"{self.__class__.__name__}: {name} requires a connection")
+            return None
+
+        try:
+            return await asyncio.to_thread(getattr(self._link_control, name), self.address, *args)
+        except OSError as e:
+            logging.error(f"{self.__class__.__name__}: {name} failed: {e}")
+            return None
+
+    async def read_gatt(self, char_uuid: str, cache_ttl: float = None) -> bytearray:
 
         """
         Read a GATT characteristic value by UUID
 
         :param char_uuid: Full UUID of characteristic
 
+        :param cache_ttl: Optional time (in seconds) a value read on this connection can be reused without reading it
+            again, for static characteristics such as the DIS strings
+
         :return: Characteristic value
         """
 
         if self._client_obj:
-            return await self._client_obj.read_gatt_char(bleak.uuids.normalize_uuid_str(char_uuid))
+            uuid = bleak.uuids.normalize_uuid_str(char_uuid)
+
+            if cache_ttl is not None and uuid in self._read_cache:
+                timestamp, value = self._read_cache[uuid]
+                if time.monotonic() - timestamp <= cache_ttl:
+                    return value
+
+            value = await self._client_obj.read_gatt_char(uuid)
+
+            if cache_ttl is not None:
+                self._read_cache[uuid] = (time.monotonic(), value)
+
+            return value
+
+    async def read_many(self, char_uuids: list[str], cache_ttl: float = None) -> dict[str, bytearray]:
+
+        """
+        Read several GATT characteristics.
+
+        The reads are issued concurrently, so the backend can queue the ATT requests back to back instead of waiting
+        for each result before sending the next request. (ATT Read Multiple is not exposed by bleak or BlueZ's D-Bus
+        API, so each characteristic still takes its own request.)
+
+        :param char_uuids: UUIDs of the characteristics
+
+        :param cache_ttl: Optional read cache TTL (in seconds), see read_gatt()
+
+        :return: Dictionary of values, keyed by the UUIDs as given
+        """
+
+        values = await asyncio.gather(*(self.read_gatt(uuid, cache_ttl) for uuid in char_uuids))
+
+        return dict(zip(char_uuids, values))
 
     async def write_gatt(self, char_uuid: str, data, response=False) -> None:
 
@@ -111,13 +406,75 @@ class BLEClient:
 
             uuid = char_uuid.lower()
             self._notify_callbacks[uuid] = callback
-            return await self._client_obj.start_notify(uuid, self._notification_callback)
+
+            # Already enabled on this connection, only the callback changes
+            if uuid in self._subscribed_uuids:
+                return
+
+            await self._client_obj.start_notify(uuid, self._notification_callback)
+            self._subscribed_uuids.add(uuid)
+
+    def notifications(self,
+                      char_uuid: str,
+                      maxsize: int = DEFAULT_QUEUE_SIZE,
+                      overflow: str = OVERFLOW_DROP_OLDEST) -> BLENotificationStream:
+
+        """
+        Return a stream of the notifications of a characteristic, to be awaited instead of handled in a callback.
+        The stream subscribes when started (or entered with async with) and can be used alongside start_notify().
+
+        :param char_uuid: Full UUID of characteristic
+
+        :param maxsize: Maximum number of notifications queued in the stream
+
+        :param overflow: What to discard when the queue is full (OVERFLOW_DROP_OLDEST or OVERFLOW_DROP_NEWEST)
+
+        :return: Notification stream (not started)
+        """
+
+        return BLENotificationStream(self, char_uuid, maxsize, overflow)
+
+    async def _add_notification_stream(self, stream: BLENotificationStream) -> None:
+
+        """
+        Deliver a characteristic's notifications to a stream, enabling them if needed (see notifications()).
+        Other stream types (eg, BLENUSStream) only need a uuid attribute and a _put(data) method.
+        """
+
+        self._notify_streams.setdefault(stream.uuid, set()).add(stream)
+
+        if self._client_obj and stream.uuid not in self._subscribed_uuids:
+            await self._client_obj.start_notify(stream.uuid, self._notification_callback)
+            self._subscribed_uuids.add(stream.uuid)
+
+    async def _remove_notification_stream(self, stream: BLENotificationStream) -> None:
+
+        """Stop delivering notifications to a stream, disabling them if nothing else listens."""
+
+        streams = self._notify_streams.get(stream.uuid, set())
+        streams.discard(stream)
+
+        if streams or stream.uuid in self._notify_callbacks:
+            return
+
+        self._notify_streams.pop(stream.uuid, None)
+
+        if stream.uuid in self._subscribed_uuids:
+            self._subscribed_uuids.discard(stream.uuid)
+            if self.connected:
+                await self._client_obj.stop_notify(stream.uuid)
 
     def get_notified_uuids(self):
 
         """Return a list of the UUIDs that are currently subscribed for notifications"""
 
-        return list(self._notify_callbacks.keys())
+        return list(self._notify_callbacks.keys() | self._notify_streams.keys())
+
+    def get_notify_callback(self, char_uuid: str):
+
+        """Return the callback registered for notifications on a characteristic, or None"""
+
+        return self._notify_callbacks.get(char_uuid.lower())
 
     def _notification_callback(self, characteristic: bleak.BleakGATTCharacteristic, value: bytearray):
 
@@ -125,8 +482,13 @@ class BLEClient:
         the same, even if the BLE backend changes."""
 
         uuid = characteristic.uuid.lower()
-        user_callback = self._notify_callbacks[uuid]
-        user_callback(uuid, value)
+
+        for stream in self._notify_streams.get(uuid, ()):
+            stream._put(value)
+
+        user_callback = self._notify_callbacks.get(uuid)
+        if user_callback:
+            user_callback(uuid, value)
 
     def lookup_uuid_name(self, char_uuid: str):
         """
@@ -0,0 +1,207 @@
+#
+# Copyright (C) 2026, Dojo Five
+# All rights reserved.
+#
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from collections.abc import Awaitable, Callable
+from .ble_client import BLEClient
+from .ble_gatt_cache import BLEGATTCache
+from .ble_types import BLEAdvertisingDevice
+
+
+class BLEConnectionPool:
+
+    """
+    Keeps one live connection per device address, shared by the tests of a session, so that tests do not pay for a
+    scan, a connection and GATT service discovery each time.
+
+    acquire() hands out the pooled BLEClient after checking that it is still connected, and transparently reconnects
+    it if the link dropped (eg, because a previous test reset the device); notifications enabled on the client are
+    restored on reconnect. Tests that disconnect or reset the device on purpose should request an exclusive
+    connection, which is a fresh client that is not shared and is disconnected on release.
+
+    Connections to different devices can be requested concurrently (eg, one task per DUT), but the connection
+    attempts themselves are serialized: BlueZ handles a single pending LE connection at a time and fails the others.
+
+    Must be used from a single event loop.
+    """
+
+    def __init__(self,
+                 device_lookup: Callable[[str], Awaitable[BLEAdvertisingDevice | None]] = None,
+                 connect_timeout: float = 10,
+                 retry_count: int = 5,
+                 gatt_cache: BLEGATTCache = None) -> None:
+
+        """
+        Create a new connection pool.
+
+        :param device_lookup: Optional coroutine function that returns the advertising device for an address (eg,
+            BLEDeviceCache.wait_for). Connecting through the device object avoids a discovery scan by the backend.
+            Devices it does not find are not connected: connecting by address would start such a scan, which fails
+            while the lookup's own scan is running.
+
+        :param connect_timeout: Timeout of a connection attempt (in seconds)
+
+        :param retry_count: Number of connection attempts
+
+        :param gatt_cache: Optional GATT cache given to the clients, to skip service discovery on reconnects
+        """
+
+        self.device_lookup = device_lookup
+        self.connect_timeout = connect_timeout
+        self.retry_count = retry_count
+        self.gatt_cache = gatt_cache
+
+        self.connect_count = 0
+        """Number of new connections made"""
+        self.reconnect_count = 0
+        """Number of pooled connections that had dropped and were reconnected"""
+        self.reuse_count = 0
+        """Number of times a live pooled connection was handed out"""
+
+        self._clients = {}     # Address (upper case) -> pooled BLEClient
+        self._exclusive = set()
+        self._locks = {}       # Address (upper case) -> asyncio.Lock
+        self._connect_lock = asyncio.Lock()
+
+    async def acquire(self, address: str, exclusive: bool = False) -> BLEClient | None:
+
+        """
+        Return a connected client for a device.
+
+        :param address: Device address
+
+        :param exclusive: True for a fresh connection that is not shared with other users. The pooled connection to
+            the device, if any, is closed first (it is reopened by the next non-exclusive acquire()).
+
+        :return: Connected client, or None if the device could not be connected
+        """
+
+        key = address.upper()
+
+        async with self._lock(key):
+
+            client = self._clients.get(key)
+
+            if exclusive:
+                if client is not None and client.connected:
+                    await client.disconnect()
+
+                device = await self._lookup(address)
+                if device is None:
+                    return None
+
+                client = BLEClient(device, gatt_cache=self.gatt_cache)
+                if not await self._connect(client, address):
+                    return None
+
+                self._exclusive.add(client)
+                return client
+
+            if client is not None and client.connected:
+                self.reuse_count += 1
+                return client
+
+            if client is not None:
+                logging.info(f"{self.__class__.__name__}: connection to {address} dropped, reconnecting")
+
+            device = await self._lookup(address)
+            if device is None:
+                return None
+
+            if client is None:
+                client = BLEClient(device, gatt_cache=self.gatt_cache)
+                self._clients[key] = client
+            else:
+                client.address_or_device = device
+                self.reconnect_count += 1
+
+            if not await self._connect(client, address):
+                return None
+
+            return client
+
+    async def release(self, client: BLEClient) -> None:
+
+        """
+        Return a client to the pool. Exclusive clients are disconnected; pooled clients stay connected.
+
+        :param client: Client returned by acquire()
+        """
+
+        if client in self._exclusive:
+            self._exclusive.discard(client)
+            if client.connected:
+                await client.disconnect()
+
+    @asynccontextmanager
+    async def connection(self, address: str, exclusive: bool = False):
+
+        """
+        Context manager form of acquire() and release():
+
+            async with pool.connection(address) as client:
+                ...
+        """
+
+        client = await self.acquire(address, exclusive)
+        try:
+            yield client
+        finally:
+            if client is not None:
+                await self.release(client)
+
+    async def close(self) -> None:
+
+        """Disconnect all clients (pooled and exclusive)."""
+
+        for client in list(self._clients.values()) + list(self._exclusive):
+            if client.connected:
+                await client.disconnect()
+
+        self._clients.clear()
+        self._exclusive.clear()
+
+    def _lock(self, key: str) -> asyncio.Lock:
+
+        """Return the lock serializing connection changes to one device."""
+
+        if key not in self._locks:
+            self._locks[key] = asyncio.Lock()
+
+        return self._locks[key]
+
+    async def _lookup(self, address: str) -> BLEAdvertisingDevice | str | None:
+
+        """Return the device object to connect to (the address if there is no device lookup), or None if the lookup
+        did not find the device."""
+
+        if self.device_lookup is None:
+            return address
+
+        device = await self.device_lookup(address)
+        if device is None:
+            logging.error(f"{self.__class__.__name__}: {address} not found by the device lookup")
+
+        return device
+
+    async def _connect(self, client: BLEClient, address: str) -> bool:
+
+        """Connect a client and count the connection."""
+
+        async with self._connect_lock:
+            connected = await client.connect(timeout=self.connect_timeout, retry_count=self.retry_count)
+
+        if not connected:
+            logging.error(f"{self.__class__.__name__}: unable to connect to {address}")
+            return False
+
+        self.connect_count += 1
+        services = "cached" if client.used_gatt_cache else "discovered"
+        if client.discovery_time is not None:
+            services += f" in {client.discovery_time:.3f} s"
+        logging.info(f"{self.__class__.__name__}: connected to {address} in {client.connect_time:.3f} s ({services} services)")
+        return True
@@ -0,0 +1,209 @@
+#
+# Copyright (C) 2026, Dojo Five
+# All rights reserved.
+#
+
+import time
+import asyncio
+from typing import Callable
+from bleak import BleakScanner
+from .ble_scanner import BLEScanner
+from .ble_types import BLEAdvertisingDevice
+
+DEFAULT_WAIT_TIMEOUT = 10.0  # Seconds to wait for a device by default
+
+
+class BLECacheEntry:
+
+    """Latest information about a device seen by a BLEDeviceCache."""
+
+    def __init__(self, device: BLEAdvertisingDevice, advertisement_data, timestamp: float):
+
+        self.device = device
+        """Latest advertising device (name, RSSI and service UUIDs of the last advertisement)"""
+        self.advertisement_data = advertisement_data
+        """Latest backend advertisement data (manufacturer data, service data, TX power, ...)"""
+        self.first_seen = timestamp
+        """Time (time.monotonic()) of the first advertisement received from the device"""
+        self.last_seen = timestamp
+        """Time (time.monotonic()) of the last advertisement received from the device"""
+        self.advertisement_count = 1
+        """Number of advertisements received from the device"""
+
+
+class BLEDeviceCache:
+
+    """
+    Runs a single background BLE scan (typically for a whole test session) and keeps the latest advertisement of
+    every device in range, keyed by address. Device lookups are answered from the cache, or as soon as the next
+    matching advertisement arrives, instead of starting a new scan each time.
+
+    Must be started (and awaited) from the event loop it is used on.
+    """
+
+    def __init__(self, service_uuids: list[str] = None, addresses: list[str] = None) -> None:
+
+        """
+        Create a new (stopped) device cache.
+
+        :param service_uuids: Only cache devices advertising one of these service UUIDs (filtered by the BLE stack)
+
+        :param addresses: Only cache devices with one of these addresses
+        """
+
+        self.service_uuids = service_uuids
+        self.addresses = addresses
+        self._address_set = BLEScanner._address_set(addresses)
+        self._entries = {}   # Address (upper case) -> BLECacheEntry
+        self._waiters = []   # (predicate, since, future) for pending wait_for() calls
+        self._scanner = None
+
+    async def start(self) -> None:
+
+        """Start the background scan."""
+
+        if self._scanner is None:
+            self._scanner = BleakScanner(detection_callback=self._detection_callback,
+                                         **BLEScanner._backend_filters(self.service_uuids, self.addresses))
+            await self._scanner.start()
+
+    async def stop(self) -> None:
+
+        """Stop the background scan. Pending waits are cancelled; cached entries remain available."""
+
+        if self._scanner is not None:
+            await self._scanner.stop()
+            self._scanner = None
+
+        for _, _, future in self._waiters:
+            future.cancel()
+        self._waiters.clear()
+
+    async def __aenter__(self) -> "BLEDeviceCache":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.stop()
+
+    @property
+    def running(self) -> bool:
+
+        """True while the background scan is running."""
+
+        return self._scanner is not None
+
+    def get(self, address: str) -> BLECacheEntry | None:
+
+        """
+        Return the cached entry of a device.
+
+        :param address: Device address
+
+        :return: Cache entry, or None if the device has not been seen
+        """
+
+        return self._entries.get(address.upper())
+
+    def devices(self, max_age: float = None) -> list[BLEAdvertisingDevice]:
+
+        """
+        Return the devices in the cache, strongest signal first.
+
+        :param max_age: Only return devices seen within this many seconds (None for all devices)
+
+        :return: List of devices
+        """
+
+        now = time.monotonic()
+        entries = [entry for entry in self._entries.values() if max_age is None or now - entry.last_seen <= max_age]
+        entries.sort(reverse=True, key=lambda entry: entry.device.rssi)
+
+        return [entry.device for entry in entries]
+
+    async def wait_for(self, address: str, timeout: float = DEFAULT_WAIT_TIMEOUT, since: float = None) -> BLEAdvertisingDevice | None:
+
+        """
+        Return a device from the cache, or wait for its next advertisement.
+
+        :param address: Device address
+
+        :param timeout: Maximum number of seconds to wait
+
+        :param since: Optional time (time.monotonic()) before which cached advertisements are ignored, eg the time
+            of a reset, so that only advertisements sent after it are accepted
+
+        :return: The device, or None if it was not seen before the timeout expired
+        """
+
+        address = address.upper()
+
+        return await self.wait_for_match(lambda device: device.address.upper() == address, timeout, since)
+
+    async def wait_for_match(self,
+                             filter: Callable[[BLEAdvertisingDevice], bool],
+                             timeout: float = DEFAULT_WAIT_TIMEOUT,
+                             since: float = None) -> BLEAdvertisingDevice | None:
+
+        """
+        Return the first cached device accepted by a filter, or wait for the next advertisement it accepts.
+
+        :param filter: Filter function (return True to accept a device)
+
+        :param timeout: Maximum number of seconds to wait
+
+        :param since: Optional time (time.monotonic()) before which cached advertisements are ignored
+
+        :return: The device, or None if no device was accepted before the timeout expired
+        """
+
+        for entry in self._entries.values():
+            if (since is None or entry.last_seen >= since) and filter(entry.device):
+                return entry.device
+
+        if not self.running:
+            return None
+
+        future = asyncio.get_running_loop().create_future()
+        waiter = (filter, since, future)
+        self._waiters.append(waiter)
+
+        try:
+            return await asyncio.wait_for(future, timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def clear(self) -> None:
+
+        """Forget all cached devices (pending waits are not affected)."""
+
+        self._entries.clear()
+
+    def _detection_callback(self, device, advertisement_data) -> None:
+
+        """Update the cache with a received advertisement and resolve the waits it satisfies."""
+
+        if self._address_set is not None and device.address.upper() not in self._address_set:
+            return
+
+        now = time.monotonic()
+        advertising_device = BLEScanner._to_advertising_device(device, advertisement_data)
+        address = advertising_device.address.upper()
+
+        entry = self._entries.get(address)
+        if entry is None:
+            self._entries[address] = BLECacheEntry(advertising_device, advertisement_data, now)
+        else:
+            entry.device = advertising_device
+            entry.advertisement_data = advertisement_data
+            entry.last_seen = now
+            entry.advertisement_count += 1
+
+        for waiter in list(self._waiters):
+            filter, since, future = waiter
+            if not future.done() and (since is None or now >= since) and filter(advertising_device):
+                future.set_result(advertising_device)
+                self._waiters.remove(waiter)
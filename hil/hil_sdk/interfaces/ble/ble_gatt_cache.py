@@ -0,0 +1,162 @@
+#
+# Copyright (C) 2026, Dojo Five
+# All rights reserved.
+#
+
+import os
+import json
+import time
+import logging
+
+DEFAULT_GATT_CACHE_PATH    = os.path.join(os.path.expanduser("~"), ".cache", "hil_sdk", "gatt_cache.json")
+DIS_FIRMWARE_REVISION_UUID = "00002a26-0000-1000-8000-00805f9b34fb"
+
+
+class BLEGATTCache:
+
+    """
+    Remembers the GATT database (services, characteristics, descriptors, handles and properties) of each device,
+    together with the firmware version it was discovered with, so that a reconnecting BLEClient can skip service
+    discovery.
+
+    Only bleak can hand out services without a discovery, and only those it discovered earlier in the same process
+    (dangerous_use_bleak_cache on BlueZ; they are forgotten when BlueZ drops the device). When a client with a cache
+    reconnects to a known device whose services bleak still holds, it reuses them, then reads the firmware version
+    characteristic (the DIS firmware revision by default) and compares it with the cached record. If it differs, for
+    example after a DFU, the record is replaced and the client reconnects with a full discovery. After a full
+    discovery the services are compared with the record, and the version is only read when the record must be
+    (re)written, so a connection costs no extra ATT request unless the cached services are reused.
+    """
+
+    def __init__(self, cache_path: str = DEFAULT_GATT_CACHE_PATH, version_uuid: str = DIS_FIRMWARE_REVISION_UUID):
+
+        """
+        Create a new GATT cache.
+
+        :param cache_path: Path of the JSON file holding the records (None to keep them in memory only)
+
+        :param version_uuid: UUID of the characteristic holding the firmware version
+        """
+
+        self.cache_path = cache_path
+        self.version_uuid = version_uuid
+        self._records = self._load()
+
+    def get(self, address: str) -> dict | None:
+
+        """
+        Return the cached record of a device.
+
+        :param address: Device address
+
+        :return: Dictionary with the "version" and "services" of the device, or None if the device is unknown
+        """
+
+        return self._records.get(address.upper())
+
+    def has(self, address: str) -> bool:
+
+        """Return True if the GATT database of a device is cached."""
+
+        return address.upper() in self._records
+
+    def invalidate(self, address: str) -> None:
+
+        """Forget the cached record of a device."""
+
+        if self._records.pop(address.upper(), None) is not None:
+            self._save()
+
+    async def validate(self, client, fresh: bool) -> bool:
+
+        """
+        Check the services of a connected client against the cached record, and record them.
+
+        :param client: Connected BLEClient
+
+        :param fresh: True if the services were just discovered, False if they came from the backend's cache
+
+        :return: True if the client's services can be used, False if they must be discovered again
+        """
+
+        address = client.address.upper()
+        record = self._records.get(address)
+
+        if not fresh:
+            # The services are the ones bleak discovered before, so only a firmware change can have made them stale
+            version = await self._read_version(client)
+            if record is not None and version is not None and record["version"] == version:
+                return True
+
+            logging.info(f"{self.__class__.__name__}: {address} changed (version {record and record['version']} -> {version}), "
+                         "discovering services again")
+            self.invalidate(address)
+            return False
+
+        services = self._snapshot(client._client_obj.services)
+
+        # A stale version is caught by the next reuse of the services, which then discovers them again
+        if record is None or record["version"] is None or record["services"] != services:
+            version = await self._read_version(client)
+            self._records[address] = {"version": version, "services": services, "updated_at": time.time()}
+            self._save()
+
+        return True
+
+    async def _read_version(self, client) -> str | None:
+
+        """Read the firmware version of a connected device (None if it cannot be read)."""
+
+        try:
+            return bytes(await client.read_gatt(self.version_uuid)).decode(errors="replace")
+        except Exception:
+            return None
+
+    @staticmethod
+    def _snapshot(services) -> list[dict]:
+
+        """Convert a backend service collection into a JSON-serializable description."""
+
+        snapshot = []
+
+        for service in sorted(services, key=lambda service: service.handle):
+            characteristics = []
+
+            for characteristic in sorted(service.characteristics, key=lambda characteristic: characteristic.handle):
+                characteristics.append({"uuid": characteristic.uuid,
+                                        "handle": characteristic.handle,
+                                        "properties": sorted(characteristic.properties),
+                                        "descriptors": sorted([[descriptor.uuid, descriptor.handle]
+                                                               for descriptor in characteristic.descriptors],
+                                                              key=lambda descriptor: descriptor[1])})
+
+            snapshot.append({"uuid": service.uuid, "handle": service.handle, "characteristics": characteristics})
+
+        return snapshot
+
+    def _load(self) -> dict:
+
+        """Load the cache file (an empty cache if there is none)."""
+
+        if self.cache_path is None:
+            return {}
+
+        try:
+            with open(self.cache_path, "r") as cache_file:
+                return json.load(cache_file)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self) -> None:
+
+        """Write the cache file atomically."""
+
+        if self.cache_path is None:
+            return
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.cache_path)), exist_ok=True)
+
+        temp_path = self.cache_path + ".tmp"
+        with open(temp_path, "w") as cache_file:
+            json.dump(self._records, cache_file, indent=2)
+        os.replace(temp_path, self.cache_path)
@@ -0,0 +1,308 @@
+#
+# Copyright (C) 2026, Dojo Five
+# All rights reserved.
+#
+
+import time
+import asyncio
+import hashlib
+import bleak
+import cbor2
+from .ble_client import BLEClient
+from .nordic.ble_nus_service import UART_TX_UUID, UART_RX_UUID
+from .nordic.ble_smp_service import *
+
+LOOPBACK_ADDRESS = "00:00:00:00:00:00"
+LOOPBACK_MTU     = 247  # ATT MTU reported by the loopback peripheral
+
+DIS_SERVICE_UUID = "0000180a-0000-1000-8000-00805f9b34fb"
+NUS_SERVICE_UUID = "6e400001-b5a3-f393-e0a9-e50e24dcca9e"
+SMP_SERVICE_UUID = "8d53dc1d-1db7-4cd3-868b-8a527460aa84"
+
+# DIS strings of the demo firmware, by characteristic UUID
+DEMO_DIS_VALUES = {
+    "2a24": b"EmbedOps HIL Demo Device",  # Model number
+    "2a29": b"Dojo Five",                 # Manufacturer name
+    "2a26": b"0.2",                       # Firmware revision
+    "2a27": b"nRF5340 DK",                # Hardware revision
+}
+
+MGMT_ERR_ENOMEM  = 2  # SMP error codes
+MGMT_ERR_ENOTSUP = 8
+
+LOOPBACK_SMP_BUFFER_SIZE  = 512  # SMP buffer parameters reported by the loopback peripheral
+LOOPBACK_SMP_BUFFER_COUNT = 4
+
+
+class LoopbackCharacteristic:
+
+    """Characteristic of the loopback peripheral (mimics bleak's BleakGATTCharacteristic)."""
+
+    def __init__(self, uuid: str, handle: int, properties: list[str], mtu: int):
+
+        self.uuid = uuid
+        self.handle = handle
+        self.properties = properties
+        self.descriptors = []
+        self.max_write_without_response_size = mtu - 3
+
+
+class LoopbackService:
+
+    """Service of the loopback peripheral (mimics bleak's BleakGATTService)."""
+
+    def __init__(self, uuid: str, handle: int, characteristics: list[LoopbackCharacteristic]):
+
+        self.uuid = uuid
+        self.handle = handle
+        self.characteristics = characteristics
+
+
+class LoopbackServiceCollection(list):
+
+    """Services of the loopback peripheral (mimics bleak's BleakGATTServiceCollection)."""
+
+    def get_characteristic(self, uuid: str) -> LoopbackCharacteristic | None:
+
+        for service in self:
+            for characteristic in service.characteristics:
+                if characteristic.uuid == uuid:
+                    return characteristic
+
+        return None
+
+
+class LoopbackPeripheral:
+
+    """
+    In-process stand-in for a bleak client connected to the demo firmware. It answers DIS reads, echoes NUS writes
+    and handles the SMP commands used by the SDK's services (shell, OS echo, image state, upload and erase).
+
+    Responses are delivered from the event loop after a configurable delay, like notifications from a real backend.
+    With no delay, it measures the host-side overhead of the SDK.
+    """
+
+    def __init__(self, address: str = LOOPBACK_ADDRESS, latency: float = 0.0, mtu: int = LOOPBACK_MTU, dis_values: dict = None):
+
+        """
+        :param address: Address reported by the peripheral
+
+        :param latency: Delay (in seconds) before responses and notifications are delivered, emulating the link
+
+        :param mtu: ATT MTU reported by the peripheral
+
+        :param dis_values: DIS strings by 16 bit UUID (the demo firmware's by default)
+        """
+
+        self.address = address
+        self.latency = latency
+        self.mtu_size = mtu
+        self.is_connected = False
+
+        self._callbacks = {}
+        self._boot_time = time.monotonic()
+        self._upload = bytearray()
+        self._upload_size = 0
+        self._upload_sha = b""
+        self._upload_hash = b""
+
+        self._values = {bleak.uuids.normalize_uuid_str(uuid): value
+                        for uuid, value in (dis_values or DEMO_DIS_VALUES).items()}
+
+        handle = iter(range(1, 0x10000))
+        self.services = LoopbackServiceCollection([
+            LoopbackService(DIS_SERVICE_UUID, next(handle),
+                            [LoopbackCharacteristic(uuid, next(handle), ["read"], mtu) for uuid in self._values]),
+            LoopbackService(NUS_SERVICE_UUID, next(handle),
+                            [LoopbackCharacteristic(UART_TX_UUID, next(handle), ["write-without-response", "write"], mtu),
+                             LoopbackCharacteristic(UART_RX_UUID, next(handle), ["notify"], mtu)]),
+            LoopbackService(SMP_SERVICE_UUID, next(handle),
+                            [LoopbackCharacteristic(SMP_UUID, next(handle), ["write-without-response", "notify"], mtu)]),
+        ])
+
+    async def connect(self, timeout: float = 10, **kwargs) -> bool:
+
+        await self.get_services()
+        self.is_connected = True
+        return True
+
+    async def disconnect(self) -> bool:
+
+        self.is_connected = False
+        self._callbacks.clear()
+        return True
+
+    async def get_services(self, **kwargs) -> LoopbackServiceCollection:
+
+        return self.services
+
+    async def read_gatt_char(self, uuid: str) -> bytearray:
+
+        self._check_connected()
+        await asyncio.sleep(self.latency)
+
+        return bytearray(self._values[bleak.uuids.normalize_uuid_str(uuid)])
+
+    async def write_gatt_char(self, uuid: str, data, response: bool = None) -> None:
+
+        self._check_connected()
+        uuid = bleak.uuids.normalize_uuid_str(uuid)
+        data = bytes(data)
+
+        if len(data) > self.mtu_size - 3:
+            raise bleak.exc.BleakError(f"Write of {len(data)} bytes exceeds the MTU ({self.mtu_size})")
+
+        if uuid == UART_TX_UUID:
+            self._notify(UART_RX_UUID, data)
+        elif uuid == SMP_UUID:
+            self._notify(SMP_UUID, self._handle_smp(data))
+
+        if response:
+            await asyncio.sleep(self.latency)
+
+    async def start_notify(self, uuid: str, callback) -> None:
+
+        self._check_connected()
+        self._callbacks[bleak.uuids.normalize_uuid_str(uuid)] = callback
+
+    async def stop_notify(self, uuid: str) -> None:
+
+        self._callbacks.pop(bleak.uuids.normalize_uuid_str(uuid), None)
+
+    def _check_connected(self) -> None:
+
+        if not self.is_connected:
+            raise bleak.exc.BleakError("Not connected")
+
+    def _notify(self, uuid: str, data: bytes) -> None:
+
+        """
+        Deliver data from the event loop (after the emulated link latency), split into as many notifications as the
+        MTU requires, like a real peripheral.
+        """
+
+        callback = self._callbacks.get(uuid)
+        if callback is not None:
+            size = self.mtu_size - 3
+            fragments = [bytearray(data[i:i + size]) for i in range(0, max(len(data), 1), size)]
+            asyncio.get_running_loop().call_later(self.latency, self._deliver, callback, self.services.get_characteristic(uuid), fragments)
+
+    @staticmethod
+    def _deliver(callback, characteristic: LoopbackCharacteristic, fragments: list[bytearray]) -> None:
+
+        for fragment in fragments:
+            callback(characteristic, fragment)
+
+    def _handle_smp(self, data: bytes) -> bytes:
+
+        """Return the SMP response to a request."""
+
+        operation, _, group, sequence, command = BLESMPService._parse_smp_header(data[0:8])
+
+        # Some requests do not fill in the header's length, so decode whatever follows the header
+        request = cbor2.loads(data[8:]) if len(data) > 8 else {}
+
+        if len(data) > LOOPBACK_SMP_BUFFER_SIZE:
+            response = {"rc": MGMT_ERR_ENOMEM}
+        elif group == GRP_SHELL_MANAGEMENT and command == SHELL_EXECUTE_CMD:
+            response = self._shell(request.get("argv", []))
+        elif group == GRP_OS_MANAGEMENT and command == OS_ECHO_COMMAND:
+            response = {"r": request.get("d", "")}
+        elif group == GRP_OS_MANAGEMENT and command == OS_MCUMGR_PARAMS_COMMAND:
+            response = {"buf_size": LOOPBACK_SMP_BUFFER_SIZE, "buf_count": LOOPBACK_SMP_BUFFER_COUNT}
+        elif group == GRP_IMAGE_MANAGEMENT and command == IMAGE_STATE_COMMAND:
+            response = {"images": self._images()}
+        elif group == GRP_IMAGE_MANAGEMENT and command == IMAGE_UPLOAD_COMMAND:
+            response = self._image_upload(request)
+        elif group == GRP_IMAGE_MANAGEMENT and command == IMAGE_ERASE_COMMAND:
+            self._upload = bytearray()
+            self._upload_sha = b""
+            self._upload_hash = b""
+            response = {"rc": 0}
+        else:
+            response = {"rc": MGMT_ERR_ENOTSUP}
+
+        payload = cbor2.dumps(response)
+        header = BLESMPService._get_smp_header(operation + 1, len(payload), group, sequence, command)
+
+        return bytes(header) + payload
+
+    def _shell(self, argv: list[str]) -> dict:
+
+        """Execute the demo firmware's "hil" shell commands."""
+
+        uptime_ms = int((time.monotonic() - self._boot_time) * 1000)
+        seconds = uptime_ms // 1000
+
+        commands = {
+            ("hil", "ping"): "pong",
+            ("hil", "uptime-ms"): str(uptime_ms),
+            ("hil", "uptime"): f"{seconds // 86400} days, {seconds // 3600 % 24} hours, "
+                               f"{seconds // 60 % 60} minutes, {seconds % 60} seconds",
+        }
+
+        output = commands.get(tuple(argv))
+        if output is None:
+            return {"o": f"{' '.join(argv)}: command not found", "ret": -1}
+
+        return {"o": output + "\n", "ret": 0}
+
+    def _image_upload(self, request: dict) -> dict:
+
+        """Store an image upload chunk and return the next expected offset."""
+
+        offset = request.get("off", 0)
+
+        if offset == 0:
+            # Continue an interrupted upload of the same image, identified by its SHA-256
+            if request.get("sha") and request.get("sha") == self._upload_sha and 0 < len(self._upload) < self._upload_size:
+                return {"rc": 0, "off": len(self._upload)}
+
+            self._upload = bytearray()
+            self._upload_size = request.get("len", 0)
+            self._upload_sha = request.get("sha", b"")
+        elif offset != len(self._upload):
+            return {"rc": 0, "off": len(self._upload)}
+
+        self._upload += request.get("data", b"")
+
+        if len(self._upload) >= self._upload_size:
+            self._upload_hash = hashlib.sha256(self._upload).digest()
+
+        return {"rc": 0, "off": len(self._upload)}
+
+    def _images(self) -> list[dict]:
+
+        """Return the image state of the emulated slots."""
+
+        images = [{"slot": 0, "version": self._values.get(bleak.uuids.normalize_uuid_str("2a26"), b"0.0").decode(),
+                   "hash": hashlib.sha256(b"loopback").digest(), "bootable": True, "pending": False,
+                   "confirmed": True, "active": True, "permanent": False}]
+
+        if self._upload_hash:
+            images.append({"slot": 1, "version": "0.0.0", "hash": self._upload_hash, "bootable": True,
+                           "pending": False, "confirmed": False, "active": False, "permanent": False})
+
+        return images
+
+
+class LoopbackBLEClient(BLEClient):
+
+    """BLEClient connected to a LoopbackPeripheral instead of a real device, eg to benchmark the SDK without hardware."""
+
+    def __init__(self, latency: float = 0.0, mtu: int = LOOPBACK_MTU, dis_values: dict = None):
+
+        """
+        :param latency: Emulated link latency, in seconds (see LoopbackPeripheral)
+
+        :param mtu: ATT MTU reported by the peripheral
+
+        :param dis_values: DIS strings by 16 bit UUID (the demo firmware's by default)
+        """
+
+        super().__init__(LOOPBACK_ADDRESS)
+        self.peripheral = LoopbackPeripheral(LOOPBACK_ADDRESS, latency, mtu, dis_values)
+
+    def _get_backend_object(self, address_or_device):
+
+        return self.peripheral, self.peripheral.address
@@ -0,0 +1,190 @@
+#
+# Copyright (C) 2026, Dojo Five
+# All rights reserved.
+#
+
+import time
+import asyncio
+from collections.abc import Callable
+from .ble_types import BLENotification
+
+OVERFLOW_DROP_OLDEST = "drop_oldest"  # Discard the oldest queued notification to make room
+OVERFLOW_DROP_NEWEST = "drop_newest"  # Discard the notification that does not fit
+
+DEFAULT_QUEUE_SIZE = 256
+
+
+class BLENotificationStream:
+
+    """
+    Queue of the notifications received from one characteristic, created by BLEClient.notifications().
+
+    The backend callback only timestamps and queues each notification, so it returns immediately even at high
+    notification rates. Consumers await exactly the data they need, with a timeout:
+
+        async with client.notifications(UART_RX_UUID) as stream:
+            await nus.write_nus(b"ping")
+            notification = await stream.get(timeout=2.0)
+
+    or iterate over the notifications until the stream is stopped:
+
+        async for notification in stream:
+            ...
+
+    When the queue is full, the overflow policy decides which notification is discarded; discarded notifications
+    are counted in dropped.
+    """
+
+    def __init__(self, client, uuid: str, maxsize: int = DEFAULT_QUEUE_SIZE, overflow: str = OVERFLOW_DROP_OLDEST) -> None:
+
+        """
+        Create a new notification stream. Use BLEClient.notifications() rather than creating streams directly.
+
+        :param client: BLEClient the notifications come from
+
+        :param uuid: UUID of the characteristic
+
+        :param maxsize: Maximum number of queued notifications
+
+        :param overflow: OVERFLOW_DROP_OLDEST or OVERFLOW_DROP_NEWEST
+        """
+
+        if overflow not in (OVERFLOW_DROP_OLDEST, OVERFLOW_DROP_NEWEST):
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+
+        self.uuid = uuid.lower()
+        self.overflow = overflow
+
+        self.received = 0
+        """Number of notifications received"""
+        self.dropped = 0
+        """Number of notifications discarded because the queue was full"""
+
+        self._client = client
+        self._queue = asyncio.Queue(maxsize)
+        self._running = False
+
+    async def start(self) -> None:
+
+        """Subscribe to the characteristic's notifications."""
+
+        if not self._running:
+            await self._client._add_notification_stream(self)
+            self._running = True
+
+    async def stop(self) -> None:
+
+        """Unsubscribe from the characteristic's notifications. Notifications already queued can still be read."""
+
+        if self._running:
+            self._running = False
+            await self._client._remove_notification_stream(self)
+
+            # Wake up a consumer waiting in get() or async for
+            if self._queue.empty():
+                self._queue.put_nowait(None)
+
+    async def __aenter__(self) -> "BLENotificationStream":
+
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+
+        await self.stop()
+
+    def __aiter__(self) -> "BLENotificationStream":
+
+        return self
+
+    async def __anext__(self) -> BLENotification:
+
+        notification = await self.get()
+        if notification is None:
+            raise StopAsyncIteration
+
+        return notification
+
+    @property
+    def running(self) -> bool:
+
+        """True while the stream is subscribed."""
+
+        return self._running
+
+    def pending(self) -> int:
+
+        """Return the number of queued notifications."""
+
+        return self._queue.qsize()
+
+    async def get(self, timeout: float = None) -> BLENotification | None:
+
+        """
+        Return the next notification.
+
+        :param timeout: Maximum time to wait (in seconds), None to wait until a notification arrives
+
+        :return: Oldest queued notification, or None on timeout or once the stream is stopped and empty
+        """
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            if not self._running and self._queue.empty():
+                return None
+
+            try:
+                notification = await asyncio.wait_for(self._queue.get(),
+                                                      None if deadline is None else deadline - time.monotonic())
+            except asyncio.TimeoutError:
+                return None
+
+            # None is the wake-up left by stop(); ignore it if the stream was started again since
+            if notification is not None or not self._running:
+                return notification
+
+    async def wait_for(self, match: Callable[[BLENotification], bool], timeout: float) -> BLENotification | None:
+
+        """
+        Return the next notification accepted by a filter, discarding the others.
+
+        :param match: Filter called with each notification
+
+        :param timeout: Maximum time to wait (in seconds)
+
+        :return: Accepted notification, or None on timeout
+        """
+
+        deadline = time.monotonic() + timeout
+
+        while (remaining := deadline - time.monotonic()) > 0:
+            notification = await self.get(remaining)
+            if notification is None:
+                return None
+            if match(notification):
+                return notification
+
+        return None
+
+    def clear(self) -> None:
+
+        """Discard all queued notifications."""
+
+        while not self._queue.empty():
+            self._queue.get_nowait()
+
+    def _put(self, data: bytearray) -> None:
+
+        """Queue a notification (called by BLEClient from the backend's callback)."""
+
+        self.received += 1
+        notification = BLENotification(self.uuid, data, time.monotonic())
+
+        if self._queue.full():
+            self.dropped += 1
+            if self.overflow == OVERFLOW_DROP_NEWEST:
+                return
+            self._queue.get_nowait()
+
+        self._queue.put_nowait(notification)
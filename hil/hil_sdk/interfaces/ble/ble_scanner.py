@@ -3,10 +3,16 @@
 # All rights reserved.
 #
 import re
+import time
 import string
+import asyncio
 from typing import Callable
 from bleak import BleakScanner
-from .ble_types import BLEAdvertisingDevice
+from bleak.uuids import normalize_uuid_str
+from .ble_types import BLEAdvertisingDevice, BLEScanResult
+
+# Matches characters that are not printable ASCII (removed from names and addresses)
+NON_PRINTABLE_REGEX = re.compile(r'[^{0}\n]'.format(re.escape(string.printable)))
 
 class BLEScanner:
 
@@ -15,7 +21,9 @@ class BLEScanner:
     @staticmethod
     async def find_devices(timeout: float = 5.0,
                            verbose: bool = True,
-                           filter: Callable[[BLEAdvertisingDevice], bool] = None) -> list[BLEAdvertisingDevice]:
+                           filter: Callable[[BLEAdvertisingDevice], bool] = None,
+                           service_uuids: list[str] = None,
+                           addresses: list[str] = None) -> list[BLEAdvertisingDevice]:
 
         """
         Find devices via a BLE scan. Timeout optionally provided.
@@ -28,25 +36,30 @@ class BLEScanner:
 
         :param filter: Filter function called for every scanned device (return True to accept a device)
 
+        :param service_uuids: Only report devices advertising one of these service UUIDs. The filter is applied by
+            the BLE stack (BlueZ discovery filter), so other devices never reach Python.
+
+        :param addresses: Only report devices with one of these addresses. A single address is also passed to
+            BlueZ as a discovery filter pattern.
+
         :return: List of found devices
         """
 
-        scanned_devices = await BleakScanner.discover(timeout=timeout, return_adv=True)
+        scanned_devices = await BleakScanner.discover(timeout=timeout, return_adv=True,
+                                                      **BLEScanner._backend_filters(service_uuids, addresses))
+        address_set = BLEScanner._address_set(addresses)
         devices = []
         devices_filtered = []
 
         for address, device_data in scanned_devices.items():
-            # Remove non-printable characters
-            name    = re.sub(r'[^{0}\n]'.format(string.printable), '', device_data[0].name)
-            address = re.sub(r'[^{0}\n]'.format(string.printable), '', device_data[0].address)
-
-            rssi = device_data[1].rssi
-            service_uuids = device_data[1].service_uuids
+            if address_set is not None and device_data[0].address.upper() not in address_set:
+                continue
 
-            advertising_device = BLEAdvertisingDevice(address, name, rssi, service_uuids, device_data[0])
+            advertising_device = BLEScanner._to_advertising_device(device_data[0], device_data[1])
 
-            # Add to non-filtered device list
-            devices.append(advertising_device)
+            # Add to non-filtered device list (only used for the verbose report)
+            if verbose:
+                devices.append(advertising_device)
 
             # Apply filtering if applicable
             if filter is not None:
@@ -55,10 +68,10 @@ class BLEScanner:
             else:
                 devices_filtered.append(advertising_device)
 
-        # Sort by RSSI
-        devices.sort(reverse=True, key=lambda device: device.rssi)
-
         if verbose:
+            # Sort by RSSI
+            devices.sort(reverse=True, key=lambda device: device.rssi)
+
             print("%s: Starting scan..." % (__class__.__name__))
             print("----------------------------------------------------------")
             print("---------------------- SCAN RESULTS ----------------------")
@@ -75,3 +88,129 @@ class BLEScanner:
             print("----------------------------------------------------------")
 
         return devices_filtered
+
+    @staticmethod
+    async def scan_until(filter: Callable[[BLEAdvertisingDevice], bool] = None,
+                         count: int = 1,
+                         timeout: float = 5.0,
+                         verbose: bool = True,
+                         service_uuids: list[str] = None,
+                         addresses: list[str] = None) -> BLEScanResult:
+
+        """
+        Scan until the filter has accepted the given number of distinct devices, or until the timeout expires.
+        Unlike find_devices(), which always scans for the full timeout, the scan stops as soon as enough devices
+        have been found, so looking up a device that advertises every 100 ms takes about that long rather than
+        the whole scan window. Use find_devices() for inventory scans.
+
+        :param filter: Filter function called for every received advertisement (return True to accept a device).
+            None accepts every device.
+
+        :param count: Number of distinct devices to find before stopping
+
+        :param timeout: Maximum duration of the scan (in seconds)
+
+        :param verbose: Verbosity flag
+
+        :param service_uuids: Only consider devices advertising one of these service UUIDs (filtered by the
+            BLE stack, see find_devices())
+
+        :param addresses: Only consider devices with one of these addresses (see find_devices())
+
+        :return: Accepted devices and scan timing
+        """
+
+        address_set = BLEScanner._address_set(addresses)
+        matches = {}
+        first_match_time = None
+        done = asyncio.Event()
+        start_time = time.monotonic()
+
+        def detection_callback(device, advertisement_data):
+
+            nonlocal first_match_time
+
+            if done.is_set():
+                return
+
+            if address_set is not None and device.address.upper() not in address_set:
+                return
+
+            advertising_device = BLEScanner._to_advertising_device(device, advertisement_data)
+
+            if filter is not None and not filter(advertising_device):
+                return
+
+            if first_match_time is None:
+                first_match_time = time.monotonic() - start_time
+
+            # Keep the latest advertisement of each device
+            matches[advertising_device.address] = advertising_device
+
+            if len(matches) >= count:
+                done.set()
+
+        if verbose:
+            print("%s: Scanning for %d device(s)..." % (__class__.__name__, count))
+
+        async with BleakScanner(detection_callback=detection_callback, **BLEScanner._backend_filters(service_uuids, addresses)):
+            try:
+                await asyncio.wait_for(done.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+        result = BLEScanResult(list(matches.values()), first_match_time, time.monotonic() - start_time)
+
+        if verbose:
+            for device in result.devices:
+                print(f"{device.name : <30}{device.address : <20}{device.rssi : >4} dBm")
+            if result.time_to_first_match is not None:
+                print("%s: %d device(s) found in %.2f s (first match after %.2f s)" %
+                      (__class__.__name__, len(result.devices), result.scan_time, result.time_to_first_match))
+            else:
+                print("%s: no matching device found in %.2f s" % (__class__.__name__, result.scan_time))
+
+        return result
+
+    @staticmethod
+    def _to_advertising_device(device, advertisement_data) -> BLEAdvertisingDevice:
+
+        """Convert a backend device and advertisement into a BLEAdvertisingDevice."""
+
+        name    = BLEScanner._sanitize(device.name or "")
+        address = BLEScanner._sanitize(device.address)
+
+        return BLEAdvertisingDevice(address, name, advertisement_data.rssi, advertisement_data.service_uuids, device)
+
+    @staticmethod
+    def _sanitize(text: str) -> str:
+
+        """Remove non-printable characters. Printable ASCII text, the usual case, is returned as is."""
+
+        if text.isascii() and text.isprintable():
+            return text
+
+        return NON_PRINTABLE_REGEX.sub('', text)
+
+    @staticmethod
+    def _backend_filters(service_uuids: list[str] = None, addresses: list[str] = None) -> dict:
+
+        """Return the BleakScanner arguments that make the BLE stack apply the given filters."""
+
+        kwargs = {}
+
+        if service_uuids:
+            kwargs["service_uuids"] = [normalize_uuid_str(uuid) for uuid in service_uuids]
+
+        # BlueZ supports a single pattern, matched against the start of the address or name
+        if addresses and len(addresses) == 1:
+            kwargs["bluez"] = {"filters": {"Pattern": addresses[0].upper()}}
+
+        return kwargs
+
+    @staticmethod
+    def _address_set(addresses: list[str] = None) -> set[str] | None:
+
+        """Return the set of accepted (upper case) addresses, or None to accept any address."""
+
+        return {address.upper() for address in addresses} if addresses else None
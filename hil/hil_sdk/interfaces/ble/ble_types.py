@@ -22,3 +22,69 @@ class BLEAdvertisingDevice:
         """List of advertised service UUIDs"""
 
         self._backend_obj = backend_obj
+
+
+class BLEScanResult:
+
+    """Result of an early-exit scan (see BLEScanner.scan_until())."""
+
+    def __init__(self, devices: list[BLEAdvertisingDevice], time_to_first_match: float | None, scan_time: float):
+
+        self.devices = devices
+        """Devices accepted by the filter, in the order they were first seen"""
+        self.time_to_first_match = time_to_first_match
+        """Seconds from the start of the scan to the first accepted device (None if no device was accepted)"""
+        self.scan_time = scan_time
+        """Total duration of the scan, in seconds"""
+
+    @property
+    def found(self) -> bool:
+
+        """True if at least one device was accepted."""
+
+        return len(self.devices) > 0
+
+
+class BLELinkParameters:
+
+    """Negotiated parameters of a BLE connection (see BLEClient.get_link_parameters()). Unknown values are None."""
+
+    def __init__(self,
+                 mtu: int | None = None,
+                 interval_ms: float | None = None,
+                 latency: int | None = None,
+                 supervision_timeout_ms: int | None = None,
+                 tx_phy: int | None = None,
+                 rx_phy: int | None = None):
+
+        self.mtu = mtu
+        """ATT MTU, in bytes"""
+        self.interval_ms = interval_ms
+        """Connection interval, in milliseconds"""
+        self.latency = latency
+        """Peripheral latency, in connection events"""
+        self.supervision_timeout_ms = supervision_timeout_ms
+        """Supervision timeout, in milliseconds"""
+        self.tx_phy = tx_phy
+        """PHY used to transmit (1: 1M, 2: 2M, 3: Coded)"""
+        self.rx_phy = rx_phy
+        """PHY used to receive (1: 1M, 2: 2M, 3: Coded)"""
+
+    def __repr__(self) -> str:
+
+        return (f"BLELinkParameters(mtu={self.mtu}, interval_ms={self.interval_ms}, latency={self.latency}, "
+                f"supervision_timeout_ms={self.supervision_timeout_ms}, tx_phy={self.tx_phy}, rx_phy={self.rx_phy})")
+
+
+class BLENotification:
+
+    """A notification received from a characteristic (see BLEClient.notifications())."""
+
+    def __init__(self, uuid: str, data: bytearray, timestamp: float):
+
+        self.uuid = uuid
+        """UUID of the characteristic"""
+        self.data = data
+        """Notified value"""
+        self.timestamp = timestamp
+        """Time (time.monotonic()) the notification was received"""
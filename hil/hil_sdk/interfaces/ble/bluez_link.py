@@ -0,0 +1,280 @@
+#
+# Copyright (C) 2026, Dojo Five
+# All rights reserved.
+#
+
+"""
+Connection parameter and PHY control for BlueZ.
+
+BlueZ's D-Bus API (and therefore bleak) offers no control over the connection interval or the PHY of a link, so these
+requests are sent to the controller as raw HCI commands, the same way hcitool does. This requires the CAP_NET_RAW
+capability (like btmon).
+"""
+
+import time
+import socket
+import struct
+import logging
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; BlueZ is Linux only anyway
+    fcntl = None
+
+PHY_1M    = 1
+PHY_2M    = 2
+PHY_CODED = 3
+
+HCI_COMMAND_PKT = 0x01
+HCI_EVENT_PKT   = 0x04
+
+EVT_CMD_COMPLETE = 0x0E
+EVT_CMD_STATUS   = 0x0F
+EVT_LE_META      = 0x3E
+
+LE_CONN_UPDATE_COMPLETE = 0x03  # LE meta subevents
+LE_PHY_UPDATE_COMPLETE  = 0x0C
+
+OGF_LE_CTL         = 0x08
+OCF_LE_CONN_UPDATE = 0x0013
+OCF_LE_READ_PHY    = 0x0030
+OCF_LE_SET_PHY     = 0x0032
+
+SOL_HCI         = 0
+HCI_FILTER      = 2
+HCIGETCONNLIST  = 0x800448D4  # _IOR('H', 212, int)
+LE_LINK         = 0x80
+MAX_CONNECTIONS = 10          # Size of the connection list requested from the kernel
+
+CONN_INTERVAL_UNIT_MS    = 1.25  # Connection interval unit
+SUPERVISION_TIMEOUT_UNIT = 10    # Supervision timeout unit, in milliseconds
+
+
+class BlueZLinkControl:
+
+    """Sends link-layer requests for an existing LE connection to a local BlueZ adapter."""
+
+    def __init__(self, adapter: str = "hci0", timeout: float = 5.0):
+
+        """
+        :param adapter: Name of the local adapter
+
+        :param timeout: Time to wait for the controller to report the outcome of a request (in seconds)
+        """
+
+        self.adapter = adapter
+        self.timeout = timeout
+
+    @staticmethod
+    def supported() -> bool:
+
+        """Return True if raw HCI sockets are available on this platform."""
+
+        return fcntl is not None and hasattr(socket, "AF_BLUETOOTH") and hasattr(socket, "BTPROTO_HCI")
+
+    def connection_handle(self, address: str) -> int | None:
+
+        """
+        Return the HCI handle of the LE connection to a device.
+
+        :param address: Device address
+
+        :return: Connection handle, or None if the device is not connected
+        """
+
+        with self._open() as sock:
+            request = struct.pack("<HH", self._dev_id(), MAX_CONNECTIONS) + bytes(16 * MAX_CONNECTIONS)
+            reply = fcntl.ioctl(sock.fileno(), HCIGETCONNLIST, request)
+
+        count = struct.unpack_from("<H", reply, 2)[0]
+        wanted = bytes.fromhex(address.replace(":", ""))[::-1]
+
+        for i in range(count):
+            handle, bdaddr, link_type = struct.unpack_from("<H6sB", reply, 4 + 16 * i)
+            if bdaddr == wanted and link_type == LE_LINK:
+                return handle
+
+        return None
+
+    def update_connection(self,
+                          address: str,
+                          min_interval_ms: float,
+                          max_interval_ms: float,
+                          latency: int = 0,
+                          supervision_timeout_ms: int = 4000) -> tuple[float, int, int] | None:
+
+        """
+        Request new connection parameters (LE Connection Update).
+
+        :param address: Device address
+
+        :param min_interval_ms: Minimum acceptable connection interval (7.5 ms to 4 s)
+
+        :param max_interval_ms: Maximum acceptable connection interval (7.5 ms to 4 s)
+
+        :param latency: Peripheral latency, in connection events
+
+        :param supervision_timeout_ms: Supervision timeout (100 ms to 32 s)
+
+        :return: Negotiated (interval in ms, latency, supervision timeout in ms), or None on failure
+        """
+
+        handle = self._handle(address)
+        if handle is None:
+            return None
+
+        params = struct.pack("<HHHHHHH",
+                             handle,
+                             round(min_interval_ms / CONN_INTERVAL_UNIT_MS),
+                             round(max_interval_ms / CONN_INTERVAL_UNIT_MS),
+                             latency,
+                             supervision_timeout_ms // SUPERVISION_TIMEOUT_UNIT,
+                             0, 0)
+
+        event = self._request(OCF_LE_CONN_UPDATE, params, LE_CONN_UPDATE_COMPLETE, handle)
+        if event is None:
+            return None
+
+        status, _, interval, latency, supervision_timeout = struct.unpack_from("<BHHHH", event)
+        if status != 0:
+            logging.error(f"{self.__class__.__name__}: connection update to {address} failed with status 0x{status:02x}")
+            return None
+
+        return interval * CONN_INTERVAL_UNIT_MS, latency, supervision_timeout * SUPERVISION_TIMEOUT_UNIT
+
+    def set_phy(self, address: str, tx_phy: int = PHY_2M, rx_phy: int = PHY_2M) -> tuple[int, int] | None:
+
+        """
+        Request the PHYs of a connection (LE Set PHY).
+
+        :param address: Device address
+
+        :param tx_phy: Preferred transmit PHY (PHY_1M, PHY_2M or PHY_CODED)
+
+        :param rx_phy: Preferred receive PHY (PHY_1M, PHY_2M or PHY_CODED)
+
+        :return: PHYs in use afterwards as (tx, rx), or None on failure
+        """
+
+        handle = self._handle(address)
+        if handle is None:
+            return None
+
+        params = struct.pack("<HBBBH", handle, 0, 1 << (tx_phy - 1), 1 << (rx_phy - 1), 0)
+
+        event = self._request(OCF_LE_SET_PHY, params, LE_PHY_UPDATE_COMPLETE, handle)
+        if event is not None and event[0] == 0:
+            return event[3], event[4]
+
+        # No update event is reported when the PHYs did not change, so read them back
+        return self.read_phy(address)
+
+    def read_phy(self, address: str) -> tuple[int, int] | None:
+
+        """
+        Read the PHYs of a connection (LE Read PHY).
+
+        :param address: Device address
+
+        :return: PHYs in use as (tx, rx), or None on failure
+        """
+
+        handle = self._handle(address)
+        if handle is None:
+            return None
+
+        opcode = self._opcode(OCF_LE_READ_PHY)
+
+        with self._open() as sock:
+            self._send(sock, opcode, struct.pack("<H", handle))
+
+            for event_code, params in self._events(sock):
+                if event_code == EVT_CMD_COMPLETE and struct.unpack_from("<H", params, 1)[0] == opcode:
+                    status, _, tx_phy, rx_phy = struct.unpack_from("<BHBB", params, 3)
+                    return (tx_phy, rx_phy) if status == 0 else None
+
+        logging.error(f"{self.__class__.__name__}: no reply to LE Read PHY for {address}")
+        return None
+
+    def _handle(self, address: str) -> int | None:
+
+        """Return the connection handle of a device, logging an error if it is not connected."""
+
+        handle = self.connection_handle(address)
+        if handle is None:
+            logging.error(f"{self.__class__.__name__}: no LE connection to {address} on {self.adapter}")
+
+        return handle
+
+    def _request(self, ocf: int, params: bytes, subevent: int, handle: int) -> bytes | None:
+
+        """
+        Send an LE command that completes asynchronously, and wait for its LE meta event.
+
+        :return: Parameters of the LE meta event (after the subevent code), or None on failure
+        """
+
+        opcode = self._opcode(ocf)
+
+        with self._open() as sock:
+            self._send(sock, opcode, params)
+
+            for event_code, event in self._events(sock):
+
+                if event_code == EVT_CMD_STATUS and struct.unpack_from("<H", event, 2)[0] == opcode and event[0] != 0:
+                    logging.error(f"{self.__class__.__name__}: command 0x{opcode:04x} rejected with status 0x{event[0]:02x}")
+                    return None
+
+                if event_code == EVT_LE_META and event[0] == subevent and struct.unpack_from("<H", event, 2)[0] == handle:
+                    return event[1:]
+
+        return None
+
+    def _events(self, sock):
+
+        """Yield (event code, parameters) for the HCI events received until the timeout expires."""
+
+        deadline = time.monotonic() + self.timeout
+
+        while (remaining := deadline - time.monotonic()) > 0:
+            sock.settimeout(remaining)
+            try:
+                packet = sock.recv(260)
+            except socket.timeout:
+                return
+
+            if len(packet) >= 3 and packet[0] == HCI_EVENT_PKT:
+                yield packet[1], packet[3:]
+
+    def _open(self) -> socket.socket:
+
+        """Open a raw HCI socket on the adapter, receiving all events."""
+
+        sock = socket.socket(socket.AF_BLUETOOTH, socket.SOCK_RAW, socket.BTPROTO_HCI)
+        try:
+            sock.bind((self._dev_id(),))
+            sock.setsockopt(SOL_HCI, HCI_FILTER, struct.pack("<IIIH", 1 << HCI_EVENT_PKT, 0xFFFFFFFF, 0xFFFFFFFF, 0))
+        except OSError:
+            sock.close()
+            raise
+
+        return sock
+
+    def _send(self, sock: socket.socket, opcode: int, params: bytes) -> None:
+
+        """Send an HCI command."""
+
+        sock.send(struct.pack("<BHB", HCI_COMMAND_PKT, opcode, len(params)) + params)
+
+    def _dev_id(self) -> int:
+
+        """Return the index of the adapter (eg, 0 for hci0)."""
+
+        return int(self.adapter.removeprefix("hci"))
+
+    @staticmethod
+    def _opcode(ocf: int) -> int:
+
+        """Return the opcode of an LE controller command."""
+
+        return (OGF_LE_CTL << 10) | ocf
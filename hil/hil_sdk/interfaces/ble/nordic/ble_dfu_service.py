@@ -5,21 +5,30 @@
 
 import os
 import cbor2
-import random
+import asyncio
+import hashlib
 from collections.abc import Callable
-from ..ble_client import BLEClient
+from ..ble_client import BLEClient, ATT_DEFAULT_MTU, ATT_HEADER_SIZE
 from .ble_smp_service import *
 
 
-DFU_HASH_SIZE        = 64   # Size of session hash, in bits
-DFU_CHUNK_SIZE       = 128  # Size of image chunk sent over SMP payload
+DFU_CHUNK_SIZE          = 128  # Size of image chunk sent over SMP payload when the MTU is unknown
+DFU_CHUNK_ALIGNMENT     = 4    # Chunks (except the last) are a multiple of this size, to match flash write alignment
+DFU_DEFAULT_BUFFER_SIZE = 384  # SMP buffer size assumed when the device does not report it (Zephyr's default)
+DFU_WINDOW              = 4    # Upload requests in flight at once (also limited by the device's SMP buffer count)
+DFU_RESPONSE_TIMEOUT    = 10   # Seconds to wait for an upload response before resending (the first one erases the slot)
+DFU_MAX_RETRIES         = 3    # Consecutive lost responses tolerated before the upload fails
+DFU_MAX_RESUMES         = 3    # Times an upload is resumed after a lost connection or unresponsive device
+
+# Image path -> (modification time, size, SHA-256 of the file, hash reported by the image state)
+_image_hashes = {}
 
 
 class BLEDFUService(BLESMPService):
 
     """A service for performing device image management over SMP."""
 
-    def __init__(self, client: BLEClient):
+    def __init__(self, client: BLEClient | SMPTransport):
 
         """
         Construct a new BLEDFUService object.
@@ -75,13 +84,36 @@ class BLEDFUService(BLESMPService):
 
         return rsp
 
-    async def image_upload(self, image_path: str, on_update: Callable[[int, int], None] = None) -> bool:
+    async def image_upload(self,
+                           image_path: str,
+                           on_update: Callable[[int, int], None] = None,
+                           chunk_size: int = None,
+                           window: int = DFU_WINDOW,
+                           force: bool = False) -> bool:
 
         """Upload an image to the second image slot of the device. This method will upload the entire image which
         could take several minutes depending on the size of the image.
 
+        Each request carries as much of the image as fits in one SMP packet, which is limited by the link's MTU and
+        by the device's SMP buffer size (see get_mcumgr_params()). Up to window requests are in flight at once,
+        each with its own sequence number, so the upload is not limited to one request per connection event round
+        trip. When a response is lost or reports an unexpected offset, the requests in flight are dropped and the
+        upload resumes from the offset reported by the device.
+
+        The upload is identified by the SHA-256 of the image, so the device continues an interrupted upload of the
+        same image where it stopped. If the device stops responding or the connection is lost, the client is
+        reconnected and the upload resumed. If slot 1 already holds the image, nothing is uploaded.
+
         :param image_path: Absolute path to the image binary file (relative paths may not work correctly)
 
+        :param on_update: Optional progress callback, called with the current offset and the image size
+
+        :param chunk_size: Optional upper limit of the image bytes sent per request
+
+        :param window: Maximum number of requests in flight (1 waits for each response before the next request)
+
+        :param force: Upload the image even if slot 1 already holds it
+
         :return: Status of operation (True on success, False on error)
         :rtype: bool
         """
@@ -90,30 +122,39 @@ class BLEDFUService(BLESMPService):
             print("%s: invalid path" % (self.__class__.__name__))
             return False
 
-        offset = 0
-        hash_str = str(random.getrandbits(DFU_HASH_SIZE))
-        image_total_size = os.path.getsize(image_path)
-        image_size_kB = round((image_total_size / 1000), 2)
-        image_num = 1
+        # Read the image once; chunks are slices of it
+        with open(image_path, "rb") as image_file:
+            image = image_file.read()
+
+        image_name = os.path.basename(image_path)
+        image_size_kB = round((len(image) / 1000), 2)
+        sha, image_hash = BLEDFUService._get_image_hashes(image_path, image)
 
-        print(f"{self.__class__.__name__}: Starting DFU for {os.path.basename(image_path)} ({image_size_kB} kB)...")
+        if not force and await self._slot_holds_image(1, image_hash):
+            print(f"{self.__class__.__name__}: {image_name} is already in slot 1, skipping DFU...")
+            if on_update:
+                on_update(len(image), len(image))
+            return True
 
-        while offset != image_total_size:
+        print(f"{self.__class__.__name__}: Starting DFU for {image_name} ({image_size_kB} kB)...")
 
-            # Send the first chunk
-            payload = self._build_image_upload_payload(image_num, image_path, offset, image_total_size, hash_str)
-            header_bytes = BLESMPService._get_smp_header(OP_WRITE, len(payload), GRP_IMAGE_MANAGEMENT, 0, IMAGE_UPLOAD_COMMAND)
+        for attempt in range(DFU_MAX_RESUMES + 1):
 
-            rsp = await self.write_smp_and_response(bytearray(header_bytes + payload))
+            if attempt > 0:
+                print(f"{self.__class__.__name__}: resuming DFU of {image_name} (attempt {attempt} of {DFU_MAX_RESUMES})...")
+                if not self._transport.connected and not await self._transport.connect():
+                    continue
 
-            offset = rsp["off"]
+            status = await self._upload_image(image, sha, on_update, chunk_size, window)
 
-            if on_update:
-                on_update(offset, image_total_size)
+            if status is not None:
+                if status:
+                    print(f"{self.__class__.__name__}: Completed DFU of {image_name}...")
+                return status
 
-        print(f"{self.__class__.__name__}: Completed DFU of {os.path.basename(image_path)}...")
+        print(f"{self.__class__.__name__}: DFU of {image_name} failed, the device stopped responding")
 
-        return True
+        return False
 
     async def erase_image(self, slot: int):
 
@@ -224,24 +265,268 @@ class BLEDFUService(BLESMPService):
         except:
             return None
 
-    def _build_image_upload_payload(self, image_num: int, image_path: str, offset: int, image_total_size: int, hash_str: str):
+    @staticmethod
+    def get_image_hash(image_path: str) -> bytes | None:
+
+        """Return the hash of an image as reported for its slot by get_state_of_images(): the SHA-256 recorded by
+        MCUboot in the image's TLVs (or the SHA-256 of the file, if it is not an MCUboot image).
+
+        :return: Hash, None if the image doesn't exist
+        """
+
+        if not os.path.isfile(image_path):
+            return None
+
+        return BLEDFUService._get_image_hashes(image_path)[1]
+
+    @staticmethod
+    def _get_image_hashes(image_path: str, image: bytes = None) -> tuple[bytes, bytes]:
+
+        """
+        Internal function to return the SHA-256 of an image file and the hash reported by the image state. Both are
+        cached per file until its modification time or size changes.
+
+        :param image_path: Path of the image
+
+        :param image: Content of the image, if it was already read
+        """
+
+        stat = os.stat(image_path)
+        key = os.path.abspath(image_path)
+        cached = _image_hashes.get(key)
+
+        if cached is not None and cached[0:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2], cached[3]
+
+        if image is None:
+            with open(image_path, "rb") as image_file:
+                image = image_file.read()
+
+        sha = hashlib.sha256(image).digest()
+        image_hash = BLEDFUService._get_mcuboot_hash(image) or sha
+
+        _image_hashes[key] = (stat.st_mtime_ns, stat.st_size, sha, image_hash)
+
+        return sha, image_hash
+
+    @staticmethod
+    def _get_mcuboot_hash(image: bytes) -> bytes | None:
+
+        """
+        Internal function to return the SHA-256 TLV of an MCUboot image (None if the image has none)
+        """
+
+        # Follows the image_header and image_tlv structs within Zephyr
+        # NRF_SDK/bootloader/mcuboot/boot/bootutil/include/bootutil/image.h
+        IMAGE_MAGIC               = 0x96f3b83d
+        IMAGE_TLV_INFO_MAGIC      = 0x6907
+        IMAGE_TLV_PROT_INFO_MAGIC = 0x6908
+        IMAGE_TLV_SHA256          = 0x10
+        IMAGE_TLV_INFO_SIZE       = 4
+
+        if len(image) < 16 or int.from_bytes(image[0:4], byteorder="little") != IMAGE_MAGIC:
+            return None
+
+        header_size      = int.from_bytes(image[8:10] , byteorder="little")
+        protect_tlv_size = int.from_bytes(image[10:12], byteorder="little")
+        image_size       = int.from_bytes(image[12:16], byteorder="little")
+
+        offset = header_size + image_size
+
+        # The protected TLVs come first; the hash is among the unprotected ones
+        if protect_tlv_size and int.from_bytes(image[offset:offset + 2], byteorder="little") == IMAGE_TLV_PROT_INFO_MAGIC:
+            offset += protect_tlv_size
+
+        if int.from_bytes(image[offset:offset + 2], byteorder="little") != IMAGE_TLV_INFO_MAGIC:
+            return None
+
+        end = offset + int.from_bytes(image[offset + 2:offset + 4], byteorder="little")
+        offset += IMAGE_TLV_INFO_SIZE
+
+        while offset + IMAGE_TLV_INFO_SIZE <= min(end, len(image)):
+            tlv_type = int.from_bytes(image[offset:offset + 2]    , byteorder="little")
+            tlv_len  = int.from_bytes(image[offset + 2:offset + 4], byteorder="little")
+            offset += IMAGE_TLV_INFO_SIZE
+
+            if tlv_type == IMAGE_TLV_SHA256:
+                return bytes(image[offset:offset + tlv_len])
+
+            offset += tlv_len
+
+        return None
+
+    async def _slot_holds_image(self, slot: int, image_hash: bytes) -> bool:
+
+        """
+        Internal function to check whether a slot holds an image, from the image state
+        """
+
+        rsp = await self.get_state_of_images(verbose=False)
+
+        if rsp is None:
+            return False
+
+        return any(image.get("slot") == slot and image.get("hash") == image_hash for image in rsp.get("images", []))
+
+    async def _upload_image(self,
+                            image: bytes,
+                            sha: bytes,
+                            on_update: Callable[[int, int], None],
+                            chunk_size: int,
+                            window: int) -> bool | None:
 
         """
-        Internal function to build an SMP payload for the image upload
+        Internal function to upload an image to slot 1, from the offset the device reports for it
+
+        :return: True once the image is uploaded, False if the device rejected it or the upload failed in a way a
+            retry would not fix, None if the device stopped responding or the connection was lost (the upload can be
+            resumed)
         """
 
-        with open(image_path, mode="rb") as file:
-            file.seek(offset)
-            read_size = min(DFU_CHUNK_SIZE, image_total_size - offset)
-            file_data = file.read(read_size)
+        offset = 0       # Image bytes acknowledged by the device
+        next_offset = 0  # Offset of the next request to send
+        in_flight = []   # Response futures and the offset each request ends at, in sending order
+        retries = 0
+        image_total_size = len(image)
+        image_num = 1
+
+        try:
+            packet_size, chunk_limit, buffer_count = await self._get_upload_limits(chunk_size)
+            window = max(1, min(window, buffer_count))
+
+            print(f"{self.__class__.__name__}: {packet_size} byte packets, window of {window}")
+
+            while offset != image_total_size:
+
+                # Fill the window. The first request is sent alone, as the device erases the slot when it receives
+                # it, or answers with the offset reached by an earlier upload of the same image: the window only opens
+                # once that response is received.
+                while len(in_flight) < window and next_offset < image_total_size and (offset > 0 or not in_flight):
+                    payload, end = self._build_image_upload_payload(image_num, image, next_offset, sha,
+                                                                    packet_size - SMP_HEADER_SIZE, chunk_limit)
+                    header_bytes = BLESMPService._get_smp_header(OP_WRITE, len(payload), GRP_IMAGE_MANAGEMENT, 0, IMAGE_UPLOAD_COMMAND)
+
+                    in_flight.append((await self.send_smp(bytearray(header_bytes + payload)), end))
+                    next_offset = end
+
+                done, _ = await asyncio.wait([future for future, _ in in_flight], timeout=DFU_RESPONSE_TIMEOUT,
+                                             return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    retries += 1
+                    if retries > DFU_MAX_RETRIES or not self._transport.connected:
+                        print(f"{self.__class__.__name__}: no response at offset {offset}")
+                        return None
+
+                    # Resend from the last acknowledged offset; the device reports its own offset if it is further
+                    BLEDFUService._cancel_requests(in_flight)
+                    in_flight.clear()
+                    next_offset = offset
+                    continue
+
+                # Handle the oldest response. Requests sent before it whose responses are still missing were either
+                # written (the offset matches) or lost (it does not).
+                index = next(i for i, (future, _) in enumerate(in_flight) if future.done())
+                future, end = in_flight[index]
+                BLEDFUService._cancel_requests(in_flight[:index + 1])
+                del in_flight[:index + 1]
+
+                rsp = future.result()
+
+                if rsp is None or rsp.get("rc", 0) != 0 or "off" not in rsp:
+                    print(f"{self.__class__.__name__}: upload failed at offset {offset} (response: {rsp})")
+                    return False
+
+                retries = 0
+                offset = rsp["off"]
+
+                # The device skipped a request, or resumed an earlier upload: drop the requests in flight and
+                # continue from its offset
+                if offset != end:
+                    BLEDFUService._cancel_requests(in_flight)
+                    in_flight.clear()
+                    next_offset = offset
+
+                if on_update:
+                    on_update(offset, image_total_size)
+
+        except Exception as e:
+            # Only a timeout or a lost link can be resumed; any other error would happen again
+            if isinstance(e, asyncio.TimeoutError) or not self._transport.connected:
+                print(f"{self.__class__.__name__}: upload interrupted at offset {offset} ({e!r})")
+                return None
+
+            print(f"{self.__class__.__name__}: upload failed at offset {offset} ({e!r})")
+            return False
+
+        finally:
+            BLEDFUService._cancel_requests(in_flight)
 
-            cbor_data = {}
+        return True
+
+    async def _get_upload_limits(self, chunk_size: int = None) -> tuple[int, int | None, int]:
 
+        """
+        Internal function to size the image upload requests
+
+        :return: Maximum SMP packet size, limit of the image bytes per request (None for no limit), and number of
+            requests the device can buffer
+        """
+
+        params = await self.get_mcumgr_params()
+        buffer_size = params["buf_size"] if params else DFU_DEFAULT_BUFFER_SIZE
+        buffer_count = params.get("buf_count", 1) if params else 1
+        write_size = self._transport.max_packet_size()
+
+        # Without a known MTU (eg, BlueZ older than 5.62), keep to the historical chunk size
+        if write_size <= ATT_DEFAULT_MTU - ATT_HEADER_SIZE:
+            return buffer_size, min(chunk_size or DFU_CHUNK_SIZE, DFU_CHUNK_SIZE), buffer_count
+
+        return min(buffer_size, write_size), chunk_size, buffer_count
+
+    @staticmethod
+    def _cancel_requests(requests: list[tuple[asyncio.Future, int]]) -> None:
+
+        """
+        Internal function to stop waiting for the responses of upload requests (late responses are then ignored)
+        """
+
+        for future, _ in requests:
+            future.cancel()
+
+    @staticmethod
+    def _build_image_upload_payload(image_num: int, image: bytes, offset: int, sha: bytes, max_size: int, chunk_limit: int = None):
+
+        """
+        Internal function to build an SMP payload for the image upload, filled with as much of the image as fits in
+        max_size bytes. The image number, length, hash and upgrade flag are only sent with the first chunk.
+
+        :return: Payload, and the image offset following its chunk
+        """
+
+        cbor_data = {}
+
+        if offset == 0:
             cbor_data["image"] = image_num
-            cbor_data["len"] = image_total_size
-            cbor_data["off"] = offset
-            cbor_data["sha"] = bytes(hash_str.encode('utf-8'))
-            cbor_data["data"] = bytes(file_data)
+            cbor_data["len"] = len(image)
+            cbor_data["sha"] = sha
             cbor_data["upgrade"] = False
 
-            return list(cbor2.dumps(cbor_data))
+        cbor_data["off"] = offset
+        cbor_data["data"] = b""
+
+        # Room left for the data, which also needs a longer CBOR length prefix when it is 24 bytes or more
+        available = max_size - len(cbor2.dumps(cbor_data))
+        read_size = available
+        while read_size + (read_size >= 24) + (read_size >= 256) > available:
+            read_size -= 1
+        read_size = min(read_size, chunk_limit or read_size)
+
+        if read_size < len(image) - offset:
+            read_size -= read_size % DFU_CHUNK_ALIGNMENT
+        else:
+            read_size = len(image) - offset
+
+        cbor_data["data"] = image[offset:offset + read_size]
+
+        return list(cbor2.dumps(cbor_data)), offset + read_size
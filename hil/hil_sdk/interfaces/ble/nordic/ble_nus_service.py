@@ -3,27 +3,35 @@
 # All rights reserved.
 #
 
+import asyncio
 from collections.abc import Callable
 from ..ble_client import BLEClient
+from ..ble_notification_stream import BLENotificationStream, DEFAULT_QUEUE_SIZE, OVERFLOW_DROP_OLDEST
 from binascii import hexlify
 
 UART_TX_UUID = "6e400002-b5a3-f393-e0a9-e50e24dcca9e"
 UART_RX_UUID = "6e400003-b5a3-f393-e0a9-e50e24dcca9e"
 
+NUS_WINDOW       = 8          # Default number of writes in flight
+NUS_STREAM_LIMIT = 64 * 1024  # Default buffer limit of readuntil()
+
 
 class BLENUSService:
 
     """Provies an interface to read and write data via the Nordic UART Service (NUS)."""
 
-    def __init__(self, client: BLEClient):
+    def __init__(self, client: BLEClient, verbose: bool = False):
 
         """
         Construct a new BLENUSService object.
 
         :param client: BLEClient object to use for communication
+
+        :param verbose: True to print the data written and callback changes
         """
 
         self._client = client
+        self.verbose = verbose
 
     async def write_nus(self, data: bytearray) -> None:
 
@@ -34,7 +42,8 @@ class BLENUSService:
 
         :return: None
         """
-        print("%s: write: %s" % (self.__class__.__name__, hexlify(data)))
+        if self.verbose:
+            print("%s: write: %s" % (self.__class__.__name__, hexlify(data)))
         await self._client.write_gatt(UART_TX_UUID, data)
 
     async def set_nus_received_cb(self, received_cb: Callable[[str, bytearray], None]) -> None:
@@ -46,5 +55,179 @@ class BLENUSService:
 
         :return: None
         """
-        print("%s: setting nus callback: %s" % (self.__class__.__name__, getattr(received_cb, '__name__', 'Unknown')))
+        if self.verbose:
+            print("%s: setting nus callback: %s" % (self.__class__.__name__, getattr(received_cb, '__name__', 'Unknown')))
         await self._client.start_notify(UART_RX_UUID, received_cb)
+
+    def received_notifications(self,
+                               maxsize: int = DEFAULT_QUEUE_SIZE,
+                               overflow: str = OVERFLOW_DROP_OLDEST) -> BLENotificationStream:
+
+        """
+        Return a stream of the data received over NUS (see BLEClient.notifications()).
+
+        :param maxsize: Maximum number of notifications queued in the stream
+
+        :param overflow: What to discard when the queue is full (OVERFLOW_DROP_OLDEST or OVERFLOW_DROP_NEWEST)
+
+        :return: Notification stream (not started)
+        """
+
+        return self._client.notifications(UART_RX_UUID, maxsize, overflow)
+
+    def open_stream(self, window: int = NUS_WINDOW, chunk_size: int = None, verbose: bool = None) -> "BLENUSStream":
+
+        """
+        Return a byte stream over NUS (see BLENUSStream).
+
+        :param window: Maximum number of writes in flight
+
+        :param chunk_size: Bytes per write (the largest write the link allows by default)
+
+        :param verbose: True to print the data sent and received (the service's setting by default)
+
+        :return: Stream (not opened)
+        """
+
+        return BLENUSStream(self._client, window, chunk_size, self.verbose if verbose is None else verbose)
+
+
+class BLENUSStream:
+
+    """
+    Byte stream over NUS, for transfers that do not fit the one-write-per-call model of BLENUSService:
+
+        async with nus.open_stream() as stream:
+            await stream.send(data)
+            echo = await stream.readexactly(len(data), timeout=5)
+
+    send() splits the data into write-without-response packets of the link's maximum size and keeps up to window
+    writes in flight, instead of waiting for each write before issuing the next. Received notifications are
+    reassembled into an asyncio.StreamReader (reader), so the data can be read back independently of how it was
+    packetized.
+    """
+
+    def __init__(self, client: BLEClient, window: int = NUS_WINDOW, chunk_size: int = None, verbose: bool = False,
+                 limit: int = NUS_STREAM_LIMIT):
+
+        """
+        :param client: Connected BLEClient
+
+        :param window: Maximum number of writes in flight
+
+        :param chunk_size: Bytes per write (the largest write the link allows by default)
+
+        :param verbose: True to print the data sent and received
+
+        :param limit: Buffer limit of readuntil()
+        """
+
+        self.uuid = UART_RX_UUID
+        self.window = window
+        self.chunk_size = chunk_size
+        self.verbose = verbose
+
+        self.reader = asyncio.StreamReader(limit=limit)
+        """Reassembled received data"""
+
+        self.bytes_sent = 0
+        """Number of bytes written"""
+        self.bytes_received = 0
+        """Number of bytes received"""
+        self.packets_sent = 0
+        """Number of writes"""
+        self.packets_received = 0
+        """Number of notifications received"""
+
+        self._client = client
+        self._window = asyncio.Semaphore(window)
+        self._open = False
+
+    async def open(self) -> None:
+
+        """Start receiving NUS notifications into the stream."""
+
+        if not self._open:
+            await self._client._add_notification_stream(self)
+            self._open = True
+
+    async def close(self) -> None:
+
+        """Stop receiving. Data already received can still be read, after which reads return EOF."""
+
+        if self._open:
+            self._open = False
+            await self._client._remove_notification_stream(self)
+            self.reader.feed_eof()
+
+    async def __aenter__(self) -> "BLENUSStream":
+
+        await self.open()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+
+        await self.close()
+
+    async def send(self, data: bytes | bytearray) -> None:
+
+        """
+        Send data, split into packets with up to window writes in flight. Returns once every packet was written.
+
+        :param data: Data to send
+        """
+
+        chunk_size = self.chunk_size or self._client.max_write_size(UART_TX_UUID)
+        data = bytes(data)
+        writes = []
+
+        if self.verbose:
+            print("%s: send: %s" % (self.__class__.__name__, hexlify(data)))
+
+        # Tasks start in creation order, so the packets are written in order
+        for offset in range(0, len(data), chunk_size):
+            await self._window.acquire()
+            writes.append(asyncio.create_task(self._write(data[offset:offset + chunk_size])))
+
+        await asyncio.gather(*writes)
+
+    async def read(self, n: int = -1, timeout: float = None) -> bytes:
+
+        """Read up to n bytes (see asyncio.StreamReader.read()), raising TimeoutError after timeout seconds."""
+
+        return await asyncio.wait_for(self.reader.read(n), timeout)
+
+    async def readexactly(self, n: int, timeout: float = None) -> bytes:
+
+        """Read exactly n bytes (see asyncio.StreamReader.readexactly()), raising TimeoutError after timeout seconds."""
+
+        return await asyncio.wait_for(self.reader.readexactly(n), timeout)
+
+    async def readuntil(self, separator: bytes = b"\n", timeout: float = None) -> bytes:
+
+        """Read up to and including separator (see asyncio.StreamReader.readuntil()), raising TimeoutError after timeout seconds."""
+
+        return await asyncio.wait_for(self.reader.readuntil(separator), timeout)
+
+    async def _write(self, packet: bytes) -> None:
+
+        """Write one packet and release its slot in the window."""
+
+        try:
+            await self._client.write_gatt(UART_TX_UUID, packet, response=False)
+            self.bytes_sent += len(packet)
+            self.packets_sent += 1
+        finally:
+            self._window.release()
+
+    def _put(self, data: bytearray) -> None:
+
+        """Append a notification to the stream (called by BLEClient from the backend's callback)."""
+
+        self.bytes_received += len(data)
+        self.packets_received += 1
+
+        if self.verbose:
+            print("%s: received: %s" % (self.__class__.__name__, hexlify(data)))
+
+        self.reader.feed_data(bytes(data))
@@ -12,13 +12,18 @@ class BLEShellService(BLESMPService):
 
     """A service for performing shell operations over SMP."""
 
-    def __init__(self, client: BLEClient):
+    def __init__(self, client: BLEClient | SMPTransport, verbose: bool = False):
 
         """
         Construct a new BLEShellService object.
+
+        :param client: BLEClient or SMP transport to use for communication
+
+        :param verbose: True to print the commands executed
         """
 
         super().__init__(client)
+        self.verbose = verbose
 
     async def execute_command(self, command: list[str]):
 
@@ -32,7 +37,8 @@ class BLEShellService(BLESMPService):
 
         header = BLESMPService._get_smp_header(OP_WRITE, 0, GRP_SHELL_MANAGEMENT, 0, IMAGE_STATE_COMMAND)
 
-        print("%s: execute command: %s" % (self.__class__.__name__, command))
+        if self.verbose:
+            print("%s: execute command: %s" % (self.__class__.__name__, command))
         cbor_data = {"argv": command}
         payload = list(cbor2.dumps(cbor_data))
 
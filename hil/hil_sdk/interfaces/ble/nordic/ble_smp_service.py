@@ -4,12 +4,10 @@
 #
 
 from ..ble_client import BLEClient
+from .smp_transport import SMP_UUID, SMP_HEADER_SIZE, SMPTransport, BLESMPTransport
 import asyncio
 import cbor2
 
-# Singular characteristic used for send and receive
-SMP_UUID = "da2e7828-fbce-4e01-ae9e-261174997c48"
-
 # SMP operations
 OP_READ      = 0
 OP_READ_RSP  = 1
@@ -22,6 +20,10 @@ IMAGE_STATE_COMMAND  = 0
 IMAGE_UPLOAD_COMMAND = 1
 IMAGE_ERASE_COMMAND  = 5
 
+# OS management group commands
+OS_ECHO_COMMAND          = 0
+OS_MCUMGR_PARAMS_COMMAND = 6
+
 # Shell group and commands
 GRP_SHELL_MANAGEMENT = 9
 SHELL_EXECUTE_CMD    = 0
@@ -35,26 +37,33 @@ GRP_FILE_MANAGEMENT  = 8
 
 class BLESMPService:
 
-    """Provides an interface to send and receive SMP messages over Nordic's SMP Transport."""
+    """Provides an interface to send and receive SMP messages over Nordic's SMP Transport (or another SMP transport)."""
 
-    def __init__(self, client: BLEClient):
+    def __init__(self, client: BLEClient | SMPTransport):
 
         """
         Construct a new BLESMPService object.
 
-        :param client: BLEClient object to use for communication
+        :param client: BLEClient object to use for communication, or another SMP transport (eg, SerialSMPTransport)
         """
 
         self.smp_event = asyncio.Event()
         self.smp_response = None
-        self._client = client
+
+        if isinstance(client, SMPTransport):
+            self._client = None
+            self._transport = client
+        else:
+            self._client = client
+            self._transport = BLESMPTransport.for_client(client)
 
     async def write_smp_and_response(self, data: bytearray, timeout=10):
 
         """
         Write SMP data and wait for a response based on a timeout
 
-        :param data: Byte data to write to SMP characteristic
+        :param data: Byte data to write to SMP characteristic (the header's length and sequence number are set by
+            the transport)
 
         :param timeout: Timeout of operation (in seconds)
 
@@ -62,39 +71,48 @@ class BLESMPService:
         """
 
         try:
+            future = await self.send_smp(data)
+            rsp = await asyncio.wait_for(future, timeout=timeout)
 
-            # Make sure we are subscribed to notifications
-            if SMP_UUID not in self._client.get_notified_uuids():
-                await self._client.start_notify(SMP_UUID, self._smp_rx_cb)
+        except TimeoutError:
+            return None
 
-            self.smp_event.clear()
-            await self._client.write_gatt(SMP_UUID, data, response=False)
-            await asyncio.wait_for(self.smp_event.wait(), timeout=timeout)
-            self.smp_event.clear()
+        self.smp_response = rsp
+        self.smp_event.set()
 
-            return self.smp_response
+        return rsp
 
-        except TimeoutError:
-            return None
+    async def send_smp(self, data: bytearray) -> asyncio.Future:
 
-    def _smp_rx_cb(self, char_uuid: str, data: bytearray):
+        """
+        Write an SMP request without waiting for its response, so several requests can be in flight at once.
+        Responses are matched to their requests by group, command and sequence number (see SMPTransport).
 
+        :param data: Byte data to write to SMP characteristic (header and payload)
+
+        :return: Future resolved with the response object as a dictionary. Cancel it to stop waiting.
         """
-        Internal function that acts as an SMP received callback. Sets an event to notify the class
-        that new data has been received, and sets the global response object.
 
-        :param char_uuid: Characteristic over which the data was received
+        self.smp_event.clear()
+
+        return await self._transport.send(data)
+
+    async def get_mcumgr_params(self) -> dict | None:
+
+        """
+        Request the device's SMP buffer parameters.
 
-        :param data: Received data
+        :return: Dictionary with "buf_size" (bytes per SMP packet) and "buf_count", or None if not supported
         """
 
-        op, data_length, group, _, command = BLESMPService._parse_smp_header(data[0:8])
+        header = BLESMPService._get_smp_header(OP_READ, 0, GRP_OS_MANAGEMENT, 0, OS_MCUMGR_PARAMS_COMMAND)
 
-        cbor_data = data[8:]
-        cbor_obj = cbor2.loads(cbor_data)
+        rsp = await self.write_smp_and_response(bytearray(header))
 
-        self.smp_response = cbor_obj
-        self.smp_event.set()
+        if rsp is None or "buf_size" not in rsp:
+            return None
+
+        return rsp
 
     @staticmethod
     def _get_smp_header(operation, data_length: int, group: int, sequence: int, command: int):
@@ -108,7 +126,7 @@ class BLESMPService:
 
         :param group: Group number
 
-        :param sequence: Sequence number (usually 0)
+        :param sequence: Sequence number (replaced by the transport)
 
         :param command: Command number
 
@@ -0,0 +1,230 @@
+#
+# Copyright (C) 2026, Dojo Five
+# All rights reserved.
+#
+
+import weakref
+import asyncio
+import logging
+import cbor2
+from ..ble_client import BLEClient
+
+# Singular characteristic used for send and receive
+SMP_UUID = "da2e7828-fbce-4e01-ae9e-261174997c48"
+
+SMP_HEADER_SIZE     = 8    # Size of the SMP header preceding the CBOR payload
+SMP_SEQUENCE_OFFSET = 6    # Offset of the sequence number in the SMP header
+SMP_SEQUENCE_COUNT  = 256  # The sequence number is a single byte
+
+# BLEClient -> BLESMPTransport shared by every SMP service of the client
+_ble_transports = weakref.WeakKeyDictionary()
+
+
+class SMPTransport:
+
+    """
+    Framing layer between the SMP services and the link carrying SMP packets.
+
+    Requests are given a free sequence number, and several can be in flight at once. Received bytes are reassembled
+    into packets using the length field of the SMP header, so responses split over several notifications (eg, the
+    image state of two slots, or long shell output) are decoded whole. Each response is matched to its request by
+    group, command and sequence number.
+
+    Subclasses implement _write() and max_packet_size(), and call _receive() with the bytes received from the link.
+    """
+
+    def __init__(self):
+
+        self.unmatched = 0
+        """Number of responses that matched no request in flight (eg, responses arriving after a timeout)"""
+
+        self._sequence = 0
+        self._pending = {}  # (group, command, sequence) -> response future
+        self._rx_buffer = bytearray()
+
+    async def send(self, data: bytearray) -> asyncio.Future:
+
+        """
+        Write an SMP request without waiting for its response. The header's length and sequence number are set here.
+
+        :param data: SMP packet (header and payload)
+
+        :return: Future resolved with the response object as a dictionary (None if it could not be decoded).
+            Cancel it to stop waiting.
+        """
+
+        if len(data) < SMP_HEADER_SIZE:
+            raise ValueError(f"{self.__class__.__name__}: SMP packet of {len(data)} bytes has no header")
+
+        await self._open()
+
+        data = bytearray(data)
+        data[2:4] = (len(data) - SMP_HEADER_SIZE).to_bytes(2, byteorder="big")
+        data[SMP_SEQUENCE_OFFSET] = sequence = self._next_sequence()
+
+        key = (int.from_bytes(data[4:6], byteorder="big"), data[7], sequence)
+
+        # With nothing in flight, a partial packet left by a lost fragment would corrupt the next response
+        if not self._pending:
+            self._rx_buffer.clear()
+
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(lambda _: self._pending.pop(key, None) if self._pending.get(key) is future else None)
+        self._pending[key] = future
+
+        try:
+            await self._write(data)
+        except BaseException:
+            future.cancel()
+            raise
+
+        return future
+
+    @property
+    def in_flight(self) -> int:
+
+        """Number of requests waiting for their response."""
+
+        return len(self._pending)
+
+    @property
+    def connected(self) -> bool:
+
+        """True while the link can carry requests."""
+
+        return True
+
+    async def connect(self) -> bool:
+
+        """
+        Restore the link after it was lost (eg, to resume an upload).
+
+        :return: True on success, False otherwise
+        """
+
+        return self.connected
+
+    def max_packet_size(self) -> int:
+
+        """Return the largest SMP packet (header included) the link carries in one write."""
+
+        raise NotImplementedError
+
+    async def _open(self) -> None:
+
+        """Prepare the link to receive responses (called before each request)."""
+
+    async def _write(self, data: bytearray) -> None:
+
+        """Write an SMP packet to the link."""
+
+        raise NotImplementedError
+
+    def _receive(self, data: bytes) -> None:
+
+        """
+        Add bytes received from the link, and dispatch every complete packet
+
+        :param data: Received bytes (a whole packet, a fragment, or several packets)
+        """
+
+        self._rx_buffer += data
+
+        while len(self._rx_buffer) >= SMP_HEADER_SIZE:
+
+            packet_size = SMP_HEADER_SIZE + int.from_bytes(self._rx_buffer[2:4], byteorder="big")
+            if len(self._rx_buffer) < packet_size:
+                return
+
+            packet = bytes(self._rx_buffer[:packet_size])
+            del self._rx_buffer[:packet_size]
+
+            self._dispatch(packet)
+
+    def _dispatch(self, packet: bytes) -> None:
+
+        """Resolve the request a response packet answers."""
+
+        group = int.from_bytes(packet[4:6], byteorder="big")
+        key = (group, packet[7], packet[SMP_SEQUENCE_OFFSET])
+
+        future = self._pending.get(key)
+        if future is None or future.done():
+            self.unmatched += 1
+            return
+
+        try:
+            response = cbor2.loads(packet[SMP_HEADER_SIZE:])
+        except Exception as e:
+            logging.error(f"{self.__class__.__name__}: undecodable response to group {key[0]} command {key[1]}: {e}")
+            response = None
+
+        future.set_result(response)
+
+    def _next_sequence(self) -> int:
+
+        """Return the next sequence number not used by a request in flight."""
+
+        in_use = {sequence for _, _, sequence in self._pending}
+
+        for _ in range(SMP_SEQUENCE_COUNT):
+            sequence = self._sequence
+            self._sequence = (self._sequence + 1) % SMP_SEQUENCE_COUNT
+            if sequence not in in_use:
+                return sequence
+
+        raise RuntimeError(f"{self.__class__.__name__}: all {SMP_SEQUENCE_COUNT} sequence numbers are in flight")
+
+
+class BLESMPTransport(SMPTransport):
+
+    """SMP over Nordic's SMP characteristic: requests are written without response, responses are notified."""
+
+    def __init__(self, client: BLEClient):
+
+        """
+        Create a transport over a client. Use for_client() so the services of a client share one transport.
+
+        :param client: BLEClient object to use for communication
+        """
+
+        super().__init__()
+        self._client = client
+
+    @staticmethod
+    def for_client(client: BLEClient) -> "BLESMPTransport":
+
+        """Return the transport of a client, shared by all the SMP services using it."""
+
+        transport = _ble_transports.get(client)
+        if transport is None:
+            transport = _ble_transports[client] = BLESMPTransport(client)
+
+        return transport
+
+    @property
+    def connected(self) -> bool:
+
+        return self._client.connected
+
+    async def connect(self) -> bool:
+
+        return await self._client.connect()
+
+    def max_packet_size(self) -> int:
+
+        return self._client.max_write_size(SMP_UUID)
+
+    async def _open(self) -> None:
+
+        # Subscribe once; the client restores the subscription when it reconnects
+        if self._client.get_notify_callback(SMP_UUID) != self._on_notification:
+            await self._client.start_notify(SMP_UUID, self._on_notification)
+
+    async def _write(self, data: bytearray) -> None:
+
+        await self._client.write_gatt(SMP_UUID, data, response=False)
+
+    def _on_notification(self, char_uuid: str, data: bytearray) -> None:
+
+        self._receive(data)
@@ -0,0 +1,363 @@
+#
+# Copyright (C) 2026, Dojo Five
+# All rights reserved.
+#
+
+import os
+import json
+import time
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from collections.abc import Awaitable, Callable
+from .jlink_interface import JLinkInterface
+from .nrfjprog_interface import nrfjprog_list_probes
+from .serial.serial_interface import SerialInterface
+from .ble.ble_connection_pool import BLEConnectionPool
+
+SEGGER_VCOM_PATH    = "/dev/serial/by-id/usb-SEGGER_J-Link_{serial_no:0>12}-if00"  # VCOM port of a J-Link OB probe
+MAC_ADDRESS_COMMAND = b"mac_address\n"  # Serial command the demo firmware answers with its BLE address
+BLE_ADDR_STR_LEN    = 18                # Length of a BLE address string (including newline)
+SERIAL_BAUDRATE     = 115200
+
+
+class DUT:
+
+    """A device under test on the station: its debug probe, its VCOM port and its BLE address."""
+
+    def __init__(self,
+                 name: str,
+                 serial_no: int | str = None,
+                 serial_port: str = None,
+                 ble_address: str = None,
+                 device: str = "nRF52832_xxAA",
+                 family: str = "NRF52"):
+
+        self.name = name
+        """Identity of the DUT (used for logs and results)"""
+        self.serial_no = None if serial_no is None else str(serial_no)
+        """Serial number of the J-Link probe connected to the DUT"""
+        self.serial_port = serial_port
+        """VCOM port of the DUT"""
+        self.ble_address = ble_address
+        """BLE address of the DUT"""
+        self.device = device
+        """J-Link name of the target processor"""
+        self.family = family
+        """nrfjprog device family"""
+
+        self.jlink = JLinkInterface(device, serial_no=self.serial_no) if self.serial_no is not None else None
+        """J-Link interface bound to the DUT's probe (None if the DUT has no probe)"""
+        self.client = None
+        """BLE client of the DUT, set by DUTRegistry.connect_all() and reconnected by DUTRegistry.run() if it dropped"""
+
+        # Only one test runs on a DUT at a time, and only one operation uses its probe at a time
+        self._lock = asyncio.Lock()
+        self._probe_lock = asyncio.Lock()
+
+    async def reset(self) -> bool:
+
+        """
+        Reset the DUT through its probe, without blocking the event loop.
+
+        :return: True on success, False otherwise
+        """
+
+        if self.jlink is None:
+            logging.error(f"{self.__class__.__name__}: {self.name} has no probe")
+            return False
+
+        async with self._probe_lock:
+            return await asyncio.to_thread(self.jlink.reset_and_go, delay_ms=0)
+
+    def read_ble_address(self) -> str | None:
+
+        """
+        Ask the firmware for the DUT's BLE address over its VCOM port, and remember it.
+
+        :return: BLE address, or None if it could not be read
+        """
+
+        if self.serial_port is None:
+            return None
+
+        try:
+            port = SerialInterface(self.serial_port, baudrate=SERIAL_BAUDRATE, read_timeout=0.5)
+        except Exception as e:
+            logging.error(f"{self.__class__.__name__}: unable to open {self.serial_port} for {self.name}: {e}")
+            return None
+
+        try:
+            port.write(MAC_ADDRESS_COMMAND)
+            response = port.read(BLE_ADDR_STR_LEN)
+        finally:
+            port.close()
+
+        if len(response) != BLE_ADDR_STR_LEN:
+            logging.error(f"{self.__class__.__name__}: no BLE address from {self.name} on {self.serial_port}")
+            return None
+
+        self.ble_address = response.decode(errors="replace").strip()
+        return self.ble_address
+
+    def __repr__(self) -> str:
+
+        return f"DUT({self.name}, probe={self.serial_no}, port={self.serial_port}, ble={self.ble_address})"
+
+
+class DUTResult:
+
+    """Outcome of a coroutine run on one DUT by DUTRegistry.run()."""
+
+    def __init__(self, name: str):
+
+        self.name = name
+        """Name of the DUT"""
+        self.value = None
+        """Value returned by the coroutine"""
+        self.error = None
+        """Exception raised by the coroutine, or None"""
+        self.duration = 0.0
+        """Time spent running the coroutine, in seconds"""
+
+    @property
+    def success(self) -> bool:
+
+        """True if the coroutine completed without raising."""
+
+        return self.error is None
+
+
+class DUTRegistry:
+
+    """
+    The DUTs of a station, and the scheduling needed to test them concurrently from one process and one BLE adapter.
+
+    run() executes a coroutine on every DUT at once with asyncio, so a suite takes about as long for N DUTs as for one.
+    Only the shared resources are serialized:
+
+    - BLE scanning: device lookups are answered by one background scan (pass BLEDeviceCache.wait_for as the
+      connection pool's device_lookup) instead of one scan per DUT
+    - BLE connection attempts: serialized by the BLEConnectionPool
+    - Probe access: one operation at a time per probe (see DUT.reset())
+    - Each DUT runs one coroutine at a time
+
+    The DUTs' clients are pooled connections, which an exclusive acquire or a reset of the DUT closes, so run()
+    reconnects a DUT's client through the pool before each coroutine if it is no longer connected.
+    """
+
+    def __init__(self, duts: list[DUT] = None, pool: BLEConnectionPool = None):
+
+        """
+        Create a new registry.
+
+        :param duts: DUTs of the station
+
+        :param pool: Connection pool used by connect_all() (a new pool by default, closed by close())
+        """
+
+        self.pool = pool if pool is not None else BLEConnectionPool()
+        self._own_pool = pool is None
+        self._duts = {}
+
+        for dut in duts or []:
+            self.add(dut)
+
+    def add(self, dut: DUT) -> None:
+
+        """Add a DUT to the registry."""
+
+        self._duts[dut.name] = dut
+
+    def get(self, name: str) -> DUT | None:
+
+        """Return a DUT by name (None if there is no such DUT)."""
+
+        return self._duts.get(name)
+
+    @property
+    def duts(self) -> list[DUT]:
+
+        """DUTs of the registry, in the order they were added."""
+
+        return list(self._duts.values())
+
+    def __len__(self) -> int:
+
+        return len(self._duts)
+
+    def __iter__(self):
+
+        return iter(self.duts)
+
+    @staticmethod
+    def from_file(path: str, device: str = "nRF52832_xxAA", family: str = "NRF52", pool: BLEConnectionPool = None) -> "DUTRegistry":
+
+        """
+        Load the DUTs of a station from a JSON file holding a list of objects with a "name" and optionally a
+        "serial_no", "serial_port", "ble_address", "device" and "family".
+
+        :param path: Path of the JSON file
+
+        :param device: J-Link device name of DUTs that do not give one
+
+        :param family: nrfjprog family of DUTs that do not give one
+
+        :param pool: Connection pool of the registry
+
+        :return: Registry of the DUTs
+        """
+
+        with open(path, "r") as duts_file:
+            entries = json.load(duts_file)
+
+        duts = [DUT(entry["name"],
+                    entry.get("serial_no"),
+                    entry.get("serial_port"),
+                    entry.get("ble_address"),
+                    entry.get("device", device),
+                    entry.get("family", family)) for entry in entries]
+
+        return DUTRegistry(duts, pool)
+
+    @staticmethod
+    def discover(device: str = "nRF52832_xxAA", family: str = "NRF52", pool: BLEConnectionPool = None) -> "DUTRegistry":
+
+        """
+        Build the registry from the attached J-Link probes. Each probe's VCOM port is located by its serial number;
+        BLE addresses are read later by read_ble_addresses().
+
+        :param device: J-Link device name of the DUTs
+
+        :param family: nrfjprog family of the DUTs
+
+        :param pool: Connection pool of the registry
+
+        :return: Registry with one DUT per probe, named after the probe's serial number
+        """
+
+        duts = []
+
+        for serial_no in nrfjprog_list_probes():
+            serial_port = SEGGER_VCOM_PATH.format(serial_no=serial_no)
+            duts.append(DUT(serial_no, serial_no, serial_port if os.path.exists(serial_port) else None, None, device, family))
+
+        return DUTRegistry(duts, pool)
+
+    async def read_ble_addresses(self) -> bool:
+
+        """
+        Read the BLE address of every DUT that does not have one, over the DUTs' VCOM ports (concurrently).
+
+        :return: True if every DUT has a BLE address afterwards
+        """
+
+        pending = [dut for dut in self if dut.ble_address is None]
+        await asyncio.gather(*(asyncio.to_thread(dut.read_ble_address) for dut in pending))
+
+        for dut in self:
+            logging.info(f"{self.__class__.__name__}: {dut}")
+
+        return all(dut.ble_address is not None for dut in self)
+
+    async def connect_all(self) -> dict[str, bool]:
+
+        """
+        Connect every DUT that has a BLE address through the pool, and set the DUTs' clients.
+
+        :return: Dictionary of connection success, keyed by DUT name
+        """
+
+        duts = [dut for dut in self if dut.ble_address is not None]
+        clients = await asyncio.gather(*(self.pool.acquire(dut.ble_address) for dut in duts))
+
+        for dut, client in zip(duts, clients):
+            dut.client = client
+
+        return {dut.name: dut.client is not None for dut in duts}
+
+    @asynccontextmanager
+    async def reserve(self, dut: DUT):
+
+        """
+        Context manager giving exclusive use of a DUT for its duration:
+
+            async with registry.reserve(dut):
+                ...
+        """
+
+        async with dut._lock:
+            yield dut
+
+    async def run(self,
+                  function: Callable[[DUT], Awaitable],
+                  duts: list[DUT] = None,
+                  timeout: float = None) -> dict[str, DUTResult]:
+
+        """
+        Run a coroutine function on several DUTs at once. A failure on one DUT does not affect the others.
+        The client of a DUT connected by connect_all() is reconnected first if the connection dropped; if that fails,
+        the coroutine is not called and the DUT's result holds a ConnectionError.
+
+        :param function: Coroutine function called with each DUT
+
+        :param duts: DUTs to run on (all DUTs by default)
+
+        :param timeout: Optional time limit per DUT, in seconds
+
+        :return: Result of each DUT, keyed by DUT name
+        """
+
+        async def run_one(dut: DUT) -> DUTResult:
+
+            result = DUTResult(dut.name)
+
+            async with self.reserve(dut):
+                start = time.monotonic()
+                try:
+                    if not await self._reconnect(dut):
+                        raise ConnectionError(f"unable to reconnect to {dut.ble_address}")
+                    result.value = await asyncio.wait_for(function(dut), timeout)
+                except Exception as e:
+                    logging.error(f"{self.__class__.__name__}: {dut.name} failed: {e!r}")
+                    result.error = e
+                result.duration = time.monotonic() - start
+
+            return result
+
+        results = await asyncio.gather(*(run_one(dut) for dut in (duts if duts is not None else self.duts)))
+
+        return {result.name: result for result in results}
+
+    async def _reconnect(self, dut: DUT) -> bool:
+
+        """
+        Make sure the client of a DUT is connected, acquiring it again from the pool if the connection dropped.
+
+        :return: True if the DUT's client is connected or the DUT has no client, False otherwise
+        """
+
+        if dut.client is None or dut.client.connected:
+            return True
+
+        logging.info(f"{self.__class__.__name__}: {dut.name} is disconnected, reconnecting")
+        client = await self.pool.acquire(dut.ble_address)
+        if client is None:
+            return False
+
+        dut.client = client
+        return True
+
+    async def close(self) -> None:
+
+        """Release the DUTs' clients (disconnecting them if the registry owns the pool) and close the probe sessions."""
+
+        for dut in self:
+            if dut.client is not None:
+                await self.pool.release(dut.client)
+                dut.client = None
+            if dut.jlink is not None:
+                dut.jlink.close_session()
+
+        if self._own_pool:
+            await self.pool.close()
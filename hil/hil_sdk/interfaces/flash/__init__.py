@@ -0,0 +1,4 @@
+#
+# Copyright (C) 2026, Dojo Five
+# All rights reserved.
+#
@@ -0,0 +1,333 @@
+#
+# Copyright (C) 2026, Dojo Five
+# All rights reserved.
+#
+
+"""Reprograms only the flash pages that changed since the last time a target was flashed"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+from collections.abc import Callable
+from .intel_hex import IntelHexImage
+from .flash_cache import default_target_id, probe_kwargs, SIGNATURE_SIZE, SIGNATURE_SAMPLES
+from ..jlink_interface import JLinkInterface
+from ..nrfjprog_interface import nrfjprog_flash
+
+DEFAULT_STATE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "hil_sdk", "flash_state")
+FLASH_PAGE_SIZE   = 4096  # Flash page size of nRF52 and nRF53 devices
+ERASED_BYTE       = 0xFF  # Value of erased flash
+
+
+class DifferentialFlashResult:
+
+    """Outcome of a DifferentialFlasher.flash() call."""
+
+    def __init__(self, status: int, full_flash: bool, reason: str, pages_programmed: int, pages_total: int, elapsed: float):
+
+        self.status = status
+        """Status of the operation (0 for success)"""
+        self.full_flash = full_flash
+        """True if the whole image was programmed with the full flash function"""
+        self.reason = reason
+        """Why a full flash was needed, or a summary of the differential flash"""
+        self.pages_programmed = pages_programmed
+        """Number of pages programmed (all pages of the image for a full flash)"""
+        self.pages_total = pages_total
+        """Number of pages in the image"""
+        self.elapsed = elapsed
+        """Seconds spent flashing"""
+
+
+class DifferentialFlasher:
+
+    """
+    Reprograms only the flash pages that differ from the last image flashed to a target.
+
+    The flasher keeps a per-target record of the last flashed image, as one digest per flash page. When a new image is
+    flashed, the pages whose contents changed (including pages that are no longer used, which are erased) are
+    programmed through a J-Link session, and only those pages are read back for verification. Unchanged regions, such
+    as the bootloader, are not touched: a signature of them (sampled like FlashCache does) is read back first, to
+    confirm the target still holds what the record describes.
+
+    A full flash (by default nrfjprog_flash, which also recovers the device) is performed instead when there is no
+    record for the target, when changed pages fall outside flash_ranges, when the unchanged pages differ from the
+    signature (eg, the target was programmed by another tool), or when the differential flash fails.
+    """
+
+    def __init__(self,
+                 jlink: JLinkInterface,
+                 state_dir: str = DEFAULT_STATE_DIR,
+                 target_id: str = None,
+                 page_size: int = FLASH_PAGE_SIZE,
+                 flash_ranges: list[tuple[int, int]] = None,
+                 full_flash_function: Callable[[str, str], int] = nrfjprog_flash,
+                 signature_size: int = SIGNATURE_SIZE,
+                 signature_samples: int = SIGNATURE_SAMPLES):
+
+        """
+        Create a new differential flasher.
+
+        :param jlink: J-Link interface connected to the target
+
+        :param state_dir: Directory holding the per-target records
+
+        :param target_id: Name of the target record (defaults to the J-Link device name and probe serial number)
+
+        :param page_size: Flash page (erase unit) size, in bytes
+
+        :param flash_ranges: Optional list of (start, end) address ranges that can be programmed over the J-Link
+            connection (eg, the application core flash of an nRF53). Defaults to all addresses.
+
+        :param full_flash_function: Function used for full flashes, called as full_flash_function(hex_path, family),
+            with snr set to the J-Link's serial number if it has one, and returning 0 on success
+
+        :param signature_size: Number of bytes read back at each sampled location of the unchanged regions
+
+        :param signature_samples: Number of evenly spaced locations sampled per unchanged region
+        """
+
+        self.jlink = jlink
+        self.state_dir = state_dir
+        self.target_id = target_id if target_id is not None else default_target_id(jlink)
+        self.page_size = page_size
+        self.flash_ranges = flash_ranges
+        self.full_flash_function = full_flash_function
+        self.signature_size = signature_size
+        self.signature_samples = signature_samples
+
+    def flash(self, hex_path: str, family: str, logfile: str = None) -> DifferentialFlashResult:
+
+        """
+        Program an Intel HEX image, rewriting only the pages that changed since the last flash of this target.
+
+        :param hex_path: Path to the .hex file
+
+        :param family: Device family passed to the full flash function (eg, "NRF53")
+
+        :param logfile: Optional log file passed to the full flash function
+
+        :return: Outcome of the operation
+        :rtype: DifferentialFlashResult
+        """
+
+        start_time = time.monotonic()
+
+        pages = self._split_pages(IntelHexImage.load(hex_path))
+        page_digests = {str(address): self._digest(data) for address, data in pages.items()}
+        record = self._load_record()
+
+        if record is None or record.get("page_size") != self.page_size:
+            return self._full_flash(hex_path, family, pages, page_digests, "no record of the target's contents", start_time, logfile)
+
+        old_digests = record["pages"]
+        changed = sorted(int(address) for address, digest in page_digests.items() if old_digests.get(address) != digest)
+        removed = sorted(int(address) for address in old_digests if address not in page_digests)
+
+        # Pages no longer used by the image are erased
+        regions = [(address, pages[address]) for address in changed]
+        regions += [(address, bytes([ERASED_BYTE]) * self.page_size) for address in removed]
+        regions.sort()
+
+        if not all(self._programmable(address) for address, _ in regions):
+            return self._full_flash(hex_path, family, pages, page_digests, "changed pages outside flash_ranges", start_time, logfile)
+
+        # The record is only trusted if the pages left as they are still match their signature
+        unchanged = sorted((address, data) for address, data in pages.items() if address not in changed and self._programmable(address))
+
+        if regions:
+            logging.info(f"{self.__class__.__name__}: programming {len(regions)} of {len(pages)} pages")
+
+        reason = self._update_target(self._merge_regions(regions), self._merge_regions(unchanged))
+        if reason is not None:
+            return self._full_flash(hex_path, family, pages, page_digests, reason, start_time, logfile)
+
+        if not regions:
+            return DifferentialFlashResult(0, False, "no pages changed", 0, len(pages), time.monotonic() - start_time)
+
+        self._save_record(page_digests)
+
+        return DifferentialFlashResult(0, False, f"programmed {len(regions)} changed pages", len(regions), len(pages),
+                                       time.monotonic() - start_time)
+
+    def __call__(self, hex_path: str, family: str, snr: int | str = None, logfile: str = None) -> int:
+
+        """
+        Flash an image and return 0 on success, so the flasher can be used wherever a flash function such as
+        nrfjprog_flash is expected (eg, as the flash function of a FlashCache or a FlashOrchestrator). The probe is
+        always the J-Link's, so snr is ignored.
+        """
+
+        return self.flash(hex_path, family, logfile).status
+
+    def invalidate(self) -> None:
+
+        """Forget the record for this target, forcing the next flash() to be a full flash."""
+
+        try:
+            os.remove(self._record_path())
+        except FileNotFoundError:
+            pass
+
+    def _full_flash(self, hex_path: str, family: str, pages: dict, page_digests: dict, reason: str, start_time: float,
+                    logfile: str = None) -> DifferentialFlashResult:
+
+        """Program the whole image with the full flash function and record its pages."""
+
+        logging.info(f"{self.__class__.__name__}: full flash of {os.path.basename(hex_path)} ({reason})")
+
+        # Release the probe for the flash tool, and restore the session afterwards
+        session_was_open = self.jlink.session_open
+        if session_was_open:
+            self.jlink.close_session()
+
+        kwargs = probe_kwargs(self.jlink)
+        if logfile is not None:
+            kwargs["logfile"] = logfile
+
+        status = self.full_flash_function(hex_path, family, **kwargs)
+
+        if session_was_open:
+            self.jlink.open_session()
+
+        if status == 0:
+            self._save_record(page_digests)
+        else:
+            self.invalidate()
+
+        return DifferentialFlashResult(status, True, reason, len(pages), len(pages), time.monotonic() - start_time)
+
+    def _update_target(self, regions: list[tuple[int, bytes]], unchanged: list[tuple[int, bytes]]) -> str | None:
+
+        """
+        Over one J-Link session, read back a signature of the unchanged regions, then program the changed regions and
+        read them back.
+
+        :return: Why a full flash is needed, or None on success
+        """
+
+        opened_here = False
+
+        if not self.jlink.session_open:
+            opened_here = self.jlink.open_session()
+            if not opened_here:
+                return "J-Link session could not be opened"
+
+        try:
+            if not self._verify(self._signature(unchanged)):
+                return "target contents differ from record"
+
+            if regions and not (self.jlink.flash_write(regions) and self._verify(regions)):
+                return "differential flash failed"
+
+            return None
+
+        finally:
+            if opened_here:
+                self.jlink.close_session()
+
+    def _verify(self, regions: list[tuple[int, bytes]]) -> bool:
+
+        """Read the given regions back from the target and compare them with their expected contents."""
+
+        for address, data in regions:
+            if self.jlink.memory_read(address, len(data)) != data:
+                logging.error(f"{self.__class__.__name__}: verify failed at 0x{address:08x}")
+                return False
+
+        return True
+
+    def _signature(self, regions: list[tuple[int, bytes]]) -> list[tuple[int, bytes]]:
+
+        """Return the samples of each region (its first and last bytes, and evenly spaced locations) to read back."""
+
+        samples = []
+
+        for start, data in regions:
+            length = min(self.signature_size, len(data))
+            offsets = {0, len(data) - length}
+            for i in range(1, self.signature_samples + 1):
+                offsets.add(((len(data) - length) * i) // (self.signature_samples + 1))
+
+            samples.extend((start + offset, data[offset:offset + length]) for offset in sorted(offsets))
+
+        return samples
+
+    def _split_pages(self, image: IntelHexImage) -> dict[int, bytes]:
+
+        """Split an image into full flash pages, filling bytes not covered by the image with the erased value."""
+
+        pages = {}
+
+        for start, data in image.segments:
+
+            offset = 0
+            while offset < len(data):
+                address = start + offset
+                page_address = address - (address % self.page_size)
+                page_offset = address - page_address
+                length = min(self.page_size - page_offset, len(data) - offset)
+
+                page = pages.setdefault(page_address, bytearray([ERASED_BYTE]) * self.page_size)
+                page[page_offset:page_offset + length] = data[offset:offset + length]
+                offset += length
+
+        return {address: bytes(page) for address, page in pages.items()}
+
+    def _merge_regions(self, regions: list[tuple[int, bytes]]) -> list[tuple[int, bytes]]:
+
+        """Merge consecutive pages into contiguous regions (regions must be sorted)."""
+
+        merged = []
+
+        for address, data in regions:
+            if merged and merged[-1][0] + len(merged[-1][1]) == address:
+                merged[-1] = (merged[-1][0], merged[-1][1] + data)
+            else:
+                merged.append((address, data))
+
+        return merged
+
+    def _programmable(self, address: int) -> bool:
+
+        """Return True if a page can be programmed over the J-Link connection."""
+
+        if self.flash_ranges is None:
+            return True
+
+        return any(low <= address and address + self.page_size <= high for low, high in self.flash_ranges)
+
+    @staticmethod
+    def _digest(data: bytes) -> str:
+
+        return hashlib.sha256(data).hexdigest()
+
+    def _record_path(self) -> str:
+
+        safe_id = "".join(c if c.isalnum() or c in "-_." else "_" for c in self.target_id)
+        return os.path.join(self.state_dir, f"{safe_id}.json")
+
+    def _load_record(self) -> dict | None:
+
+        """Load the record of the target's contents (None if there is none)."""
+
+        try:
+            with open(self._record_path(), "r") as record_file:
+                return json.load(record_file)
+        except (OSError, ValueError):
+            return None
+
+    def _save_record(self, page_digests: dict) -> None:
+
+        """Write the record of the target's contents atomically."""
+
+        os.makedirs(self.state_dir, exist_ok=True)
+
+        record = {"page_size": self.page_size, "updated_at": time.time(), "pages": page_digests}
+
+        temp_path = self._record_path() + ".tmp"
+        with open(temp_path, "w") as record_file:
+            json.dump(record, record_file)
+        os.replace(temp_path, self._record_path())
@@ -0,0 +1,257 @@
+#
+# Copyright (C) 2026, Dojo Five
+# All rights reserved.
+#
+
+"""Skips reprogramming a target that already holds the image to be flashed"""
+
+import os
+import json
+import time
+import logging
+import tempfile
+import threading
+from collections.abc import Callable
+from .intel_hex import IntelHexImage
+from ..jlink_interface import JLinkInterface
+from ..nrfjprog_interface import nrfjprog_flash
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows: only the updates of this process are serialized
+    fcntl = None
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "hil_sdk", "flash_cache.json")
+SIGNATURE_SIZE     = 256  # Bytes read back from each sampled location
+SIGNATURE_SAMPLES  = 4    # Locations sampled per segment, in addition to its first and last bytes
+
+# Serializes the cache file updates of the process (the file lock also covers other processes)
+_cache_file_lock = threading.Lock()
+
+
+def default_target_id(jlink: JLinkInterface) -> str:
+
+    """Return the name identifying a J-Link's target in flash records: the device name, and the probe's serial number
+    if it has one (so DUTs of the same device type on one host keep separate records)."""
+
+    return jlink.device if jlink.serial_no is None else f"{jlink.device}_{jlink.serial_no}"
+
+
+def probe_kwargs(jlink: JLinkInterface) -> dict:
+
+    """Return the keyword arguments selecting a J-Link's probe in nrfjprog-style flash functions."""
+
+    return {} if jlink.serial_no is None else {"snr": jlink.serial_no}
+
+
+class FlashCacheResult:
+
+    """Outcome of a FlashCache.flash() call."""
+
+    def __init__(self, status: int, flashed: bool, reason: str, check_time: float, flash_time: float, time_saved: float):
+
+        self.status = status
+        """Status of the flash operation (0 for success, as returned by the flash function)"""
+        self.flashed = flashed
+        """True if the target was programmed, False if programming was skipped"""
+        self.reason = reason
+        """Why the target was (or was not) programmed"""
+        self.check_time = check_time
+        """Seconds spent checking the target's contents"""
+        self.flash_time = flash_time
+        """Seconds spent programming the target (0 if skipped)"""
+        self.time_saved = time_saved
+        """Estimated seconds saved by skipping programming (0 if the target was programmed)"""
+
+
+class FlashCache:
+
+    """
+    Programs a target only if it does not already hold the requested image.
+
+    The cache remembers, per target, the digest of the last image programmed successfully and how long programming
+    took. When the same image is requested again, a signature of the image (the first and last bytes of each segment
+    plus a few evenly spaced samples) is read back from the target over the J-Link and compared with the image. Only
+    if both match is programming skipped. A J-Link session is used for the read-back (opened temporarily if needed).
+
+    The records of all targets share one file. Each update re-reads it under a lock and only replaces the record of
+    its own target, so caches of several probes can flash concurrently (eg, from a FlashOrchestrator).
+    """
+
+    def __init__(self,
+                 jlink: JLinkInterface,
+                 cache_path: str = DEFAULT_CACHE_PATH,
+                 target_id: str = None,
+                 verify_ranges: list[tuple[int, int]] = None,
+                 signature_size: int = SIGNATURE_SIZE,
+                 signature_samples: int = SIGNATURE_SAMPLES):
+
+        """
+        Create a new flash cache.
+
+        :param jlink: J-Link interface connected to the target (used to read back the signature)
+
+        :param cache_path: Path of the JSON file holding the cache records
+
+        :param target_id: Name of the target in the cache (defaults to the J-Link device name and probe serial number)
+
+        :param verify_ranges: Optional list of (start, end) address ranges readable from the J-Link connection.
+            Segments outside these ranges (eg, the network core of an nRF53 when connected to the application core)
+            are only checked through the cache record. Defaults to all segments.
+
+        :param signature_size: Number of bytes read back at each sampled location
+
+        :param signature_samples: Number of evenly spaced locations sampled per segment
+        """
+
+        self.jlink = jlink
+        self.cache_path = cache_path
+        self.target_id = target_id if target_id is not None else default_target_id(jlink)
+        self.verify_ranges = verify_ranges
+        self.signature_size = signature_size
+        self.signature_samples = signature_samples
+
+    def flash(self, hex_path: str, family: str, flash_function: Callable[[str, str], int] = nrfjprog_flash) -> FlashCacheResult:
+
+        """
+        Program an Intel HEX image onto the target, unless the target already holds it.
+
+        :param hex_path: Path to the .hex file
+
+        :param family: Device family passed to the flash function (eg, "NRF53")
+
+        :param flash_function: Function that programs the target, called as flash_function(hex_path, family), with
+            snr set to the J-Link's serial number if it has one, and returning 0 on success (defaults to nrfjprog_flash)
+
+        :return: Outcome of the operation
+        :rtype: FlashCacheResult
+        """
+
+        check_start = time.monotonic()
+
+        image = IntelHexImage.load(hex_path)
+        digest = image.sha256()
+        record = self._load_cache().get(self.target_id, {})
+
+        if record.get("digest") != digest:
+            reason = "image changed since last flash" if record.get("digest") else "no cache record for target"
+        elif not self._target_matches(image):
+            reason = "target contents differ from image"
+        else:
+            reason = None
+
+        check_time = time.monotonic() - check_start
+
+        if reason is None:
+            time_saved = max(record.get("flash_time", 0.0) - check_time, 0.0)
+            record["skipped"] = record.get("skipped", 0) + 1
+            record["total_time_saved"] = record.get("total_time_saved", 0.0) + time_saved
+            self._store_record(record)
+
+            logging.info(f"{self.__class__.__name__}: {os.path.basename(hex_path)} already on target, "
+                         f"skipped flashing (check {check_time:.2f} s, saved {time_saved:.1f} s)")
+
+            return FlashCacheResult(0, False, "target already holds image", check_time, 0.0, time_saved)
+
+        logging.info(f"{self.__class__.__name__}: flashing {os.path.basename(hex_path)} ({reason})")
+
+        flash_start = time.monotonic()
+        status = flash_function(hex_path, family, **probe_kwargs(self.jlink))
+        flash_time = time.monotonic() - flash_start
+
+        if status == 0:
+            self._store_record({"digest": digest,
+                                "hex_path": os.path.abspath(hex_path),
+                                "flash_time": flash_time,
+                                "flashed_at": time.time(),
+                                "skipped": record.get("skipped", 0),
+                                "total_time_saved": record.get("total_time_saved", 0.0)})
+        else:
+            self._store_record(None)  # Target contents are unknown after a failed flash
+
+        return FlashCacheResult(status, True, reason, check_time, flash_time, 0.0)
+
+    def invalidate(self) -> None:
+
+        """Forget the cache record for this target, forcing the next flash() to program it."""
+
+        if self.target_id in self._load_cache():
+            self._store_record(None)
+
+    def _target_matches(self, image: IntelHexImage) -> bool:
+
+        """Read the image signature back from the target and compare it with the image."""
+
+        opened_here = False
+
+        if not self.jlink.session_open:
+            opened_here = self.jlink.open_session()
+            if not opened_here:
+                return False
+
+        try:
+            for address, length in self._signature_locations(image):
+                if self.jlink.memory_read(address, length) != image.read(address, length):
+                    return False
+            return True
+        finally:
+            # Release the probe for the flash tool
+            if opened_here:
+                self.jlink.close_session()
+
+    def _signature_locations(self, image: IntelHexImage) -> list[tuple[int, int]]:
+
+        """Return the (address, length) locations sampled from each verifiable segment."""
+
+        locations = []
+
+        for start, data in image.segments:
+
+            end = start + len(data)
+            if self.verify_ranges is not None and not any(low <= start and end <= high for low, high in self.verify_ranges):
+                continue
+
+            length = min(self.signature_size, len(data))
+            offsets = {0, len(data) - length}
+            for i in range(1, self.signature_samples + 1):
+                offsets.add(((len(data) - length) * i) // (self.signature_samples + 1))
+
+            locations.extend((start + offset, length) for offset in sorted(offsets))
+
+        return locations
+
+    def _load_cache(self) -> dict:
+
+        """Load the cache file (an empty cache if it does not exist or is unreadable)."""
+
+        try:
+            with open(self.cache_path, "r") as cache_file:
+                return json.load(cache_file)
+        except (OSError, ValueError):
+            return {}
+
+    def _store_record(self, record: dict | None) -> None:
+
+        """
+        Replace the record of this target (or remove it if record is None). The file is re-read under a lock, so
+        that the records written meanwhile for other targets are kept, and written atomically.
+        """
+
+        cache_dir = os.path.dirname(os.path.abspath(self.cache_path))
+        os.makedirs(cache_dir, exist_ok=True)
+
+        with _cache_file_lock, open(self.cache_path + ".lock", "a") as lock_file:
+
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)  # Released when the file is closed
+
+            cache = self._load_cache()
+            if record is None:
+                cache.pop(self.target_id, None)
+            else:
+                cache[self.target_id] = record
+
+            with tempfile.NamedTemporaryFile("w", dir=cache_dir, prefix=os.path.basename(self.cache_path),
+                                             suffix=".tmp", delete=False) as temp_file:
+                json.dump(cache, temp_file, indent=2)
+            os.replace(temp_file.name, self.cache_path)
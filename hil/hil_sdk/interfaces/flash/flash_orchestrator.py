@@ -0,0 +1,235 @@
+#
+# Copyright (C) 2026, Dojo Five
+# All rights reserved.
+#
+
+"""Flashes several devices under test, each behind its own debug probe, concurrently"""
+
+import os
+import time
+import logging
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from ..nrfjprog_interface import nrfjprog_flash, nrfjprog_reset, nrfjprog_list_probes
+
+DEFAULT_RETRIES     = 2    # Extra attempts made for a DUT whose job failed
+DEFAULT_RETRY_DELAY = 1.0  # Seconds to wait before retrying a failed job
+
+
+class FlashTarget:
+
+    """A device under test (DUT) to be flashed, identified by the serial number of its probe."""
+
+    def __init__(self, name: str, serial_no: int | str, hex_path: str, family: str, reset: bool = True):
+
+        self.name = name
+        """Identity of the DUT (used for logs and results)"""
+        self.serial_no = str(serial_no)
+        """Serial number of the probe connected to the DUT"""
+        self.hex_path = hex_path
+        """Path of the image to program"""
+        self.family = family
+        """Device family (eg, "NRF53")"""
+        self.reset = reset
+        """True to reset the DUT and let it run after programming"""
+
+
+class FlashJobResult:
+
+    """Outcome of the flash job of one DUT."""
+
+    def __init__(self, name: str, serial_no: str, log_path: str = None):
+
+        self.name = name
+        """Identity of the DUT"""
+        self.serial_no = serial_no
+        """Serial number of the probe connected to the DUT"""
+        self.status = -1
+        """Status of the last attempt (0 for success)"""
+        self.error = None
+        """Description of the failure, or None on success"""
+        self.attempts = 0
+        """Number of attempts made"""
+        self.flash_time = 0.0
+        """Seconds spent programming and verifying in the last attempt"""
+        self.reset_time = 0.0
+        """Seconds spent resetting in the last attempt"""
+        self.total_time = 0.0
+        """Seconds from the start of the first attempt to the end of the last"""
+        self.log_path = log_path
+        """Path of the job's log file, or None"""
+
+    @property
+    def success(self) -> bool:
+
+        """True if the job succeeded."""
+
+        return self.status == 0
+
+
+class FlashOrchestrator:
+
+    """
+    Flashes several DUTs concurrently. Each DUT is identified by the serial number of its probe, and its job
+    (program and verify, then optionally reset) runs in a worker thread, so the time to flash a gateway is that of
+    its slowest DUT rather than the sum of all of them. A failed job is retried in its own worker without holding
+    back the other DUTs. Each job writes its tool output to its own log file and records its timing.
+    """
+
+    def __init__(self,
+                 max_workers: int = None,
+                 retries: int = DEFAULT_RETRIES,
+                 retry_delay: float = DEFAULT_RETRY_DELAY,
+                 log_dir: str = None,
+                 flash_function: Callable[..., int] = nrfjprog_flash,
+                 reset_function: Callable[..., int] = nrfjprog_reset):
+
+        """
+        Create a new orchestrator.
+
+        :param max_workers: Maximum number of jobs run at once (defaults to one per DUT)
+
+        :param retries: Number of extra attempts made for a failed job
+
+        :param retry_delay: Seconds to wait before retrying a failed job
+
+        :param log_dir: Directory for the per-job log files (<DUT name>.log). Tool output is discarded if None.
+
+        :param flash_function: Function that programs and verifies a DUT, called as
+            flash_function(hex_path, family, snr=..., logfile=...) and returning 0 on success
+
+        :param reset_function: Function that resets a DUT, called as reset_function(family, snr=..., logfile=...)
+            and returning 0 on success
+        """
+
+        self.max_workers = max_workers
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.log_dir = log_dir
+        self.flash_function = flash_function
+        self.reset_function = reset_function
+
+    @staticmethod
+    def discover_probes() -> list[str]:
+
+        """
+        Return the serial numbers of the attached probes.
+
+        :return: List of serial numbers
+        :rtype: list[str]
+        """
+
+        return nrfjprog_list_probes()
+
+    @staticmethod
+    def map_targets(duts: dict[str, int | str], hex_path: str, family: str, reset: bool = True) -> list[FlashTarget]:
+
+        """
+        Build the targets for a set of DUTs that all receive the same image.
+
+        :param duts: Mapping of DUT identity to probe serial number
+
+        :param hex_path: Path of the image to program
+
+        :param family: Device family (eg, "NRF53")
+
+        :param reset: True to reset each DUT after programming
+
+        :return: List of targets
+        :rtype: list[FlashTarget]
+        """
+
+        return [FlashTarget(name, serial_no, hex_path, family, reset) for name, serial_no in duts.items()]
+
+    def run(self, targets: list[FlashTarget]) -> dict[str, FlashJobResult]:
+
+        """
+        Flash all targets concurrently and wait for every job to finish.
+
+        :param targets: DUTs to flash
+
+        :return: Job results, keyed by DUT identity
+        :rtype: dict[str, FlashJobResult]
+        """
+
+        if self.log_dir is not None:
+            os.makedirs(self.log_dir, exist_ok=True)
+
+        probes = self.discover_probes()
+        if not probes:
+            logging.warning(f"{self.__class__.__name__}: no probes listed, attempting all targets")
+
+        results = {}
+        start_time = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers or max(len(targets), 1)) as executor:
+
+            futures = {}
+
+            for target in targets:
+                if probes and target.serial_no not in probes:
+                    result = FlashJobResult(target.name, target.serial_no)
+                    result.error = f"probe {target.serial_no} not attached"
+                    results[target.name] = result
+                    logging.error(f"{self.__class__.__name__}: {target.name}: {result.error}")
+                    continue
+
+                futures[executor.submit(self._run_job, target)] = target
+
+            for future in as_completed(futures):
+                result = future.result()
+                results[result.name] = result
+
+                if result.success:
+                    logging.info(f"{self.__class__.__name__}: {result.name} ({result.serial_no}) flashed in "
+                                 f"{result.flash_time:.1f} s, reset in {result.reset_time:.1f} s, "
+                                 f"{result.attempts} attempt(s)")
+                else:
+                    logging.error(f"{self.__class__.__name__}: {result.name} ({result.serial_no}) failed after "
+                                  f"{result.attempts} attempt(s): {result.error}")
+
+        succeeded = sum(1 for result in results.values() if result.success)
+        logging.info(f"{self.__class__.__name__}: {succeeded} of {len(targets)} DUTs flashed in "
+                     f"{time.monotonic() - start_time:.1f} s")
+
+        return results
+
+    def _run_job(self, target: FlashTarget) -> FlashJobResult:
+
+        """Program, verify and reset one DUT, retrying on failure. Runs in a worker thread."""
+
+        log_path = os.path.join(self.log_dir, f"{target.name}.log") if self.log_dir is not None else None
+        result = FlashJobResult(target.name, target.serial_no, log_path)
+        job_start = time.monotonic()
+
+        while result.attempts <= self.retries:
+
+            if result.attempts > 0:
+                time.sleep(self.retry_delay)
+
+            result.attempts += 1
+            result.reset_time = 0.0
+
+            flash_start = time.monotonic()
+            result.status = self.flash_function(target.hex_path, target.family, snr=target.serial_no, logfile=log_path)
+            result.flash_time = time.monotonic() - flash_start
+
+            if result.status != 0:
+                result.error = f"flash failed with status {result.status}"
+                continue
+
+            if target.reset:
+                reset_start = time.monotonic()
+                result.status = self.reset_function(target.family, snr=target.serial_no, logfile=log_path)
+                result.reset_time = time.monotonic() - reset_start
+
+                if result.status != 0:
+                    result.error = f"reset failed with status {result.status}"
+                    continue
+
+            result.error = None
+            break
+
+        result.total_time = time.monotonic() - job_start
+
+        return result
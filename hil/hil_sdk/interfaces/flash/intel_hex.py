@@ -0,0 +1,149 @@
+#
+# Copyright (C) 2026, Dojo Five
+# All rights reserved.
+#
+
+"""Minimal in-process Intel HEX parser"""
+
+import hashlib
+
+# Intel HEX record types
+RECORD_DATA                     = 0x00
+RECORD_END_OF_FILE              = 0x01
+RECORD_EXTENDED_SEGMENT_ADDRESS = 0x02
+RECORD_START_SEGMENT_ADDRESS    = 0x03
+RECORD_EXTENDED_LINEAR_ADDRESS  = 0x04
+RECORD_START_LINEAR_ADDRESS     = 0x05
+
+
+class IntelHexImage:
+
+    """
+    A memory image loaded from an Intel HEX file, stored as a sorted list of contiguous segments.
+    """
+
+    def __init__(self, segments: list[tuple[int, bytes]]):
+
+        """
+        Create an image from a list of segments. Use IntelHexImage.load() to parse a file.
+
+        :param segments: List of (start address, data) tuples, sorted by address and not overlapping
+        """
+
+        self.segments = segments
+        """List of (start address, data) tuples, sorted by address"""
+
+    @staticmethod
+    def load(path: str) -> "IntelHexImage":
+
+        """
+        Parse an Intel HEX file. Records are validated with their checksum; adjacent records are merged
+        into contiguous segments.
+
+        :param path: Path to the .hex file
+
+        :return: The loaded image
+        :raises ValueError: If the file is malformed
+        """
+
+        chunks = []  # (address, bytearray) for runs of contiguous data records
+        base_address = 0
+
+        with open(path, "r") as hex_file:
+
+            for line_num, line in enumerate(hex_file, start=1):
+
+                line = line.strip()
+                if not line:
+                    continue
+
+                if line[0] != ":":
+                    raise ValueError(f"{path}:{line_num}: missing start code")
+
+                try:
+                    record = bytes.fromhex(line[1:])
+                except ValueError:
+                    raise ValueError(f"{path}:{line_num}: invalid hex digits") from None
+
+                if len(record) < 5 or len(record) != record[0] + 5:
+                    raise ValueError(f"{path}:{line_num}: invalid record length")
+
+                if sum(record) & 0xFF != 0:
+                    raise ValueError(f"{path}:{line_num}: checksum mismatch")
+
+                record_type = record[3]
+                data = record[4:-1]
+
+                if record_type == RECORD_DATA:
+                    address = base_address + int.from_bytes(record[1:3], byteorder="big")
+                    if chunks and chunks[-1][0] + len(chunks[-1][1]) == address:
+                        chunks[-1][1].extend(data)
+                    else:
+                        chunks.append((address, bytearray(data)))
+                elif record_type == RECORD_EXTENDED_LINEAR_ADDRESS:
+                    base_address = int.from_bytes(data, byteorder="big") << 16
+                elif record_type == RECORD_EXTENDED_SEGMENT_ADDRESS:
+                    base_address = int.from_bytes(data, byteorder="big") << 4
+                elif record_type == RECORD_END_OF_FILE:
+                    break
+
+        return IntelHexImage(IntelHexImage._merge(chunks))
+
+    @property
+    def size(self) -> int:
+
+        """Total number of data bytes in the image."""
+
+        return sum(len(data) for _, data in self.segments)
+
+    def sha256(self) -> str:
+
+        """
+        Return the SHA-256 digest of the image contents, including segment addresses. Two images have the same
+        digest only if they program the same bytes to the same addresses.
+        """
+
+        digest = hashlib.sha256()
+
+        for start, data in self.segments:
+            digest.update(start.to_bytes(8, byteorder="little"))
+            digest.update(len(data).to_bytes(8, byteorder="little"))
+            digest.update(data)
+
+        return digest.hexdigest()
+
+    def read(self, address: int, length: int) -> bytes | None:
+
+        """
+        Return image data for an address range.
+
+        :param address: Start address
+
+        :param length: Number of bytes
+
+        :return: Image data, or None if the range is not entirely covered by a single segment
+        """
+
+        for start, data in self.segments:
+            if start <= address and address + length <= start + len(data):
+                return bytes(data[address - start:address - start + length])
+
+        return None
+
+    @staticmethod
+    def _merge(chunks: list[tuple[int, bytearray]]) -> list[tuple[int, bytes]]:
+
+        """Sort chunks by address and merge adjacent or overlapping chunks."""
+
+        segments = []
+
+        for address, data in sorted(chunks, key=lambda chunk: chunk[0]):
+
+            if segments and address <= segments[-1][0] + len(segments[-1][1]):
+                start, merged = segments[-1]
+                offset = address - start
+                merged[offset:offset + len(data)] = data
+            else:
+                segments.append((address, bytearray(data)))
+
+        return [(start, bytes(data)) for start, data in segments]
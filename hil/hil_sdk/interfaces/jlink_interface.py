@@ -5,21 +5,36 @@
 
 """Provide an interface to the J-Link Command program through a Python interface"""
 import os
+import time
+import logging
 import tempfile
+import threading
 import subprocess
 import platform
 
+# pylink is only required for session mode; without it, the JLinkExe subprocess path is used
+try:
+    import pylink
+except ImportError:
+    pylink = None
+
 if platform.system() == "Windows":
     JLINK_CMD = "JLink.exe"
 else:
     JLINK_CMD = "JLinkExe"
 
+# The Linux method of resolving the dyanamic lib path is not reliable,
+# so we must use a hard-coded path
+JLINK_DLL_PATH = "/opt/SEGGER/JLink_V790/libjlinkarm.so.7"
+
+RESET_DELAY_MS = 2000  # Delay between reset and go used by the JLinkExe path (kept for backwards compatibility)
+
 
 class JLinkInterface:
 
     """Represents an instance of a J-Link Debugger"""
 
-    def __init__(self, device, interface='SWD', speed=4000) -> None:
+    def __init__(self, device, interface='SWD', speed=4000, serial_no=None) -> None:
 
         """
         Create a new J-Link instance. Note that this constructor does not attempt to communicate to the J-Link; that is done
@@ -31,11 +46,75 @@ class JLinkInterface:
         :type interface: str
         :param speed: Connection speed (default 4000 KHz)
         :type speed: int
+        :param serial_no: Serial number of the J-Link to use (required when more than one probe is attached)
+        :type serial_no: int | str
         """
 
         self.device = device
         self.interface = interface
         self.speed = speed
+        self.serial_no = serial_no
+
+        self._jlink = None                # pylink.JLink object while a session is open
+        self._lock = threading.RLock()    # Serializes session operations
+
+    def open_session(self) -> bool:
+
+        """Open a persistent connection to the probe and target through the J-Link DLL (via pylink).
+        While the session is open, load_file, reset_and_go, halt, go and the memory functions are executed
+        in-process on that connection, instead of spawning JLinkExe (which pays process startup, USB enumeration
+        and target connection on every call). Close the session with close_session().
+
+        If the session cannot be opened, all functions keep using the JLinkExe subprocess path.
+
+        :return: Status of operation (True on success, False otherwise)
+        :rtype: bool
+        """
+
+        if pylink is None:
+            logging.error("J-Link session unavailable: pylink is not installed")
+            return False
+
+        with self._lock:
+
+            if self._jlink is not None:
+                return True
+
+            try:
+                jlink = pylink.JLink(lib=pylink.Library(dllpath=JLINK_DLL_PATH))
+                jlink.open(serial_no=int(self.serial_no) if self.serial_no is not None else None)
+
+                if self.interface and self.interface.upper() == "JTAG":
+                    jlink.set_tif(pylink.enums.JLinkInterfaces.JTAG)
+                else:
+                    jlink.set_tif(pylink.enums.JLinkInterfaces.SWD)
+
+                jlink.connect(self.device, speed=self.speed if self.speed else "auto")
+
+                self._jlink = jlink
+                return True
+
+            except Exception as e:
+                logging.error(f"Unable to open J-Link session: {str(e)}")
+                return False
+
+    def close_session(self) -> None:
+
+        """Close the persistent connection opened by open_session(), if any."""
+
+        with self._lock:
+            if self._jlink is not None:
+                try:
+                    self._jlink.close()
+                finally:
+                    self._jlink = None
+
+    @property
+    def session_open(self) -> bool:
+
+        """True if a persistent session is open."""
+
+        return self._jlink is not None
 
     def load_file(self, filename: str, logfile: str = None) -> bool:
 
@@ -44,7 +123,7 @@ class JLinkInterface:
 
         :param filename: Path of the file to be loaded
 
-        :param logfile: Optional path to a file that JLink Commander will write logs to
+        :param logfile: Optional path to a file that JLink Commander will write logs to (not used in session mode)
 
         :return: Status of operation (True on success, False otherwise)
         :rtype: bool
@@ -53,6 +132,15 @@ class JLinkInterface:
         if not os.path.isfile(filename):
             return False
 
+        if self.session_open:
+            with self._lock:
+                try:
+                    self._jlink.flash_file(os.path.abspath(filename), 0)
+                    return True
+                except Exception as e:
+                    logging.error(f"J-Link session: unable to load {filename}: {str(e)}")
+                    return False
+
         try:
 
             temp_file = tempfile.NamedTemporaryFile(mode="w", delete=False)
@@ -72,22 +160,37 @@ class JLinkInterface:
             os.remove(temp_file.name)
             return False
 
-    def reset_and_go(self, logfile: str = None) -> bool:
+    def reset_and_go(self, logfile: str = None, delay_ms: int = None) -> bool:
 
         """Perform a reset of the target device.
 
-        :param logfile: Optional path to a file that JLink Commander will write logs to
+        :param logfile: Optional path to a file that JLink Commander will write logs to (not used in session mode)
+
+        :param delay_ms: Delay between the reset (which leaves the core halted) and letting the target run.
+            Defaults to 2000 ms when JLinkExe is used, and to no delay in session mode.
 
         :return: Status of operation (True on success, False otherwise)
         :rtype: bool
         """
 
+        if self.session_open:
+            with self._lock:
+                try:
+                    # Same sequence as the JLinkExe path: reset, sleep, go
+                    self._jlink.reset(halt=True)
+                    if delay_ms:
+                        time.sleep(delay_ms / 1000)
+                    return self._jlink.restart()
+                except Exception as e:
+                    logging.error(f"J-Link session: unable to reset target: {str(e)}")
+                    return False
+
         try:
 
             temp_file = tempfile.NamedTemporaryFile(mode="w", delete=False)
 
             temp_file.write("r\n")
-            temp_file.write("Sleep 2000\n")
+            temp_file.write(f"Sleep {RESET_DELAY_MS if delay_ms is None else delay_ms}\n")
             temp_file.write("g\n")
             temp_file.write("q\n")
             temp_file.close()
@@ -102,6 +205,148 @@ class JLinkInterface:
             os.remove(temp_file.name)
             return False
 
+    def reset(self, halt: bool = True) -> bool:
+
+        """Reset the target device, optionally leaving the core halted.
+
+        :param halt: True to leave the core halted after the reset, False to let it run
+
+        :return: Status of operation (True on success, False otherwise)
+        :rtype: bool
+        """
+
+        if not self.session_open:
+            return self.run_commands(["r", "q"] if halt else ["r", "g", "q"])
+
+        with self._lock:
+            try:
+                self._jlink.reset(halt=halt)
+                return True
+            except Exception as e:
+                logging.error(f"J-Link session: unable to reset target: {str(e)}")
+                return False
+
+    def halt(self) -> bool:
+
+        """Halt the target core.
+
+        :return: Status of operation (True on success, False otherwise)
+        :rtype: bool
+        """
+
+        if not self.session_open:
+            return self.run_commands(["h", "q"])
+
+        with self._lock:
+            try:
+                return self._halt_core()
+            except Exception as e:
+                logging.error(f"J-Link session: unable to halt target: {str(e)}")
+                return False
+
+    def go(self) -> bool:
+
+        """Let the (halted) target core run.
+
+        :return: Status of operation (True on success, False otherwise)
+        :rtype: bool
+        """
+
+        if not self.session_open:
+            return self.run_commands(["g", "q"])
+
+        with self._lock:
+            try:
+                # restart() does nothing (and returns False) if the core is not halted
+                return self._jlink.restart()
+            except Exception as e:
+                logging.error(f"J-Link session: unable to start target: {str(e)}")
+                return False
+
+    def memory_read(self, address: int, num_bytes: int) -> bytes | None:
+
+        """Read target memory. Requires an open session (see open_session()).
+
+        :param address: Start address
+
+        :param num_bytes: Number of bytes to read
+
+        :return: Bytes read, or None on error
+        :rtype: bytes
+        """
+
+        if not self.session_open:
+            logging.error("J-Link memory read requires an open session")
+            return None
+
+        with self._lock:
+            try:
+                return bytes(self._jlink.memory_read8(address, num_bytes))
+            except Exception as e:
+                logging.error(f"J-Link session: unable to read memory at 0x{address:08x}: {str(e)}")
+                return None
+
+    def memory_write(self, address: int, data: bytes) -> bool:
+
+        """Write target memory (RAM or peripheral registers; use load_file to program flash).
+        Requires an open session (see open_session()).
+
+        :param address: Start address
+
+        :param data: Bytes to write
+
+        :return: Status of operation (True on success, False otherwise)
+        :rtype: bool
+        """
+
+        if not self.session_open:
+            logging.error("J-Link memory write requires an open session")
+            return False
+
+        with self._lock:
+            try:
+                self._jlink.memory_write8(address, list(data))
+                return True
+            except Exception as e:
+                logging.error(f"J-Link session: unable to write memory at 0x{address:08x}: {str(e)}")
+                return False
+
+    def flash_write(self, regions: list[tuple[int, bytes]]) -> bool:
+
+        """Program flash regions through the J-Link flash loader. The flash loader erases and programs only the
+        sectors covered by the regions. Requires an open session (see open_session()).
+
+        :param regions: List of (start address, data) tuples
+
+        :return: Status of operation (True on success, False otherwise)
+        :rtype: bool
+        """
+
+        if not self.session_open:
+            logging.error("J-Link flash write requires an open session")
+            return False
+
+        with self._lock:
+            try:
+                if not self._halt_core():
+                    logging.error("J-Link session: unable to halt target before writing flash")
+                    return False
+
+                for address, data in regions:
+                    self._jlink.flash_write(address, list(data), nbits=8)
+
+                return True
+
+            except Exception as e:
+                logging.error(f"J-Link session: unable to write flash: {str(e)}")
+                return False
+
+    def _halt_core(self) -> bool:
+
+        """Halt the core. pylink's JLink.halt() is not used, as it sleeps for a second after every halt."""
+
+        return self._jlink._dll.JLINKARM_Halt() == 0
+
     def run_commands(self, commands: list[str], logfile: str = None) -> bool:
 
         """Run a series of J-Link Commands as you would find in a script file.
@@ -110,6 +355,7 @@ class JLinkInterface:
         commands = ['reset', 'loadfile /build/fw.hex', 'exit']
 
         Commands can be found at https://wiki.segger.com/J-Link_Commander.
+        Commands are always executed through JLinkExe, even while a session is open.
 
         :param commands: List of commands to execute
 
@@ -148,8 +394,9 @@ class JLinkInterface:
         device_args    = f"-device {self.device}" if self.device else ""
         interface_args = f"-if {self.interface}" if self.interface else ""
         speed_args     = f"-speed {str(self.speed)}" if self.speed else ""
+        usb_args       = f"-USB {self.serial_no}" if self.serial_no is not None else ""
 
-        return f" {device_args} {interface_args} {speed_args} -ExitOnError 1 -CommandFile {command_file}"
+        return f" {usb_args} {device_args} {interface_args} {speed_args} -ExitOnError 1 -CommandFile {command_file}"
 
     def _execute_args(self, args, logfile) -> bool:
 
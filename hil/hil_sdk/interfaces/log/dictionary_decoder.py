@@ -0,0 +1,524 @@
+#
+# Copyright (C) 2026, Dojo Five
+# All rights reserved.
+#
+
+"""
+Host-side decoder for Zephyr dictionary-based logging (CONFIG_LOG_DICTIONARY_SUPPORT).
+
+With dictionary logging, the target sends compact binary records that reference format strings by address
+instead of sending formatted text. The build generates a log dictionary (build/zephyr/log_dictionary.json)
+holding the read-only strings and log sources needed to turn these records back into text.
+
+More information:
+https://docs.zephyrproject.org/latest/services/logging/index.html#dictionary-based-logging
+"""
+
+import os
+import re
+import json
+import time
+import base64
+import struct
+import logging
+import threading
+
+# Message types (log_dict_output_msg_type in log_output_dict.h)
+MSG_TYPE_NORMAL  = 0
+MSG_TYPE_DROPPED = 1
+
+# Marker emitted by some backends at startup; also used to resynchronize the stream
+SYNC_MARKER = b"##ZLOGV1##"
+
+# Zephyr log levels
+LOG_LEVEL_NAMES = {1: "err", 2: "wrn", 3: "inf", 4: "dbg"}
+
+# printf-style conversion specification (flags, width, precision, length, conversion)
+PRINTF_SPEC_REGEX = re.compile(r"%([-+ #0]*)(\*|\d+)?(?:\.(\*|\d+))?(hh|h|ll|l|j|z|t|L)?([diouxXeEfFgGaAcspn%])")
+
+# Size of a log_source_const_data entry, in pointers (name pointer, level + padding)
+LOG_SOURCE_ENTRY_POINTERS = 2
+
+# Largest message accepted when the dictionary does not give CONFIG_LOG_BUFFER_SIZE (Zephyr's default)
+DEFAULT_MAX_RECORD_SIZE = 1024
+
+
+class DictionaryLogRecord:
+
+    """Represents one decoded dictionary log message."""
+
+    def __init__(self, timestamp: int, level: int, domain_id: int, source: str, message: str,
+                 data: bytes = b"", dropped: int = 0, host_timestamp: float = None):
+
+        self.timestamp = timestamp
+        """Target timestamp (raw ticks, as sent by the target)"""
+        self.level = level
+        """Zephyr log level (1 = error ... 4 = debug), 0 for dropped-message notifications"""
+        self.domain_id = domain_id
+        """Domain the message originated from"""
+        self.source = source
+        """Name of the log source (module), or None if unknown"""
+        self.message = message
+        """Formatted message text"""
+        self.data = data
+        """Hexdump data attached to the message (empty if none)"""
+        self.dropped = dropped
+        """Number of messages dropped by the target (only set for dropped-message notifications)"""
+        self.host_timestamp = host_timestamp
+        """Host time at which the record was received (None for offline decoding)"""
+
+    def format(self) -> str:
+
+        """Return the record formatted similarly to Zephyr's text log output."""
+
+        if self.dropped:
+            return f"--- {self.dropped} messages dropped ---"
+
+        level = LOG_LEVEL_NAMES.get(self.level, "???")
+        source = f"{self.source}: " if self.source else ""
+        text = f"[{self.timestamp:08d}] <{level}> {source}{self.message}"
+
+        if self.data:
+            text += " " + self.data.hex(" ")
+
+        return text
+
+    def __repr__(self) -> str:
+        return f"DictionaryLogRecord({self.format()!r})"
+
+
+class LogDictionary:
+
+    """
+    A loaded log dictionary. Use LogDictionary.load() rather than the constructor: dictionaries are cached
+    per file, so each build's dictionary is only parsed once per session.
+    """
+
+    _cache = {}
+    _cache_lock = threading.Lock()
+
+    def __init__(self, database: dict):
+
+        """
+        Create a dictionary from the parsed JSON database.
+
+        :param database: Contents of log_dictionary.json
+        """
+
+        target = database.get("target", {})
+        kconfigs = database.get("kconfigs", {})
+
+        self.database = database
+        self.pointer_size = target.get("bits", 32) // 8
+        self.endian = "<" if target.get("little_endianness", True) else ">"
+        self.timestamp_size = 8 if kconfigs.get("CONFIG_LOG_TIMESTAMP_64BIT") else 4
+
+        # A message never exceeds the target's log buffer
+        self.max_record_size = int(kconfigs.get("CONFIG_LOG_BUFFER_SIZE", DEFAULT_MAX_RECORD_SIZE))
+
+        # Sections holding the read-only strings, decoded once
+        self.sections = []
+        for section in database.get("sections", {}).values():
+            self.sections.append((section["start"], section["end"], base64.b64decode(section["data_b64"])))
+
+        # Log sources can be referenced by ID or by the address of their constant data
+        self.sources = {}
+        for key, instance in database.get("log_subsys", {}).get("log_instances", {}).items():
+            name = instance.get("name")
+            self.sources[str(key)] = name
+            if "addr" in instance:
+                self.sources[str(instance["addr"])] = name
+
+        self._log_const_start = None
+        for name, section in database.get("sections", {}).items():
+            if name.startswith("log_const"):
+                self._log_const_start = section["start"]
+
+        self._strings = {}
+
+    @staticmethod
+    def load(path: str) -> "LogDictionary":
+
+        """
+        Load a log dictionary JSON file. Subsequent calls with the same, unmodified file return the cached
+        dictionary.
+
+        :param path: Path to log_dictionary.json
+
+        :return: The loaded dictionary
+        """
+
+        full_path = os.path.abspath(path)
+        stat = os.stat(full_path)
+        key = (full_path, stat.st_mtime_ns, stat.st_size)
+
+        with LogDictionary._cache_lock:
+
+            if key not in LogDictionary._cache:
+                with open(full_path, "r", encoding="utf-8") as json_file:
+                    LogDictionary._cache[key] = LogDictionary(json.load(json_file))
+
+            return LogDictionary._cache[key]
+
+    def find_string(self, address: int) -> str | None:
+
+        """
+        Return the NUL-terminated string stored at a target address.
+
+        :param address: Target address of the string
+
+        :return: String, or None if the address is not in the dictionary
+        """
+
+        string = self._strings.get(address)
+
+        if string is None:
+            for start, end, data in self.sections:
+                if start <= address < end:
+                    offset = address - start
+                    terminator = data.find(b"\0", offset)
+                    string = data[offset:terminator if terminator >= 0 else None].decode("utf-8", errors="replace")
+                    self._strings[address] = string
+                    break
+
+        return string
+
+    def find_source(self, domain_id: int, source: int) -> str | None:
+
+        """
+        Return the name of a log source.
+
+        :param domain_id: Domain of the message
+
+        :param source: Source field of the message (an ID, or the address of the source's constant data)
+        """
+
+        name = self.sources.get(str(source))
+
+        if name is None and self._log_const_start is not None and source >= self._log_const_start:
+            source_id = (source - self._log_const_start) // (LOG_SOURCE_ENTRY_POINTERS * self.pointer_size)
+            name = self.sources.get(str(source_id))
+
+        return name
+
+
+class DictionaryLogDecoder:
+
+    """
+    Decodes a stream of binary dictionary log messages into DictionaryLogRecord objects. The stream can be
+    fed in arbitrary chunks; incomplete messages are kept until the rest of their data arrives.
+    """
+
+    def __init__(self, dictionary: LogDictionary | str, hex_input: bool = False):
+
+        """
+        Create a new decoder.
+
+        :param dictionary: LogDictionary object, or path to log_dictionary.json
+
+        :param hex_input: True if the backend sends messages as hexadecimal text
+            (CONFIG_LOG_BACKEND_UART_OUTPUT_DICTIONARY_HEX), False for raw binary
+        """
+
+        if isinstance(dictionary, str):
+            dictionary = LogDictionary.load(dictionary)
+
+        self.dictionary = dictionary
+        self.hex_input = hex_input
+
+        endian = dictionary.endian
+        pointer_format = "Q" if dictionary.pointer_size == 8 else "I"
+        timestamp_format = "Q" if dictionary.timestamp_size == 8 else "I"
+
+        # Matches log_dict_output_normal_msg_hdr_t (after the type byte), which is packed
+        self._normal_header = struct.Struct(f"{endian}BHH{pointer_format}{timestamp_format}")
+        self._dropped_header = struct.Struct(f"{endian}H")
+        self._pointer = struct.Struct(f"{endian}{pointer_format}")
+
+        self._buffer = bytearray()
+        self._hex_buffer = ""
+        self._formats = {}  # Parsed format strings, by address
+        self.discarded_bytes = 0
+
+    def feed(self, data: bytes, host_timestamp: float = None) -> list[DictionaryLogRecord]:
+
+        """
+        Add received data and return the messages it completes.
+
+        :param data: Received bytes
+
+        :param host_timestamp: Host time at which the data was received (defaults to now)
+
+        :return: List of decoded records (possibly empty)
+        """
+
+        if host_timestamp is None:
+            host_timestamp = time.time()
+
+        if self.hex_input:
+            text = data.decode("ascii", errors="ignore").replace(SYNC_MARKER.decode(), "")
+            self._hex_buffer += re.sub(r"[^0-9a-fA-F]", "", text)
+            usable = len(self._hex_buffer) & ~1
+            self._buffer += bytes.fromhex(self._hex_buffer[:usable])
+            self._hex_buffer = self._hex_buffer[usable:]
+        else:
+            self._buffer += data
+
+        records = []
+        offset = 0
+        buffer = self._buffer
+
+        # Discard anything up to and including a sync marker
+        marker = buffer.rfind(SYNC_MARKER)
+        if marker >= 0:
+            offset = marker + len(SYNC_MARKER)
+
+        while offset < len(buffer):
+
+            msg_type = buffer[offset]
+
+            if msg_type == MSG_TYPE_NORMAL:
+                record, size = self._decode_normal(buffer, offset + 1, host_timestamp)
+            elif msg_type == MSG_TYPE_DROPPED:
+                record, size = self._decode_dropped(buffer, offset + 1, host_timestamp)
+            else:
+                # Not a message boundary; skip a byte and try again
+                self.discarded_bytes += 1
+                offset += 1
+                continue
+
+            if record is None and size < 0:
+                # Garbage taken as a header (eg, an impossible length); skip a byte to resynchronize
+                self.discarded_bytes += 1
+                offset += 1
+                continue
+
+            if record is None:
+                break  # Incomplete message, wait for more data
+
+            records.append(record)
+            offset += 1 + size
+
+        del self._buffer[:offset]
+
+        return records
+
+    def decode(self, data: bytes) -> list[DictionaryLogRecord]:
+
+        """
+        Decode a complete capture of dictionary log data in one go (offline mode).
+
+        :param data: Captured bytes (or hexadecimal text if hex_input is set)
+
+        :return: List of decoded records
+        """
+
+        records = self.feed(data, host_timestamp=None)
+
+        for record in records:
+            record.host_timestamp = None
+
+        if self._buffer:
+            logging.warning(f"{self.__class__.__name__}: {len(self._buffer)} trailing bytes could not be decoded")
+            self._buffer.clear()
+
+        return records
+
+    def _decode_dropped(self, buffer: bytearray, offset: int, host_timestamp: float):
+
+        """Decode a dropped-messages notification. Returns (record, size) or (None, 0) if incomplete."""
+
+        if offset + self._dropped_header.size > len(buffer):
+            return None, 0
+
+        (dropped,) = self._dropped_header.unpack_from(buffer, offset)
+        record = DictionaryLogRecord(0, 0, 0, None, "", dropped=dropped, host_timestamp=host_timestamp)
+
+        return record, self._dropped_header.size
+
+    def _decode_normal(self, buffer: bytearray, offset: int, host_timestamp: float):
+
+        """
+        Decode a normal log message. Returns (record, size), (None, 0) if incomplete, or (None, -1) if the header
+        cannot be a message's.
+        """
+
+        header_size = self._normal_header.size
+
+        if offset + header_size > len(buffer):
+            return None, 0
+
+        domain_level, package_len, data_len, source, timestamp = self._normal_header.unpack_from(buffer, offset)
+
+        # The package holds at least its header and the format string pointer; levels go from error to debug
+        if (package_len < 2 * self.dictionary.pointer_size
+                or package_len + data_len > self.dictionary.max_record_size
+                or (domain_level >> 4) not in LOG_LEVEL_NAMES):
+            return None, -1
+
+        size = header_size + package_len + data_len
+        if offset + size > len(buffer):
+            return None, 0
+
+        domain_id = domain_level & 0x0F
+        level = domain_level >> 4
+
+        package_start = offset + header_size
+        package = bytes(buffer[package_start:package_start + package_len])
+        data = bytes(buffer[package_start + package_len:offset + size])
+
+        try:
+            message = self._format_package(package)
+        except Exception as exc:
+            message = f"<unable to decode message: {exc}>"
+
+        record = DictionaryLogRecord(timestamp, level, domain_id, self.dictionary.find_source(domain_id, source),
+                                     message, data, host_timestamp=host_timestamp)
+
+        return record, size
+
+    def _format_package(self, package: bytes) -> str:
+
+        """Format a cbprintf package (see cbprintf_package_hdr_desc in Zephyr's cbprintf_internal.h)."""
+
+        pointer_size = self.dictionary.pointer_size
+        args_len = package[0] * 4  # Length of the header and arguments, in 32-bit words
+        str_cnt, ro_str_cnt, rw_str_cnt = package[1], package[2], package[3]
+
+        # Appended strings follow the argument area and the RO/RW string index lists.
+        # Each one is the word index of its argument, followed by a NUL-terminated string.
+        appended = {}
+        offset = args_len + ro_str_cnt + rw_str_cnt
+        for _ in range(str_cnt):
+            index = package[offset]
+            terminator = package.index(b"\0", offset + 1)
+            appended[index] = package[offset + 1:terminator].decode("utf-8", errors="replace")
+            offset = terminator + 1
+
+        (format_address,) = self._pointer.unpack_from(package, pointer_size)
+        python_format, arg_specs = self._get_format(format_address)
+
+        values = []
+        offset = 2 * pointer_size  # Header (padded to a pointer) and format string pointer
+
+        for conversion, size in arg_specs:
+
+            if size == 8:
+                offset = (offset + 7) & ~7  # 64-bit values are aligned in the package
+
+            if conversion == "s":
+                (address,) = self._pointer.unpack_from(package, offset)
+                value = appended.get(offset // 4)
+                if value is None:
+                    value = self.dictionary.find_string(address)
+                    if value is None:
+                        value = f"<string @ 0x{address:x}>"
+            else:
+                code = {("f", 8): "d", ("i", 4): "i", ("i", 8): "q", ("u", 4): "I", ("u", 8): "Q"}[(conversion, size)]
+                (value,) = struct.unpack_from(self.dictionary.endian + code, package, offset)
+
+            values.append(value)
+            offset += size
+
+        return python_format % tuple(values)
+
+    def _get_format(self, address: int):
+
+        """
+        Return (python_format, arg_specs) for the format string at the given address. Parsed formats are cached,
+        so each format string is only parsed once.
+        """
+
+        parsed = self._formats.get(address)
+
+        if parsed is None:
+            fmt = self.dictionary.find_string(address)
+            if fmt is None:
+                raise ValueError(f"format string @ 0x{address:x} not found in dictionary")
+            parsed = self._parse_format(fmt)
+            self._formats[address] = parsed
+
+        return parsed
+
+    def _parse_format(self, fmt: str):
+
+        """
+        Convert a printf format string into a Python %-format and a list of (conversion, size) argument specs,
+        where conversion is "i" (signed), "u" (unsigned), "f" (double) or "s" (string pointer).
+        """
+
+        pointer_size = self.dictionary.pointer_size
+        arg_specs = []
+        pieces = []
+        last = 0
+
+        for match in PRINTF_SPEC_REGEX.finditer(fmt):
+
+            flags, width, precision, length, conversion = match.groups()
+            pieces.append(fmt[last:match.start()].replace("%", "%%"))
+            last = match.end()
+
+            if conversion == "%":
+                pieces.append("%%")
+                continue
+
+            # Variable widths and precisions are passed as int arguments
+            for star in (width, precision):
+                if star == "*":
+                    arg_specs.append(("i", 4))
+
+            if length in ("ll", "j"):
+                int_size = 8
+            elif length in ("l", "z", "t"):
+                int_size = pointer_size
+            else:
+                int_size = 4
+
+            spec = "%" + flags + (width or "") + ("." + precision if precision is not None else "")
+
+            if conversion in "di":
+                arg_specs.append(("i", int_size))
+                pieces.append(spec + "d")
+            elif conversion in "ouxX":
+                arg_specs.append(("u", int_size))
+                pieces.append(spec + ("d" if conversion == "u" else conversion))
+            elif conversion in "eEfFgGaA":
+                arg_specs.append(("f", 8))
+                pieces.append(spec + ("f" if conversion in "aA" else conversion))
+            elif conversion == "c":
+                arg_specs.append(("i", 4))
+                pieces.append(spec + "c")
+            elif conversion == "p":
+                arg_specs.append(("u", pointer_size))
+                pieces.append("0x%x")
+            elif conversion == "s":
+                arg_specs.append(("s", pointer_size))
+                pieces.append(spec + "s")
+            else:
+                # %n writes to memory on the target and produces no output
+                arg_specs.append(("u", pointer_size))
+                pieces.append("%.0s")
+
+        pieces.append(fmt[last:].replace("%", "%%"))
+
+        return "".join(pieces), arg_specs
+
+
+def decode_log_file(dictionary_path: str, log_path: str, hex_input: bool = False) -> list[DictionaryLogRecord]:
+
+    """
+    Decode a captured dictionary log file in bulk (offline mode).
+
+    :param dictionary_path: Path to the build's log_dictionary.json
+
+    :param log_path: Path to the captured binary (or hexadecimal) log data
+
+    :param hex_input: True if the capture contains hexadecimal text rather than raw binary
+
+    :return: List of decoded records
+    """
+
+    decoder = DictionaryLogDecoder(LogDictionary.load(dictionary_path), hex_input)
+
+    with open(log_path, "rb") as log_file:
+        return decoder.decode(log_file.read())
@@ -0,0 +1,348 @@
+#
+# Copyright (C) 2026, Dojo Five
+# All rights reserved.
+#
+
+"""Line-oriented, searchable store for text logs received from a target (RTT, UART, etc.)"""
+
+import os
+import re
+import time
+import threading
+
+DEFAULT_MAX_FILE_BYTES   = 10 * 1024 * 1024  # Rotate the log file once it grows past 10 MB
+DEFAULT_BACKUP_COUNT     = 5                 # Number of rotated log files to keep (outfile.1 ... outfile.N)
+DEFAULT_MAX_MEMORY_LINES = 100000            # Number of lines kept in memory before the oldest are released
+DEFAULT_WAIT_TIMEOUT     = 10.0              # Seconds to wait for a pattern by default
+
+
+class LogLine:
+
+    """Represents a single, complete line of log output."""
+
+    def __init__(self, index: int, timestamp: float, text: str, record=None):
+
+        self.index = index
+        """Position of the line in the store (starts at 0, never reused)"""
+        self.timestamp = timestamp
+        """Host time (as returned by time.time()) at which the first character of the line was received"""
+        self.text = text
+        """Line contents, without the line terminator"""
+        self.record = record
+        """Structured record the line was formatted from (for example, a decoded dictionary log message), or None"""
+
+    def __repr__(self) -> str:
+        return f"LogLine({self.index}, {self.timestamp:.6f}, {self.text!r})"
+
+
+class LogCursor:
+
+    """
+    Position of one reader in a LogStore. Each call to wait_for() continues from where the previous one
+    stopped: after the matched line, or after the last line examined if it timed out. Lines are therefore
+    examined only once, and the cost of a call is proportional to the new data only.
+
+    Readers that wait concurrently (eg, from different threads) must each use their own cursor, so that
+    they do not consume each other's lines.
+    """
+
+    def __init__(self, store: "LogStore", index: int):
+
+        self.store = store
+        self.index = index
+        """Index of the next line to be examined"""
+
+    def wait_for(self, pattern: str | re.Pattern, timeout: float = DEFAULT_WAIT_TIMEOUT) -> LogLine | None:
+
+        """
+        Wait for a line matching a regular expression, from the cursor's position.
+
+        :param pattern: Regular expression (string or compiled), matched anywhere in the line
+
+        :param timeout: Maximum number of seconds to wait (None to wait forever)
+
+        :return: Matching line, or None if the timeout expired
+        """
+
+        return self.store._wait_for(self, pattern, timeout)
+
+
+class LogStore:
+
+    """
+    Reassembles a stream of text chunks into timestamped lines, keeps them in an append-only in-memory
+    index and mirrors them to a rotating file. Lines can be searched after the fact, or waited for
+    with wait_for() or a cursor(), which only ever examine lines that they have not already examined.
+    This class is thread-safe: one thread may feed data while others search or wait.
+    """
+
+    def __init__(self,
+                 outfile: str = None,
+                 max_file_bytes: int = DEFAULT_MAX_FILE_BYTES,
+                 backup_count: int = DEFAULT_BACKUP_COUNT,
+                 max_memory_lines: int = DEFAULT_MAX_MEMORY_LINES) -> None:
+
+        """
+        Create a new log store.
+
+        :param outfile: Path of the file to mirror lines to (None to keep lines in memory only)
+
+        :param max_file_bytes: Size at which the file is rotated (0 to disable rotation)
+
+        :param backup_count: Number of rotated files to keep
+
+        :param max_memory_lines: Maximum number of lines held in memory. When exceeded, the oldest half is
+            released from memory (but remains in the file). Line indexes are not affected.
+        """
+
+        self.outfile_name = outfile
+        self.max_file_bytes = max_file_bytes
+        self.backup_count = backup_count
+        self.max_memory_lines = max_memory_lines
+
+        self._condition = threading.Condition()
+        self._lines = []             # In-memory lines, self._lines[0] has index self._first_index
+        self._first_index = 0
+        self._partial_text = ""      # Text received after the last line terminator
+        self._partial_timestamp = None
+        self._cursor = LogCursor(self, 0)  # Cursor of wait_for()
+        self._outfile = None
+        self._outfile_bytes = 0
+
+        if self.outfile_name is not None:
+            self._outfile = open(self.outfile_name, "w", encoding="utf-8")
+
+    def feed(self, data: str, timestamp: float = None) -> int:
+
+        """
+        Add a chunk of received text. Chunks may split lines at any point; lines are only committed
+        once their terminator has been received.
+
+        :param data: Received text
+
+        :param timestamp: Host time at which the chunk was received (defaults to now)
+
+        :return: Number of complete lines committed by this chunk
+        """
+
+        if not data:
+            return 0
+
+        if timestamp is None:
+            timestamp = time.time()
+
+        with self._condition:
+
+            if self._partial_timestamp is None:
+                self._partial_timestamp = timestamp
+
+            pieces = (self._partial_text + data).split("\n")
+            self._partial_text = pieces.pop()  # Text after the last terminator (possibly empty)
+
+            for text in pieces:
+                self._append(text.rstrip("\r"), self._partial_timestamp)
+                self._partial_timestamp = timestamp  # Any following line started in this chunk
+
+            if not self._partial_text:
+                self._partial_timestamp = None
+
+            if pieces:
+                self._condition.notify_all()
+
+            return len(pieces)
+
+    def add_line(self, text: str, timestamp: float = None, record=None) -> LogLine:
+
+        """
+        Commit a complete line directly, bypassing line reassembly. This is used for sources that
+        already produce whole messages, such as decoded dictionary logs.
+
+        :param text: Line contents (must not contain a line terminator)
+
+        :param timestamp: Host time at which the line was received (defaults to now)
+
+        :param record: Optional structured record to attach to the line
+
+        :return: The committed line
+        """
+
+        if timestamp is None:
+            timestamp = time.time()
+
+        with self._condition:
+            line = self._append(text, timestamp, record)
+            self._condition.notify_all()
+            return line
+
+    def flush(self) -> None:
+
+        """Commit any unterminated text as a line of its own (for example, when the stream ends)."""
+
+        with self._condition:
+            if self._partial_text:
+                self._append(self._partial_text.rstrip("\r"), self._partial_timestamp)
+                self._partial_text = ""
+                self._partial_timestamp = None
+                self._condition.notify_all()
+
+            if self._outfile is not None:
+                self._outfile.flush()
+
+    def close(self) -> None:
+
+        """Commit any unterminated text and close the file."""
+
+        self.flush()
+
+        with self._condition:
+            if self._outfile is not None:
+                self._outfile.close()
+                self._outfile = None
+
+    def mark(self) -> int:
+
+        """
+        Return the index that the next committed line will have. Pass this value as the start of
+        wait_for() or search() to only consider lines received after this point.
+        """
+
+        with self._condition:
+            return self._first_index + len(self._lines)
+
+    def cursor(self, start: int = None) -> LogCursor:
+
+        """
+        Return a new cursor, for a reader that waits for lines independently of the others.
+
+        :param start: Index of the first line to examine (defaults to the next line committed, see mark())
+        """
+
+        return LogCursor(self, self.mark() if start is None else start)
+
+    def lines(self, start: int = 0, end: int = None) -> list[LogLine]:
+
+        """
+        Return committed lines by index range. Lines that have been released from memory are skipped.
+
+        :param start: Index of the first line to return
+
+        :param end: Index after the last line to return (None for all lines)
+        """
+
+        with self._condition:
+            start = max(start - self._first_index, 0)
+            end = None if end is None else max(end - self._first_index, 0)
+            return self._lines[start:end]
+
+    def search(self, pattern: str | re.Pattern, start: int = 0, end: int = None) -> list[LogLine]:
+
+        """
+        Return all committed lines matching a regular expression.
+
+        :param pattern: Regular expression (string or compiled), matched anywhere in the line
+
+        :param start: Index of the first line to search
+
+        :param end: Index after the last line to search (None for all lines)
+        """
+
+        regex = re.compile(pattern)
+        return [line for line in self.lines(start, end) if regex.search(line.text)]
+
+    def wait_for(self, pattern: str | re.Pattern, timeout: float = DEFAULT_WAIT_TIMEOUT, start: int = None) -> LogLine | None:
+
+        """
+        Wait for a line matching a regular expression, using the store's own cursor: each call continues
+        from where the previous call stopped (see LogCursor). Concurrent waiters must use cursor() instead.
+
+        :param pattern: Regular expression (string or compiled), matched anywhere in the line
+
+        :param timeout: Maximum number of seconds to wait (None to wait forever)
+
+        :param start: Optional line index to start from instead (see mark())
+
+        :return: Matching line, or None if the timeout expired
+        """
+
+        if start is not None:
+            self._cursor.index = start
+
+        return self._wait_for(self._cursor, pattern, timeout)
+
+    def _wait_for(self, cursor: LogCursor, pattern: str | re.Pattern, timeout: float) -> LogLine | None:
+
+        """Wait for a line matching a regular expression from a cursor's position, and advance the cursor."""
+
+        regex = re.compile(pattern)
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._condition:
+
+            while True:
+
+                # Only examine lines that arrived since the last pass
+                first = max(cursor.index - self._first_index, 0)
+
+                for line in self._lines[first:]:
+                    cursor.index = line.index + 1
+                    if regex.search(line.text):
+                        return line
+
+                cursor.index = max(cursor.index, self._first_index + len(self._lines))
+
+                if deadline is None:
+                    self._condition.wait()
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return None
+                    self._condition.wait(remaining)
+
+    def _append(self, text: str, timestamp: float, record=None) -> LogLine:
+
+        """Commit a line to memory and to the file. Must be called with the condition held."""
+
+        line = LogLine(self._first_index + len(self._lines), timestamp, text, record)
+        self._lines.append(line)
+
+        if len(self._lines) > self.max_memory_lines:
+            release_count = len(self._lines) // 2
+            del self._lines[:release_count]
+            self._first_index += release_count
+
+        if self._outfile is not None:
+            self._write_line(line)
+
+        return line
+
+    def _write_line(self, line: LogLine) -> None:
+
+        """Write a line to the file, rotating it first if it is full."""
+
+        formatted = "%s.%03d %s\n" % (time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(line.timestamp)),
+                                      int(line.timestamp * 1000) % 1000,
+                                      line.text)
+
+        size = len(formatted.encode("utf-8"))
+
+        if self.max_file_bytes and self._outfile_bytes + size > self.max_file_bytes and self._outfile_bytes > 0:
+            self._rotate()
+
+        self._outfile.write(formatted)
+        self._outfile_bytes += size
+
+    def _rotate(self) -> None:
+
+        """Shift outfile.N-1 -> outfile.N, ..., outfile -> outfile.1 and reopen an empty outfile."""
+
+        self._outfile.close()
+
+        if self.backup_count > 0:
+            for i in range(self.backup_count - 1, 0, -1):
+                source = f"{self.outfile_name}.{i}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.outfile_name}.{i + 1}")
+            os.replace(self.outfile_name, f"{self.outfile_name}.1")
+
+        self._outfile = open(self.outfile_name, "w", encoding="utf-8")
+        self._outfile_bytes = 0
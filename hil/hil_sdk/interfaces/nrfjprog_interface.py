@@ -5,7 +5,7 @@
 
 import subprocess
 
-def nrfjprog_flash(binary: str, family: str) -> int:
+def nrfjprog_flash(binary: str, family: str, snr: int | str = None, logfile: str = None) -> int:
 
     """
     Load a file onto the target device via the nrfjprog tool.
@@ -15,22 +15,81 @@ def nrfjprog_flash(binary: str, family: str) -> int:
 
     :param family: Device family (eg, "NRF53")
 
+    :param snr: Optional serial number of the probe to use (required when more than one probe is attached)
+
+    :param logfile: Optional path to a file that nrfjprog output is appended to
+
     :return: Status of operation (0 for success, other for error. See nrfprog documentation for further details).
     :rtype: int
     """
 
-    return subprocess.Popen(f"nrfjprog -f {family} --program {binary} --recover --verify", shell=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).wait()
+    return _run_nrfjprog(f"-f {family} --program {binary} --recover --verify", snr, logfile)
 
 
-def nrfjprog_eraseall(family: str) -> int:
+def nrfjprog_eraseall(family: str, snr: int | str = None, logfile: str = None) -> int:
 
     """
     Load a file onto the target device via the nrfjprog tool.
 
     :param family: Device family (eg, "NRF53")
 
+    :param snr: Optional serial number of the probe to use (required when more than one probe is attached)
+
+    :param logfile: Optional path to a file that nrfjprog output is appended to
+
+    :return: Status of operation (0 for success, other for error. See nrfprog documentation for further details).
+    :rtype: int
+    """
+
+    return _run_nrfjprog(f"-f {family} --eraseall", snr, logfile)
+
+
+def nrfjprog_reset(family: str, snr: int | str = None, logfile: str = None) -> int:
+
+    """
+    Reset the target device via the nrfjprog tool and let it run.
+
+    :param family: Device family (eg, "NRF53")
+
+    :param snr: Optional serial number of the probe to use (required when more than one probe is attached)
+
+    :param logfile: Optional path to a file that nrfjprog output is appended to
+
     :return: Status of operation (0 for success, other for error. See nrfprog documentation for further details).
     :rtype: int
     """
 
-    return subprocess.Popen(f"nrfjprog -f {family} --eraseall", shell=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).wait()
+    return _run_nrfjprog(f"-f {family} --reset", snr, logfile)
+
+
+def nrfjprog_list_probes() -> list[str]:
+
+    """
+    List the serial numbers of the attached debug probes via the nrfjprog tool.
+
+    :return: Serial numbers of the attached probes (empty if none are attached or nrfjprog failed)
+    :rtype: list[str]
+    """
+
+    result = subprocess.run("nrfjprog --ids", shell=True, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+
+    if result.returncode != 0:
+        return []
+
+    return [line.strip() for line in result.stdout.splitlines() if line.strip().isdigit()]
+
+
+def _run_nrfjprog(args: str, snr: int | str = None, logfile: str = None) -> int:
+
+    """Run nrfjprog with the given arguments, on the selected probe, and return its exit status."""
+
+    if snr is not None:
+        args += f" --snr {snr}"
+
+    if logfile is None:
+        return subprocess.Popen(f"nrfjprog {args}", shell=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).wait()
+
+    with open(logfile, "a") as log:
+        log.write(f"$ nrfjprog {args}\n")
+        log.flush()
+        return subprocess.Popen(f"nrfjprog {args}", shell=True, stdout=log, stderr=subprocess.STDOUT).wait()
@@ -0,0 +1,259 @@
+#
+# Copyright (C) 2026, Dojo Five
+# All rights reserved.
+#
+
+"""Decodes fixed-size binary records streamed over an RTT channel into NumPy arrays"""
+
+import re
+import time
+import struct
+import threading
+import numpy as np
+
+DEFAULT_INITIAL_CAPACITY = 65536  # Number of records the in-memory columns can hold before growing
+
+# Mapping of struct format characters to NumPy type codes (without byte order), for the standard sizes used by the
+# "=", "<", ">" and "!" byte orders
+STRUCT_TO_NUMPY = {
+    "b": "i1", "B": "u1", "?": "b1",
+    "h": "i2", "H": "u2",
+    "i": "i4", "I": "u4", "l": "i4", "L": "u4",
+    "q": "i8", "Q": "u8",
+    "e": "f2", "f": "f4", "d": "f8",
+}
+
+
+def struct_format_to_dtype(record_format: str, field_names: list[str] = None) -> np.dtype:
+
+    """
+    Convert a struct module format string (eg, "<IhhH") into an equivalent NumPy structured dtype.
+    Repeat counts create sub-array fields (eg, "3h"), "s" creates a bytes field and "x" is padding.
+
+    :param record_format: struct format string. Use "<" or ">" for packed records.
+
+    :param field_names: Names of the fields, in order (defaults to f0, f1, ...)
+
+    :return: Structured dtype with the same layout as the struct format
+    """
+
+    byte_order = record_format[0] if record_format[:1] in "@=<>!" else "@"
+    numpy_order = {"@": "=", "=": "=", "<": "<", ">": ">", "!": ">"}[byte_order]
+
+    names, formats, offsets = [], [], []
+    consumed = byte_order
+
+    for count, code in re.findall(r"(\d*)([xcbB?hHiIlLqQefds])", record_format):
+
+        consumed += count + code
+        end_offset = struct.calcsize(consumed)
+
+        if code == "x":
+            continue
+
+        count = int(count) if count else 1
+
+        if code in "sc":
+            field_format = f"S{count}"
+            field_size = count
+        else:
+            # In native mode, sizes are those of the C types (eg, "l" is 8 bytes on 64-bit Linux), as are NumPy's
+            # character codes
+            type_code = np.dtype(code).str[1:] if byte_order == "@" else STRUCT_TO_NUMPY[code]
+            field_format = numpy_order + type_code
+            field_size = struct.calcsize(byte_order + code) * count
+            if count > 1:
+                field_format = (field_format, (count,))
+
+        names.append(field_names[len(names)] if field_names else f"f{len(names)}")
+        formats.append(field_format)
+        offsets.append(end_offset - field_size)
+
+    return np.dtype({"names": names, "formats": formats, "offsets": offsets, "itemsize": struct.calcsize(record_format)})
+
+
+class RTTBinarySink:
+
+    """
+    Receives a byte stream of fixed-size records (for example, raw sensor readings or timing probes written to an
+    RTT channel by the firmware) and decodes it in blocks with np.frombuffer, without creating a Python object per
+    record. Records are appended either to growable in-memory columns (one contiguous array per field), or to a
+    file that can be accessed as a memory-mapped array.
+
+    Register a sink with RTTInterface.add_binary_sink() before starting RTT.
+    """
+
+    def __init__(self,
+                 record_format: str | np.dtype,
+                 field_names: list[str] = None,
+                 initial_capacity: int = DEFAULT_INITIAL_CAPACITY,
+                 mmap_path: str = None) -> None:
+
+        """
+        Create a new sink.
+
+        :param record_format: Layout of one record, as a NumPy dtype or a struct format string (eg, "<IhhH")
+
+        :param field_names: Field names when record_format is a struct format string (defaults to f0, f1, ...)
+
+        :param initial_capacity: Initial number of records the in-memory columns can hold (doubled when full)
+
+        :param mmap_path: If given, records are appended to this file instead of being kept in memory
+        """
+
+        if isinstance(record_format, str):
+            self.dtype = struct_format_to_dtype(record_format, field_names)
+        else:
+            self.dtype = np.dtype(record_format)
+
+        self.record_size = self.dtype.itemsize
+        self.mmap_path = mmap_path
+        self.bytes_received = 0
+        self.first_timestamp = None
+        self.last_timestamp = None
+
+        self._lock = threading.Lock()
+        self._remainder = b""  # Bytes of an incomplete record, carried over to the next block
+        self._count = 0
+        self._columns = None
+        self._file = None
+
+        if mmap_path is not None:
+            self._file = open(mmap_path, "wb")
+        else:
+            names = self.dtype.names or ("value",)
+            self._columns = {name: np.empty((initial_capacity,) + self._field_dtype(name).shape,
+                                            dtype=self._field_dtype(name).base) for name in names}
+
+    def feed(self, data: bytes, timestamp: float = None) -> int:
+
+        """
+        Add received bytes. Complete records are decoded and stored; a trailing partial record is kept until
+        the rest of it arrives.
+
+        :param data: Received bytes
+
+        :param timestamp: Host time at which the data was received (defaults to now)
+
+        :return: Number of records decoded
+        """
+
+        if not data:
+            return 0
+
+        if timestamp is None:
+            timestamp = time.time()
+
+        with self._lock:
+
+            if self.first_timestamp is None:
+                self.first_timestamp = timestamp
+            self.last_timestamp = timestamp
+            self.bytes_received += len(data)
+
+            block = self._remainder + data if self._remainder else data
+            count = len(block) // self.record_size
+            used = count * self.record_size
+            self._remainder = bytes(block[used:])
+
+            if count == 0:
+                return 0
+
+            if self._file is not None:
+                self._file.write(memoryview(block)[:used])
+            else:
+                records = np.frombuffer(block, dtype=self.dtype, count=count)
+                self._append(records)
+
+            self._count += count
+
+            return count
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def records(self) -> np.ndarray:
+
+        """
+        All records received so far, as a structured array. In memory-mapped mode this is a read-only memory map
+        of the file; otherwise it is assembled from the columns (use column() to avoid the copy).
+        """
+
+        with self._lock:
+
+            if self._file is not None:
+                if not self._file.closed:
+                    self._file.flush()
+                if self._count == 0:
+                    return np.empty(0, dtype=self.dtype)
+                return np.memmap(self.mmap_path, dtype=self.dtype, mode="r", shape=(self._count,))
+
+            records = np.empty(self._count, dtype=self.dtype)
+            if self.dtype.names:
+                for name, column in self._columns.items():
+                    records[name] = column[:self._count]
+            else:
+                records[:] = self._columns["value"][:self._count]
+            return records
+
+    def column(self, name: str) -> np.ndarray:
+
+        """
+        Return all values received so far for one field.
+
+        :param name: Field name
+
+        :return: Array of values (a view of the column, valid until more records are received)
+        """
+
+        if self._file is not None:
+            return self.records[name]
+
+        with self._lock:
+            return self._columns[name][:self._count]
+
+    @property
+    def data_rate(self) -> float:
+
+        """Average receive rate in bytes per second, measured between the first and last block."""
+
+        if self.first_timestamp is None or self.last_timestamp <= self.first_timestamp:
+            return 0.0
+
+        return self.bytes_received / (self.last_timestamp - self.first_timestamp)
+
+    def close(self) -> None:
+
+        """Close the backing file (memory-mapped mode). Records remain accessible."""
+
+        with self._lock:
+            if self._file is not None and not self._file.closed:
+                self._file.flush()
+                self._file.close()
+
+    def _field_dtype(self, name: str) -> np.dtype:
+
+        """Return the dtype of one field (or of the whole record for non-structured dtypes)."""
+
+        return self.dtype.fields[name][0] if self.dtype.names else self.dtype
+
+    def _append(self, records: np.ndarray) -> None:
+
+        """Copy decoded records into the columns, growing them if needed. Must be called with the lock held."""
+
+        needed = self._count + len(records)
+        capacity = len(next(iter(self._columns.values())))
+
+        if needed > capacity:
+            capacity = max(capacity * 2, needed)
+            for name, column in self._columns.items():
+                grown = np.empty((capacity,) + column.shape[1:], dtype=column.dtype)
+                grown[:self._count] = column[:self._count]
+                self._columns[name] = grown
+
+        if self.dtype.names:
+            for name, column in self._columns.items():
+                column[self._count:needed] = records[name]
+        else:
+            self._columns["value"][self._count:needed] = records
@@ -2,7 +2,12 @@ import time
 import pylink
 import logging
 import threading
+from queue import Empty
 from multiprocessing import Queue
+from .log.log_store import LogStore, LogLine, DEFAULT_MAX_FILE_BYTES, DEFAULT_BACKUP_COUNT, DEFAULT_WAIT_TIMEOUT
+from .log.dictionary_decoder import DictionaryLogDecoder
+from .rtt_binary_sink import RTTBinarySink
+from .jlink_interface import JLINK_DLL_PATH
 from .utility.child_worker import ChildWorker, ChildWorkerCommand, ChildWorkerResponse
 
 # Timeout to wait for any command to complete
@@ -11,6 +16,13 @@ from .utility.child_worker import ChildWorker, ChildWorkerCommand, ChildWorkerRe
 COMMAND_TIMEOUT      = 5.0
 PROCESS_JOIN_TIMEOUT = 5.0  # Seconds to wait for child process to cleanup and join (based on observed execution)
 
+# RTT polling
+TERMINAL_CHANNEL       = 0      # RTT up-buffer used for terminal/log output
+TERMINAL_READ_SIZE     = 1024   # Maximum bytes read from the terminal channel per poll
+DATA_READ_SIZE         = 16384  # Maximum bytes read from a binary data channel per poll
+TERMINAL_POLL_INTERVAL = 0.1    # Seconds between polls when only the terminal channel is read
+DATA_POLL_INTERVAL     = 0.001  # Seconds between polls when binary data channels are idle
+
 # Child process interface defines
 STATUS_OK    = 0
 STATUS_ERROR = -1
@@ -22,16 +34,33 @@ class RTTInterface():
     NOTE: When using this class, additional operations via the J-Link are not possible.
     """
 
-    def __init__(self, target_cpu, outfile) -> None:
+    def __init__(self,
+                 target_cpu,
+                 outfile,
+                 max_file_bytes: int = DEFAULT_MAX_FILE_BYTES,
+                 backup_count: int = DEFAULT_BACKUP_COUNT,
+                 log_dictionary: str = None) -> None:
 
         """
         Create new instance and spawn child process, which will connect to the J-Link.
         Target CPU must match the J-Link naming convention (ie, "nRF5340_xxAA_APP")
+
+        Received text is reassembled into timestamped lines, which are kept in memory (see log_store)
+        and written to outfile. The outfile is rotated once it reaches max_file_bytes, keeping
+        backup_count previous files.
+
+        If the target uses Zephyr dictionary-based logging, pass the build's log_dictionary.json as
+        log_dictionary. Binary log messages are then decoded on the host, and each decoded message
+        becomes one line whose record attribute holds the DictionaryLogRecord.
         """
 
         self.target_cpu = target_cpu
         self.outfile_name = outfile
-        self.outfile = None
+        self.max_file_bytes = max_file_bytes
+        self.backup_count = backup_count
+        self.log_store = None
+        self.log_decoder = DictionaryLogDecoder(log_dictionary) if log_dictionary else None
+        self.binary_sinks = {}
         self.thread_exit_flag = False
         self.command_input_queue = Queue()
         self.command_output_queue = Queue()
@@ -41,9 +70,26 @@ class RTTInterface():
 
         threading.Thread(target=self._rtt_receive_thread).start()
 
+    def add_binary_sink(self, channel: int, sink: RTTBinarySink) -> None:
+
+        """
+        Route an RTT up-buffer carrying binary records to a sink. Must be called before start().
+        Data channels are polled continuously, so sustained rates of several hundred kB/s are possible
+        (provided the target's RTT buffer is large enough to absorb the host's polling latency).
+
+        :param channel: Index of the RTT up-buffer (must not be the terminal channel, 0)
+
+        :param sink: Sink that decodes and stores the records
+        """
+
+        if channel == TERMINAL_CHANNEL:
+            raise ValueError("The terminal channel cannot be used as a binary data channel")
+
+        self.binary_sinks[channel] = sink
+
     def start(self) -> bool:
 
-        open_params = {"type": "open", "target_cpu": self.target_cpu}
+        open_params = {"type": "open", "target_cpu": self.target_cpu, "data_channels": list(self.binary_sinks.keys())}
 
         open_response = self._send_command("open", open_params)
 
@@ -51,8 +97,8 @@ class RTTInterface():
             logging.error(f"Unable to start RTT: {open_response.data}")
             return False
 
-        # Open the outfile file
-        self.outfile = open(self.outfile_name, "w")
+        # Open the log store (and its outfile)
+        self.log_store = LogStore(self.outfile_name, self.max_file_bytes, self.backup_count)
 
         return True
 
@@ -65,8 +111,11 @@ class RTTInterface():
         self._send_command("close", None)
         self.thread_exit_flag = True
 
-        if self.outfile is not None:
-            self.outfile.close()
+        if self.log_store is not None:
+            self.log_store.close()
+
+        for sink in self.binary_sinks.values():
+            sink.close()
 
         if self.child_process is not None:
 
@@ -88,11 +137,45 @@ class RTTInterface():
             try:
                 out_data = self.data_output_queue.get(timeout=1)
 
-                if self.outfile is not None:
-                    self.outfile.write(out_data["data"] + "\n")
-            except:
+                if "channel" in out_data:
+                    self.binary_sinks[out_data["channel"]].feed(out_data["data"], out_data["timestamp"])
+                    continue
+
+                if self.log_store is None:
+                    continue
+
+                if self.log_decoder is not None:
+                    # The child process maps each byte to a character, so latin-1 restores the original bytes
+                    raw_data = out_data["data"].encode("latin-1")
+                    for record in self.log_decoder.feed(raw_data, out_data.get("timestamp")):
+                        self.log_store.add_line(record.format(), record.host_timestamp, record)
+                else:
+                    self.log_store.feed(out_data["data"], out_data.get("timestamp"))
+
+            except Empty:
                 pass  # Queue was empty
 
+    def wait_for(self, pattern, timeout: float = DEFAULT_WAIT_TIMEOUT, start: int = None) -> LogLine | None:
+
+        """
+        Wait for an RTT log line matching a regular expression. Only lines that have not been examined
+        by a previous call are searched, so repeated calls stay cheap during long tests.
+        See LogStore.wait_for() for details; concurrent waiters should each use log_store.cursor().
+
+        :param pattern: Regular expression (string or compiled), matched anywhere in the line
+
+        :param timeout: Maximum number of seconds to wait
+
+        :param start: Optional line index to start from instead (see LogStore.mark())
+
+        :return: Matching line, or None if the timeout expired (or RTT was not started)
+        """
+
+        if self.log_store is None:
+            return None
+
+        return self.log_store.wait_for(pattern, timeout, start)
+
     def _send_command(self, command_type: str, data) -> ChildWorkerResponse:
 
         """Send a command via the input queue and wait for a result from the output"""
@@ -116,13 +199,12 @@ class RTTChildWorker(ChildWorker):
 
         if command.command_type == "open":
 
-            # The Linux method of resolving the dyanamic lib path is not reliable,
-            # so we must use a hard-coded path
-            lib = pylink.Library(dllpath="/opt/SEGGER/JLink_V790/libjlinkarm.so.7")
+            lib = pylink.Library(dllpath=JLINK_DLL_PATH)
             self.jlink = pylink.JLink(lib=lib)
             self.jlink.open()
             self.jlink.set_tif(pylink.enums.JLinkInterfaces.SWD)
             self.jlink.connect(command.data["target_cpu"])
+            self.data_channels = command.data.get("data_channels", [])
 
             self._start_worker_thread()
 
@@ -144,13 +226,27 @@ class RTTChildWorker(ChildWorker):
 
             while self.jlink.connected() and not self.worker_exit_flag:
 
-                terminal_bytes = self.jlink.rtt_read(0, 1024)
+                terminal_bytes = self.jlink.rtt_read(TERMINAL_CHANNEL, TERMINAL_READ_SIZE)
 
                 if terminal_bytes:
                     msg = "".join(map(chr, terminal_bytes))
-                    self.data_output_queue.put({"type": "data", "data":msg})
+                    self.data_output_queue.put({"type": "data", "data": msg, "timestamp": time.time()})
+
+                if not self.data_channels:
+                    time.sleep(TERMINAL_POLL_INTERVAL)
+                    continue
+
+                # Binary data channels are drained as fast as data arrives, and only sleep when idle
+                received = False
+
+                for channel in self.data_channels:
+                    channel_bytes = self.jlink.rtt_read(channel, DATA_READ_SIZE)
+                    if channel_bytes:
+                        received = True
+                        self.data_output_queue.put({"type": "data", "channel": channel, "data": bytes(channel_bytes), "timestamp": time.time()})
 
-                time.sleep(0.1)
+                if not received:
+                    time.sleep(DATA_POLL_INTERVAL)
 
         except Exception as e:
 
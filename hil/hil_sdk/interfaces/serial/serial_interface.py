@@ -5,6 +5,7 @@
 
 import serial
 from enum import Enum
+from ..log.dictionary_decoder import DictionaryLogDecoder, DictionaryLogRecord
 
 # These Enum classes help bind our SDK types directly to backend type values (pyserial, in this case)
 
@@ -72,6 +73,7 @@ class SerialInterface:
         """
 
         self.port = None
+        self.log_decoder = None
 
         try:
 
@@ -167,3 +169,37 @@ class SerialInterface:
         else:
             raise SerialInterfaceException("Cannot get in_waiting on a port that is not open.")
 
+
+    def enable_dictionary_logging(self, log_dictionary: str, hex_input: bool = False) -> None:
+
+        """
+        Decode data received on this port as Zephyr dictionary-based log messages (see read_log_records).
+        The dictionary is loaded once and cached for the rest of the session.
+
+        :param log_dictionary: Path to the build's log_dictionary.json
+
+        :param hex_input: True if the target's UART backend sends hexadecimal text
+            (CONFIG_LOG_BACKEND_UART_OUTPUT_DICTIONARY_HEX), False for raw binary
+        """
+
+        self.log_decoder = DictionaryLogDecoder(log_dictionary, hex_input)
+
+    def read_log_records(self, size: int = None) -> list[DictionaryLogRecord]:
+
+        """
+        Read available data and decode it into dictionary log records. Dictionary logging must have been enabled
+        with enable_dictionary_logging(). Partial messages are kept until the rest of their data is read.
+
+        :param size: Maximum number of bytes to read (defaults to all bytes waiting, or at least one byte,
+            subject to the read timeout)
+
+        :return: List of decoded records (possibly empty)
+        :rtype: list[DictionaryLogRecord]
+        """
+
+        if self.log_decoder is None:
+            raise SerialInterfaceException("Dictionary logging is not enabled.")
+
+        data = self.read(size if size is not None else max(self.in_waiting(), 1))
+
+        return self.log_decoder.feed(data)
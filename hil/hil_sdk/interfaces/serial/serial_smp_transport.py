@@ -0,0 +1,193 @@
+#
+# Copyright (C) 2026, Dojo Five
+# All rights reserved.
+#
+
+import base64
+import asyncio
+import binascii
+import logging
+from .serial_interface import SerialInterface, SerialInterfaceException
+from ..ble.nordic.smp_transport import SMPTransport
+
+SERIAL_SMP_BAUDRATE     = 115200
+SERIAL_SMP_MTU          = 256   # Reassembly buffer of the device (CONFIG_MCUMGR_TRANSPORT_UART_MTU)
+SERIAL_SMP_LINE_LENGTH  = 127   # Maximum length of a frame line, markers and newline included
+SERIAL_SMP_READ_TIMEOUT = 0.05  # Read timeout of ports opened by the transport (bounds the time close() takes)
+
+SERIAL_SMP_FIRST_FRAME  = b"\x06\x09"  # Marks the first frame of a packet
+SERIAL_SMP_NEXT_FRAME   = b"\x04\x14"  # Marks the following frames of a packet
+SERIAL_SMP_LENGTH_SIZE  = 2            # Big endian length (packet and CRC) preceding the packet
+SERIAL_SMP_CRC_SIZE     = 2            # Big endian CRC16-XMODEM of the packet
+
+
+class SerialSMPTransport(SMPTransport):
+
+    """
+    SMP over a UART, with the SMP console framing used by Zephyr's UART and shell MCUmgr transports.
+
+    Each packet is prefixed with its length, followed by its CRC16 (XMODEM), base64 encoded and split into lines of
+    at most 127 bytes. The first line starts with 0x06 0x09 and the following ones with 0x04 0x14. Received lines
+    without these markers (console or log output sharing the UART) are ignored.
+
+    BLEDFUService and BLEShellService run over it unchanged, without scanning or connecting:
+
+        transport = SerialSMPTransport("/dev/ttyACM0", baudrate=1000000)
+        dfu_service = BLEDFUService(transport)
+        await dfu_service.image_upload(image_path)
+        await transport.close()
+    """
+
+    def __init__(self,
+                 port: SerialInterface | str,
+                 baudrate: int = SERIAL_SMP_BAUDRATE,
+                 mtu: int = SERIAL_SMP_MTU,
+                 line_length: int = SERIAL_SMP_LINE_LENGTH):
+
+        """
+        Create a transport over a serial port. A SerialInterfaceException is thrown if the port cannot be opened.
+
+        :param port: Name of the port to open, or an open SerialInterface (which should have a read timeout)
+
+        :param baudrate: Baudrate of the port, when it is opened by the transport
+
+        :param mtu: Size of the device's SMP reassembly buffer, in bytes
+
+        :param line_length: Maximum length of a frame line, in bytes
+        """
+
+        super().__init__()
+
+        self._own_port = isinstance(port, str)
+        self._port = SerialInterface(port, baudrate=baudrate, read_timeout=SERIAL_SMP_READ_TIMEOUT) if self._own_port else port
+        self._mtu = mtu
+        self._line_length = line_length
+
+        self._write_lock = asyncio.Lock()
+        self._reader = None
+        self._closing = False
+        self._line = bytearray()
+        self._frame = None  # Decoded bytes of the packet being received
+
+    @property
+    def connected(self) -> bool:
+
+        return self._port is not None and not self._closing
+
+    def max_packet_size(self) -> int:
+
+        return self._mtu - SERIAL_SMP_LENGTH_SIZE - SERIAL_SMP_CRC_SIZE
+
+    async def close(self) -> None:
+
+        """Stop receiving, and close the port if the transport opened it."""
+
+        self._closing = True
+
+        if self._reader is not None:
+            await self._reader
+            self._reader = None
+
+        if self._own_port and self._port is not None:
+            self._port.close()
+            self._port = None
+
+    @staticmethod
+    def encode(packet: bytes, line_length: int = SERIAL_SMP_LINE_LENGTH) -> bytes:
+
+        """
+        Frame an SMP packet for the UART.
+
+        :param packet: SMP packet (header and payload)
+
+        :param line_length: Maximum length of a frame line, in bytes
+
+        :return: Frame lines, each terminated by a newline
+        """
+
+        # Each line is decoded on its own, so it holds whole groups of 4 base64 characters
+        chunk_size = (line_length - len(SERIAL_SMP_FIRST_FRAME) - 1) // 4 * 4
+        crc = binascii.crc_hqx(packet, 0).to_bytes(SERIAL_SMP_CRC_SIZE, byteorder="big")
+        length = (len(packet) + SERIAL_SMP_CRC_SIZE).to_bytes(SERIAL_SMP_LENGTH_SIZE, byteorder="big")
+        encoded = base64.b64encode(length + bytes(packet) + crc)
+
+        return b"".join((SERIAL_SMP_FIRST_FRAME if i == 0 else SERIAL_SMP_NEXT_FRAME) + encoded[i:i + chunk_size] + b"\n"
+                        for i in range(0, len(encoded), chunk_size))
+
+    async def _open(self) -> None:
+
+        if self._port is None or self._closing:
+            raise SerialInterfaceException("Cannot send SMP requests over a closed transport.")
+
+        if self._reader is None or self._reader.done():
+            self._reader = asyncio.get_running_loop().create_task(self._read_loop())
+
+    async def _write(self, data: bytearray) -> None:
+
+        frames = SerialSMPTransport.encode(data, self._line_length)
+
+        # The lines of a packet must not interleave with another packet's
+        async with self._write_lock:
+            await asyncio.to_thread(self._port.write, frames)
+
+    async def _read_loop(self) -> None:
+
+        """Read the port until the transport is closed, dispatching the packets received."""
+
+        while not self._closing:
+            try:
+                data = await asyncio.to_thread(self._read_available)
+            except Exception as e:
+                logging.error(f"{self.__class__.__name__}: read failed, no more responses will be received: {e!r}")
+                return
+
+            if data:
+                self._feed(data)
+
+    def _read_available(self) -> bytes:
+
+        return self._port.read(max(self._port.in_waiting(), 1))
+
+    def _feed(self, data: bytes) -> None:
+
+        """Split received bytes into lines and decode the frame lines."""
+
+        self._line += data
+
+        while (end := self._line.find(b"\n")) >= 0:
+            line = bytes(self._line[:end]).rstrip(b"\r")
+            del self._line[:end + 1]
+            self._decode_line(line)
+
+    def _decode_line(self, line: bytes) -> None:
+
+        """Decode a frame line, and dispatch the packet once all of its lines are received."""
+
+        if (start := line.find(SERIAL_SMP_FIRST_FRAME)) >= 0:
+            self._frame = bytearray()
+        elif (start := line.find(SERIAL_SMP_NEXT_FRAME)) < 0 or self._frame is None:
+            return  # Console output, or the rest of a packet whose first line was missed
+
+        try:
+            self._frame += base64.b64decode(line[start + len(SERIAL_SMP_FIRST_FRAME):], validate=True)
+        except binascii.Error:
+            logging.error(f"{self.__class__.__name__}: dropping a packet with an invalid frame")
+            self._frame = None
+            return
+
+        if len(self._frame) < SERIAL_SMP_LENGTH_SIZE:
+            return
+
+        length = int.from_bytes(self._frame[:SERIAL_SMP_LENGTH_SIZE], byteorder="big")
+        if len(self._frame) < SERIAL_SMP_LENGTH_SIZE + length:
+            return
+
+        body = bytes(self._frame[SERIAL_SMP_LENGTH_SIZE:SERIAL_SMP_LENGTH_SIZE + length])
+        self._frame = None
+
+        packet, crc = body[:-SERIAL_SMP_CRC_SIZE], body[-SERIAL_SMP_CRC_SIZE:]
+        if binascii.crc_hqx(packet, 0) != int.from_bytes(crc, byteorder="big"):
+            logging.error(f"{self.__class__.__name__}: dropping a packet with a bad CRC")
+            return
+
+        self._receive(packet)
@@ -0,0 +1,391 @@
+#
+# Copyright (C) 2026, Dojo Five
+# All rights reserved.
+#
+
+"""Event-driven detection of a target becoming ready after a reset, instead of fixed sleeps"""
+
+import re
+import time
+import asyncio
+import logging
+import cbor2
+from bleak import BleakScanner
+from .gpio_interface import GPIOInterface
+from .serial.serial_interface import SerialInterface
+from .ble.ble_client import BLEClient
+from .ble.ble_scanner import BLEScanner
+from .ble.ble_device_cache import BLEDeviceCache
+from .ble.nordic.ble_smp_service import BLESMPService, OP_WRITE, GRP_OS_MANAGEMENT, OS_ECHO_COMMAND
+
+DEFAULT_READY_TIMEOUT = 30.0   # Seconds to wait for the target by default
+RTT_WAIT_SLICE        = 0.2    # Seconds per blocking RTT wait, so the wait can be cancelled
+SERIAL_POLL_INTERVAL  = 0.01   # Seconds between serial port polls
+GPIO_POLL_INTERVAL    = 0.001  # Seconds between GPIO pin polls
+SMP_ECHO_TEXT         = "ready"
+SMP_ECHO_TIMEOUT      = 2.0    # Seconds to wait for an echo reply
+SMP_CONNECT_TIMEOUT   = 5.0    # Seconds per connection attempt
+SMP_RETRY_INTERVAL    = 0.5    # Seconds between echo attempts
+
+
+class ReadySignal:
+
+    """
+    Base class of the events that indicate that a target is ready. A signal is armed before the target is reset,
+    so that it only considers events that happen after that point, then awaited.
+    """
+
+    name = "signal"
+
+    def arm(self) -> None:
+
+        """Discard any previous events. Called before the target is reset."""
+
+        pass
+
+    async def wait(self) -> None:
+
+        """Return once the signal has been observed. Cancelled when another signal wins or the timeout expires."""
+
+        raise NotImplementedError
+
+
+class RTTBannerSignal(ReadySignal):
+
+    """Ready when an RTT log line matches a pattern (eg, a boot banner). RTT must be started."""
+
+    name = "rtt"
+
+    def __init__(self, rtt, pattern: str | re.Pattern):
+
+        """
+        :param rtt: Started RTTInterface (not imported here, so this module does not require pylink)
+
+        :param pattern: Regular expression matched against each line
+        """
+
+        self.rtt = rtt
+        self.pattern = re.compile(pattern)
+        self._cursor = None
+
+    def arm(self) -> None:
+        # A cursor of its own, so other readers of the log do not consume the banner
+        self._cursor = self.rtt.log_store.cursor() if self.rtt.log_store is not None else None
+
+    async def wait(self) -> None:
+
+        if self._cursor is None:
+            raise RuntimeError("RTT was not started when the signal was armed")
+
+        # Each slice continues from where the last one stopped
+        while await asyncio.to_thread(self._cursor.wait_for, self.pattern, RTT_WAIT_SLICE) is None:
+            pass
+
+
+class SerialBannerSignal(ReadySignal):
+
+    """Ready when text received on a serial port matches a pattern (eg, a boot banner)."""
+
+    name = "serial"
+
+    def __init__(self, serial_interface: SerialInterface, pattern: str | re.Pattern):
+
+        self.serial_interface = serial_interface
+        self.pattern = re.compile(pattern)
+        self._text = ""
+
+    def arm(self) -> None:
+        self.serial_interface.flush_input()
+        self._text = ""
+
+    async def wait(self) -> None:
+
+        while True:
+            waiting = self.serial_interface.in_waiting()
+
+            if waiting:
+                self._text += self.serial_interface.read(waiting).decode(errors="replace")
+
+                if self.pattern.search(self._text):
+                    return
+
+                # Only keep the last (possibly incomplete) line
+                self._text = self._text[self._text.rfind("\n") + 1:]
+
+            await asyncio.sleep(SERIAL_POLL_INTERVAL)
+
+
+class BLEAdvertisementSignal(ReadySignal):
+
+    """
+    Ready when the first advertisement from a given address (or, failing that, with a given name) is received.
+
+    The signal runs a scan of its own: while a BLEDeviceCache is scanning, use BLECachedAdvertisementSignal instead,
+    as BlueZ runs one discovery at a time and fails the others.
+    """
+
+    name = "ble_advertisement"
+
+    def __init__(self, address: str = None, name: str = None):
+
+        self.address = address.upper() if address else None
+        self.device_name = name
+
+    async def wait(self) -> None:
+
+        found = asyncio.Event()
+
+        def detection_callback(device, advertisement_data):
+            if self.address is not None:
+                if device.address.upper() == self.address:
+                    found.set()
+            elif advertisement_data.local_name == self.device_name:
+                found.set()
+
+        # Let the BLE stack drop advertisements from other addresses
+        filters = BLEScanner._backend_filters(addresses=[self.address]) if self.address is not None else {}
+
+        async with BleakScanner(detection_callback=detection_callback, **filters):
+            await found.wait()
+
+
+class BLECachedAdvertisementSignal(ReadySignal):
+
+    """
+    Ready when a running BLEDeviceCache receives an advertisement from a given address (or, failing that, with a
+    given name) after the signal is armed. Unlike BLEAdvertisementSignal, no other scan is started.
+
+    The advertising device is kept, so the target can be connected through it (BLEClient(signal.device)) rather than
+    by address, which would make the backend start a scan that fails while the cache's is running.
+    """
+
+    name = "ble_advertisement"
+
+    def __init__(self, device_cache: BLEDeviceCache, address: str = None, name: str = None):
+
+        """
+        :param device_cache: Running device cache
+
+        :param address: Address of the target
+
+        :param name: Advertised name of the target, used when no address is given
+        """
+
+        self.device_cache = device_cache
+        self.address = address.upper() if address else None
+        self.device_name = name
+        self.device = None
+        """Device of the first advertisement received after arming (None until the signal is observed)"""
+        self._since = None
+
+    def arm(self) -> None:
+        self.device = None
+        self._since = time.monotonic()
+
+    async def wait(self) -> None:
+
+        def matches(device):
+            if self.address is not None:
+                return device.address.upper() == self.address
+            return device.name == self.device_name
+
+        device = await self.device_cache.wait_for_match(matches, timeout=None, since=self._since)
+        if device is None:
+            raise RuntimeError("the device cache is not running")
+
+        self.device = device
+
+
+class SMPEchoSignal(ReadySignal):
+
+    """
+    Ready when the target answers an SMP echo request, ie when its management transport is up. This is later than
+    the first advertisement, but proves that the application accepts connections and commands.
+
+    When a BLEDeviceCache is scanning, give it to the signal: the target is then connected through the device of its
+    latest advertisement, instead of by address (which would make the backend start a scan that fails).
+    """
+
+    name = "smp_echo"
+
+    def __init__(self, address: str, text: str = SMP_ECHO_TEXT, device_cache: BLEDeviceCache = None):
+
+        """
+        :param address: Address of the target
+
+        :param text: Text to echo
+
+        :param device_cache: Optional running device cache, used to connect without scanning
+        """
+
+        self.address = address
+        self.text = text
+        self.device_cache = device_cache
+        self._since = None
+
+    def arm(self) -> None:
+        self._since = time.monotonic()
+
+    async def wait(self) -> None:
+
+        header = BLESMPService._get_smp_header(OP_WRITE, 0, GRP_OS_MANAGEMENT, 0, OS_ECHO_COMMAND)
+        request = bytearray(header + list(cbor2.dumps({"d": self.text})))
+
+        while True:
+            target = self.address
+
+            if self.device_cache is not None:
+                # Only an advertisement sent after the reset shows the target is back
+                target = await self.device_cache.wait_for(self.address, timeout=None, since=self._since)
+                if target is None:
+                    raise RuntimeError("the device cache is not running")
+
+            client = BLEClient(target)
+
+            try:
+                if await client.connect(timeout=SMP_CONNECT_TIMEOUT, retry_count=1):
+                    response = await BLESMPService(client).write_smp_and_response(request, timeout=SMP_ECHO_TIMEOUT)
+                    if response is not None and response.get("r") == self.text:
+                        return
+            finally:
+                await client.disconnect()
+
+            await asyncio.sleep(SMP_RETRY_INTERVAL)
+
+
+class GPIOSignal(ReadySignal):
+
+    """
+    Ready on an edge of a GPIO pin (already set up as an input) to the given level. If the pin is already at that
+    level when armed, it must first leave it.
+    """
+
+    name = "gpio"
+
+    def __init__(self, pin: int, level: bool = True):
+
+        self.pin = pin
+        self.level = level
+        self._armed_level = None
+
+    def arm(self) -> None:
+        self._armed_level = GPIOInterface.read_pin(self.pin)
+
+    async def wait(self) -> None:
+
+        if self._armed_level == self.level:
+            while GPIOInterface.read_pin(self.pin) == self.level:
+                await asyncio.sleep(GPIO_POLL_INTERVAL)
+
+        while GPIOInterface.read_pin(self.pin) != self.level:
+            await asyncio.sleep(GPIO_POLL_INTERVAL)
+
+
+class TargetReadyResult:
+
+    """Outcome of waiting for a target to become ready."""
+
+    def __init__(self, ready: bool, signal: str, boot_time: float):
+
+        self.ready = ready
+        """True if a signal was observed before the timeout"""
+        self.signal = signal
+        """Name of the first signal observed, or None"""
+        self.boot_time = boot_time
+        """Seconds from arming to the first signal (or to the timeout)"""
+
+
+class TargetReadyWaiter:
+
+    """
+    Waits for the first of several readiness signals. Create the waiter (which arms the signals and starts the boot
+    clock) before resetting the target, then await wait():
+
+        waiter = TargetReadyWaiter([BLEAdvertisementSignal(address), SerialBannerSignal(port, "advertising started")])
+        jlink.reset_and_go(delay_ms=0)
+        result = await waiter.wait(timeout=30)
+    """
+
+    def __init__(self, signals: list[ReadySignal]):
+
+        """
+        Create a new waiter and arm its signals.
+
+        :param signals: Signals to wait for; the first one observed wins
+        """
+
+        self.signals = signals
+        self.start_time = None
+        self.arm()
+
+    def arm(self) -> None:
+
+        """Arm the signals and restart the boot clock (eg, before another reset)."""
+
+        for signal in self.signals:
+            signal.arm()
+
+        self.start_time = time.monotonic()
+
+    async def wait(self, timeout: float = DEFAULT_READY_TIMEOUT) -> TargetReadyResult:
+
+        """
+        Wait for the first signal.
+
+        :param timeout: Maximum number of seconds to wait, counted from arming
+
+        :return: Outcome, including the measured boot time
+        :rtype: TargetReadyResult
+        """
+
+        tasks = {asyncio.create_task(signal.wait()): signal for signal in self.signals}
+        remaining = max(self.start_time + timeout - time.monotonic(), 0)
+        winner = None
+
+        try:
+            pending = set(tasks)
+
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    break  # Timed out
+
+                for task in done:
+                    if task.exception() is None:
+                        winner = tasks[task]
+                        break
+                    logging.error(f"{self.__class__.__name__}: {tasks[task].name} signal failed: {task.exception()}")
+
+                remaining = max(self.start_time + timeout - time.monotonic(), 0)
+
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        boot_time = time.monotonic() - self.start_time
+
+        if winner is None:
+            logging.error(f"{self.__class__.__name__}: target not ready after {boot_time:.2f} s")
+            return TargetReadyResult(False, None, boot_time)
+
+        logging.info(f"{self.__class__.__name__}: target ready after {boot_time:.2f} s ({winner.name})")
+        return TargetReadyResult(True, winner.name, boot_time)
+
+
+async def wait_for_target_ready(signals: list[ReadySignal], timeout: float = DEFAULT_READY_TIMEOUT) -> TargetReadyResult:
+
+    """
+    Arm the given signals and wait for the first of them. Use TargetReadyWaiter instead when the signals must be
+    armed before a reset.
+
+    :param signals: Signals to wait for; the first one observed wins
+
+    :param timeout: Maximum number of seconds to wait
+
+    :return: Outcome, including the measured time to the first signal
+    :rtype: TargetReadyResult
+    """
+
+    return await TargetReadyWaiter(signals).wait(timeout)
@@ -3,12 +3,13 @@ import time
 import re
 import asyncio
 import pytest
-import pytest_asyncio
 from collections import namedtuple
 
-from hil_sdk.interfaces.ble.ble_scanner import BLEScanner
 from hil_sdk.interfaces.ble.ble_client import BLEClient
+from hil_sdk.interfaces.ble.bluez_link import PHY_2M
 from hil_sdk.interfaces.ble.nordic.ble_dfu_service import BLEDFUService
+from hil_sdk.interfaces.ble.nordic.ble_shell_service import BLEShellService
+from hil_sdk.interfaces.target_ready import TargetReadyWaiter, BLECachedAdvertisementSignal
 
 # Represents the current version of the example firmware
 STARTING_FW_VERSION = b"0.2"
@@ -16,7 +17,16 @@ STARTING_FW_VERSION = b"0.2"
 # Represents the version of the specially-built downgrade firmware
 DOWNGRADE_FW_VERSION = b"0.1"
 
-@pytest.mark.asyncio
+# Maximum time for the target to swap images and start advertising after a reset
+DFU_READY_TIMEOUT = 70
+
+# Maximum time for the target to echo data written over NUS
+NUS_ECHO_TIMEOUT = 5
+
+# Time the DIS strings read on a connection can be reused (they only change with the firmware)
+DIS_CACHE_TTL = 600
+
+@pytest.mark.asyncio(loop_scope="session")
 async def test_ble_shell_ping(ble_shell_fixture):
 
     print('"ping" command is expected to return "pong"')
@@ -28,7 +38,23 @@ async def test_ble_shell_ping(ble_shell_fixture):
     assert str(cmd_response["o"]).strip() == "pong"
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
+async def test_ble_shell_ping_all_duts(dut_registry_fixture):
+
+    # Ping every DUT of the station at once
+    async def ping(dut):
+        cmd_response = await BLEShellService(dut.client).execute_command(["hil", "ping"])
+        assert str(cmd_response["o"]).strip() == "pong"
+
+    results = await dut_registry_fixture.run(ping)
+
+    for name, result in results.items():
+        print(f"{name}: {'pass' if result.success else result.error!r} ({result.duration:.3f} s)")
+
+    assert all(result.success for result in results.values())
+
+
+@pytest.mark.asyncio(loop_scope="session")
 async def test_ble_shell_uptime(ble_shell_fixture):
 
     print("Query DUT uptime")
@@ -41,7 +67,7 @@ async def test_ble_shell_uptime(ble_shell_fixture):
     assert re.match(r"\d+ days, \d+ hours, \d+ minutes, \d+ seconds", response_str) != None
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 async def test_ble_shell_uptime_ms(ble_shell_fixture):
 
     sleep_time_secs = 5
@@ -73,52 +99,21 @@ async def test_ble_shell_uptime_ms(ble_shell_fixture):
     assert 0 < target_diff_ms < (accuracy_secs*1000)
 
 
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 async def test_ble_nus(ble_nus_fixture):
 
     test_data = b"This is a test"
-    was_called = False
-
-    def rx_callback(uuid, data):
-        assert data == test_data
-        nonlocal was_called
-        was_called = True
-
-    await ble_nus_fixture.set_nus_received_cb(rx_callback)
-
-    await ble_nus_fixture.write_nus(test_data)
-
-    await asyncio.sleep(5)
-
-    assert was_called
 
+    async with ble_nus_fixture.received_notifications() as stream:
+        await ble_nus_fixture.write_nus(test_data)
+        notification = await stream.get(timeout=NUS_ECHO_TIMEOUT)
 
-async def wait_for_advertising_device(device_address: str, timeout: int) -> bool:
+    assert notification is not None
+    assert notification.data == test_data
 
-    """Wait for a device with the given name to appear in a device scan.
-    Returns true if the device appeared, or false if the search timed out."""
 
-    total_scan_time = 0
-
-    while total_scan_time < timeout:
-
-        def filter_function(advertising_device):
-            return advertising_device.address == device_address
-
-        start_time = time.monotonic()
-        devices = await BLEScanner.find_devices(filter=filter_function)
-
-        if len(devices) > 0:
-            return True
-
-        total_scan_time += (time.monotonic() - start_time)
-        print(f"Scanned for {round(total_scan_time, 2)} total seconds, {device_address} not found...")
-
-    return False
-
-
-@pytest.mark.asyncio
-async def test_ble_dfu(ble_client_fixture, jlink_fixture):
+@pytest.mark.asyncio(loop_scope="session")
+async def test_ble_dfu(dut_fixture, ble_exclusive_client_fixture, ble_device_cache_fixture, ble_gatt_cache_fixture, record_property):
 
     # This DFU test verifies the DFU functionality of the target by temporarily downgrading and then reverting the image.
     # This is possible by uploading the downgraded image and setting its status to "pending", which means it will be
@@ -139,11 +134,11 @@ async def test_ble_dfu(ble_client_fixture, jlink_fixture):
     #    6. Reset, which will cause a reboot into the original "new" image
     #    7. Verify that the reversion was successful
 
-    dfu_service = BLEDFUService(ble_client_fixture)
+    dfu_service = BLEDFUService(ble_exclusive_client_fixture)
 
     # First, verify that we have the correct version of firmware loaded
     dis_fw_version_uuid = "00002A26-0000-1000-8000-00805F9B34FB"
-    dis_fw_version = await ble_client_fixture.read_gatt(dis_fw_version_uuid)
+    dis_fw_version = await ble_exclusive_client_fixture.read_gatt(dis_fw_version_uuid)
     assert dis_fw_version == STARTING_FW_VERSION
     print(f"DIS Service is reporting v{dis_fw_version.decode('utf-8')} for the active firmware version")
 
@@ -154,6 +149,11 @@ async def test_ble_dfu(ble_client_fixture, jlink_fixture):
     test_dir = os.path.dirname(os.path.abspath(__file__))
     test_image = os.path.join(test_dir, "app_downgrade_0_1.bin")
 
+    # Speed up the transfer with a short connection interval and the 2M PHY (best effort, the target may refuse)
+    await ble_exclusive_client_fixture.set_connection_parameters(min_interval_ms=7.5, max_interval_ms=15)
+    await ble_exclusive_client_fixture.set_phy(PHY_2M, PHY_2M)
+    print(f"Link parameters: {await ble_exclusive_client_fixture.get_link_parameters()}")
+
     # Next, perform DFU to an "older" version of the software
     # app_update.bin is a part of this test and is an identical version of the stock FW
     # with version 0.1
@@ -181,22 +181,30 @@ async def test_ble_dfu(ble_client_fixture, jlink_fixture):
     await dfu_service.set_state_of_image(dfu_hash, False)
 
     # Reset, which will cause the nRF to load the newly DFU'd firmware in test mode
-    await ble_client_fixture.disconnect()
+    await ble_exclusive_client_fixture.disconnect()
     print("Resetting target after DFU...")
-    jlink_fixture.reset_and_go()
+    # The session's device cache is already scanning, so the advertisement is awaited from it (a second scan would fail)
+    advertisement = BLECachedAdvertisementSignal(ble_device_cache_fixture, ble_exclusive_client_fixture.address)
+    waiter = TargetReadyWaiter([advertisement])
+    assert await dut_fixture.reset()
 
-    print("Sleeping for 10 seconds for update to be applied...")
-    await asyncio.sleep(10)
-
-    # Wait for the nRF to copy the image between flash banks
-    device_found = await wait_for_advertising_device(ble_client_fixture.address, 60)
-    assert device_found
+    # Wait for the nRF to copy the image between flash banks and start advertising
+    ready = await waiter.wait(timeout=DFU_READY_TIMEOUT)
+    assert ready.ready
+    print(f"Target advertising {ready.boot_time:.1f} seconds after reset (update applied)")
+    record_property("dfu_apply_boot_time", ready.boot_time)
 
     # Since the target has been offline for an extended amount of time (over 30 seconds),
     # it has disappeared from the BlueZ stack's device list. Therefore the Bleak backend
-    # requires we create a new client object.
-    new_client = BLEClient(ble_client_fixture.address)
-    await new_client.connect()
+    # requires we create a new client object, from the advertisement received after the reset
+    # (connecting by address would start a scan). BlueZ dropped the device along with the services
+    # bleak held for it, so they are discovered again.
+    new_client = BLEClient(advertisement.device, gatt_cache=ble_gatt_cache_fixture)
+    assert await new_client.connect()
+    print(f"Connected in {new_client.connect_time:.3f} s, service discovery {new_client.discovery_time} s "
+          f"({'cached' if new_client.used_gatt_cache else 'discovered'} services)")
+    record_property("dfu_apply_connect_time", new_client.connect_time)
+    record_property("dfu_apply_discovery_time", new_client.discovery_time)
     dfu_service = BLEDFUService(new_client)
     dis_fw_version = await new_client.read_gatt(dis_fw_version_uuid)
     assert dis_fw_version == DOWNGRADE_FW_VERSION
@@ -207,18 +215,22 @@ async def test_ble_dfu(ble_client_fixture, jlink_fixture):
 
     await new_client.disconnect()
     print("Resetting target to revert temporary execution of downgrade DFU...")
-    jlink_fixture.reset_and_go()
-
-    print("Sleeping for 10 seconds for update to be reverted...")
-    await asyncio.sleep(10)
+    waiter.arm()
+    assert await dut_fixture.reset()
 
-    # Wait for the nRF to copy the image between flash banks
-    device_found = await wait_for_advertising_device(new_client.address, 60)
-    assert device_found
+    # Wait for the nRF to copy the image between flash banks and start advertising
+    ready = await waiter.wait(timeout=DFU_READY_TIMEOUT)
+    assert ready.ready
+    print(f"Target advertising {ready.boot_time:.1f} seconds after reset (update reverted)")
+    record_property("dfu_revert_boot_time", ready.boot_time)
 
     # A new client object is needed (see previous comment)
-    new_client = BLEClient(ble_client_fixture.address)
-    await new_client.connect()
+    new_client = BLEClient(advertisement.device, gatt_cache=ble_gatt_cache_fixture)
+    assert await new_client.connect()
+    print(f"Connected in {new_client.connect_time:.3f} s, service discovery {new_client.discovery_time} s "
+          f"({'cached' if new_client.used_gatt_cache else 'discovered'} services)")
+    record_property("dfu_revert_connect_time", new_client.connect_time)
+    record_property("dfu_revert_discovery_time", new_client.discovery_time)
     dfu_service = BLEDFUService(new_client)
     dis_fw_version = await new_client.read_gatt(dis_fw_version_uuid)
     assert dis_fw_version == STARTING_FW_VERSION
@@ -230,40 +242,36 @@ async def test_ble_dfu(ble_client_fixture, jlink_fixture):
     await new_client.disconnect()
 
 
-@pytest.mark.asyncio
-async def test_ble_reconnect(ble_client_fixture, request):
+@pytest.mark.asyncio(loop_scope="session")
+async def test_ble_reconnect(ble_exclusive_client_fixture, request):
 
     # We enter this function just having connected to the DUT
-    print("Disconnect from %s" % ble_client_fixture._client_obj.address)
-    await ble_client_fixture.disconnect()
+    print("Disconnect from %s" % ble_exclusive_client_fixture._client_obj.address)
+    await ble_exclusive_client_fixture.disconnect()
 
     # Immediately try to reconnect to the device, capture the timeout error on connection failure
-    print("Attempt to connect to %s" % ble_client_fixture._client_obj.address)
+    print("Attempt to connect to %s" % ble_exclusive_client_fixture._client_obj.address)
     try:
-        await ble_client_fixture.connect()
+        await ble_exclusive_client_fixture.connect()
     except TimeoutError:
-        print("%s: got timeout while trying to connect to ble client %s" % (request.node.name, ble_client_fixture._client_obj.address))
+        print("%s: got timeout while trying to connect to ble client %s" % (request.node.name, ble_exclusive_client_fixture._client_obj.address))
 
-    connected = await ble_client_fixture.is_connected()
-    assert(connected)
+    assert ble_exclusive_client_fixture.connected
 
 
-@pytest.mark.asyncio
-async def test_ble_disconnect_and_advertise(ble_client_fixture, request):
+@pytest.mark.asyncio(loop_scope="session")
+async def test_ble_disconnect_and_advertise(ble_exclusive_client_fixture, ble_device_cache_fixture, request):
 
     # We enter this function just having connected to the DUT
-    device_address = ble_client_fixture.address
+    device_address = ble_exclusive_client_fixture.address
     print("Disconnect from %s" % device_address)
-    await ble_client_fixture.disconnect()
+    await ble_exclusive_client_fixture.disconnect()
+    disconnect_time = time.monotonic()
 
     # Check to see if device has started advertising again after disconnect
-    print("Scan for advertising devices")
-
-    def filter_function(advertising_device):
-            return advertising_device.address == device_address
-
-    devices = await BLEScanner.find_devices(filter=filter_function)
-    assert len(devices) == 1
+    print("Wait for an advertisement sent after the disconnect")
+    device = await ble_device_cache_fixture.wait_for(device_address, since=disconnect_time)
+    assert device is not None
 
 
 dis_service = namedtuple("dis_service", "uuid name value")
@@ -276,12 +284,15 @@ dis_services = [
 ]
 
 # Uncomment the following code block to add the device information service PyTest
-@pytest.mark.asyncio
+@pytest.mark.asyncio(loop_scope="session")
 async def test_ble_device_information_service(ble_client_fixture):
+    # The DIS strings are static, so they only need to be read once per connection
+    values = await ble_client_fixture.read_many([service.uuid.lower() for service in dis_services], cache_ttl=DIS_CACHE_TTL)
+
     for service in dis_services:
         uuid = service.uuid.lower()
         print(str(service))
         print(str(ble_client_fixture.lookup_uuid_name(uuid)))
-        data = await ble_client_fixture.read_gatt(uuid)
+        data = values[uuid]
         print(str(data))
         assert(service.value == data.decode("utf-8"))